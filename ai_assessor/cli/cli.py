@@ -1,8 +1,12 @@
 import argparse
 import os
+import time
 
 from tqdm import tqdm
 
+from ..core.archive import archive_scope
+from ..core.key_pool import KeyPool
+from ..core.router import ModelRouter
 from ..utils.document_processor import DocumentProcessor
 from ..utils.file_utils import FileUtils
 
@@ -73,12 +77,92 @@ class AIAssessorCLI:
             "--output", help="Path to the output directory for feedback files"
         )
         grade_parser.add_argument(
-            "--model", choices=["GPT-3", "GPT-4"], help="Model to use for grading"
+            "--rubric", help="Path to a JSON rubric definition for structured scores"
+        )
+        grade_parser.add_argument(
+            "--per-criterion",
+            action="store_true",
+            help="Grade each rubric criterion in a separate concurrent request",
+        )
+        grade_parser.add_argument(
+            "--ensemble",
+            nargs="?",
+            const="",
+            metavar="MODELS",
+            help="Grade with several models in one pass (comma-separated, "
+            "defaults to Ensemble.Models)",
+        )
+        grade_parser.add_argument(
+            "--samples", type=int, help="Completions per ensemble model (n)"
+        )
+        grade_parser.add_argument(
+            "--pack",
+            action="store_true",
+            help="Pack several short submissions into one request (with --dir)",
+        )
+        grade_parser.add_argument(
+            "--workers",
+            type=int,
+            help="Submissions graded at once (with --dir, defaults to "
+            "Batch.MaxWorkers)",
+        )
+        grade_parser.add_argument(
+            "--template",
+            help="Path to the assignment template whose boilerplate is stripped",
+        )
+        grade_parser.add_argument(
+            "--model",
+            help="Model to use for grading, or 'auto' to route each submission "
+            "using the [Routing] table",
         )
         grade_parser.add_argument(
             "--temp", type=float, help="Temperature setting (0-1) for the model"
         )
 
+        # Results command
+        results_parser = subparsers.add_parser(
+            "results", help="Show the latest result for each submission"
+        )
+        results_parser.add_argument(
+            "--run", type=int, help="Only results from this run id"
+        )
+        results_parser.add_argument(
+            "--student", help="Only results for this student (see StudentPattern)"
+        )
+        results_parser.add_argument(
+            "--runs", action="store_true", help="List recent runs instead"
+        )
+
+        # Search command
+        search_parser = subparsers.add_parser(
+            "search", help="Search all stored feedback"
+        )
+        search_parser.add_argument(
+            "query", nargs="+", help='Words or "exact phrase" to find'
+        )
+        search_parser.add_argument(
+            "--limit", type=int, default=20, help="Most hits shown (default 20)"
+        )
+        search_parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Include results superseded by a regrade",
+        )
+
+        # Archive command
+        archive_parser = subparsers.add_parser(
+            "archive", help="Show archived requests and responses"
+        )
+        archive_parser.add_argument("submission", help="Submission filename")
+        archive_parser.add_argument(
+            "--run", type=int, help="Only requests from this run id"
+        )
+        archive_parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Print the exact prompts and responses",
+        )
+
         # Interactive command
         subparsers.add_parser("interactive", help="Enter interactive mode")
 
@@ -105,6 +189,12 @@ class AIAssessorCLI:
             return self.handle_config_command(parsed_args)
         elif parsed_args.command == "grade":
             return self.handle_grade_command(parsed_args)
+        elif parsed_args.command == "results":
+            return self.handle_results_command(parsed_args)
+        elif parsed_args.command == "search":
+            return self.handle_search_command(parsed_args)
+        elif parsed_args.command == "archive":
+            return self.handle_archive_command(parsed_args)
         elif parsed_args.command == "interactive":
             return self.start_interactive_mode()
         else:
@@ -154,6 +244,115 @@ class AIAssessorCLI:
 
         return 0
 
+    def handle_results_command(self, args):
+        """
+        Handle the results command.
+
+        Args:
+            args: Parsed command-line arguments
+
+        Returns:
+            int: Exit code
+        """
+        store = self.assessor.results_store
+        if store is None:
+            print("Error: No results database. Set Paths.ResultsDatabase in config.")
+            return 1
+
+        if args.runs:
+            for run in store.runs():
+                print(
+                    f"Run {run['id']}: {run['started']}  model={run['model']}  "
+                    f"results={run['results']}  prompt={(run['prompt_hash'] or '')[:12]}"
+                )
+            return 0
+
+        student = args.student.strip().lower() if args.student else None
+        records = store.latest_results(run_id=args.run, student=student)
+        if not records:
+            print("No results found.")
+            return 0
+        for record in records:
+            total = ""
+            if record["total"] is not None:
+                total = f"  {record['total']:g}/{record['max_total']:g}"
+            folder = f"  [{record['folder']}]" if record["folder"] else ""
+            print(
+                f"{record['submission']}: {record['status']}{total}  "
+                f"({record['model']}, run {record['run_id']}, {record['created']})"
+                f"{folder}"
+            )
+        return 0
+
+    def handle_search_command(self, args):
+        """
+        Handle the search command.
+
+        Args:
+            args: Parsed command-line arguments
+
+        Returns:
+            int: Exit code
+        """
+        store = self.assessor.results_store
+        if store is None:
+            print("Error: No results database. Set Paths.ResultsDatabase in config.")
+            return 1
+
+        query = " ".join(args.query)
+        hits = store.search(query, limit=args.limit, latest_only=not args.all)
+        if not hits:
+            print(f"No feedback matches {query}")
+            return 0
+        for hit in hits:
+            folder = f"  [{hit['folder']}]" if hit["folder"] else ""
+            print(
+                f"{hit['submission']} (run {hit['run_id']}, {hit['created']}){folder}"
+            )
+            print(f"    {' '.join((hit['snippet'] or '').split())}")
+        return 0
+
+    def handle_archive_command(self, args):
+        """
+        Handle the archive command.
+
+        Args:
+            args: Parsed command-line arguments
+
+        Returns:
+            int: Exit code
+        """
+        archive = self.assessor.archive
+        if archive is None:
+            print("Error: No request archive. Set Archive.Folder in config.")
+            return 1
+
+        entries = archive.find(submission=args.submission, run_id=args.run)
+        if not entries:
+            print(f"No archived requests for {args.submission}")
+            return 0
+        for entry in entries:
+            print(
+                f"{entry['created']}  run {entry['run_id']}  {entry['model']}  "
+                f"system {entry['system_hash'][:12]}  "
+                f"({entry['segment']} @ {entry['offset']})"
+            )
+            if not args.full:
+                continue
+            record = archive.read(entry)
+            print("--- system ---")
+            print(record["system_content"])
+            print("--- user ---")
+            print(record["user_content"])
+            print(f"--- settings: {record.get('settings')} ---")
+            if "error" in record:
+                print(f"--- error ---\n{record['error']}")
+            else:
+                print("--- response ---")
+                print(record["response"]["content"])
+            print()
+        return 0
+
     def list_config(self):
         """List all configuration settings."""
         print("AI Assessor Configuration:")
@@ -163,6 +362,8 @@ class AIAssessorCLI:
             print(f"[{section}]")
             for option in self.config_manager.config.options(section):
                 value = self.config_manager.get_value(section, option)
+                if option.lower() == "key":
+                    value = ", ".join(KeyPool.mask(k) for k in KeyPool.parse(value))
                 print(f"  {option} = {value}")
             print()
 
@@ -189,10 +390,30 @@ class AIAssessorCLI:
         output_folder = args.output or self.config_manager.get_value(
             "Paths", "OutputFolder"
         )
+        template_file = args.template or self.config_manager.get_value(
+            "Paths", "TemplatePath", ""
+        )
+        rubric_file = args.rubric or self.config_manager.get_value(
+            "Paths", "RubricPath", ""
+        )
         model = args.model or self.config_manager.get_value(
             "API", "DefaultModel", "GPT-4"
         )
 
+        # Ensemble models (comma-separated) and samples per model
+        ensemble_models = None
+        if args.ensemble is not None:
+            models_str = args.ensemble or self.config_manager.get_value(
+                "Ensemble", "Models", ""
+            )
+            ensemble_models = [m.strip() for m in models_str.split(",") if m.strip()]
+            if not ensemble_models:
+                print(
+                    "Error: No ensemble models given. Use --ensemble or Ensemble.Models"
+                )
+                return 1
+        samples = args.samples or self.config_manager.get_int("Ensemble", "Samples", 1)
+
         # Parse temperature
         try:
             if args.temp is not None:
@@ -246,25 +467,58 @@ class AIAssessorCLI:
             print(f"Using model: {model}, temperature: {temperature}")
 
             try:
-                success, feedback = self.assessor.grade_submission(
-                    submission_file=args.file,
-                    system_prompt=system_prompt,
-                    user_prompt=user_prompt,
-                    support_files=support_folder,
-                    output_folder=output_folder,
-                    model=model,
-                    temperature=temperature,
+                run = self.assessor.start_results_run(
+                    model, system_prompt, user_prompt, output_folder
                 )
-
-                if success:
-                    print("✓ Grading successful")
-                    if output_folder:
-                        feedback_filename = os.path.basename(args.file).replace(
-                            ".docx", "_feedback.txt"
+                started = time.monotonic()
+                with archive_scope([args.file], run["id"] if run else None):
+                    if ensemble_models:
+                        print(f"Ensemble: {', '.join(ensemble_models)} x {samples}")
+                        result = self.assessor.grade_ensemble(
+                            submission_file=args.file,
+                            system_prompt=system_prompt,
+                            user_prompt=user_prompt,
+                            models=ensemble_models,
+                            support_files=support_folder,
+                            output_folder=output_folder,
+                            temperature=temperature,
+                            samples=samples,
+                            template_file=template_file,
+                            rubric_file=rubric_file,
                         )
-                        print(
-                            f"  Feedback saved to: {os.path.join(output_folder, feedback_filename)}"
+                    else:
+                        result = self.assessor.grade_submission_result(
+                            submission_file=args.file,
+                            system_prompt=system_prompt,
+                            user_prompt=user_prompt,
+                            support_files=support_folder,
+                            output_folder=output_folder,
+                            model=model,
+                            temperature=temperature,
+                            template_file=template_file,
+                            rubric_file=rubric_file,
+                            per_criterion=True if args.per_criterion else None,
                         )
+                self.assessor.wait_for_feedback(result)
+                for _, message in self.assessor.flush_feedback():
+                    print(f"Error writing feedback: {message}")
+                self.assessor.store_result(
+                    run,
+                    args.file,
+                    result,
+                    time.monotonic() - started,
+                )
+                success, feedback = result["success"], result["feedback"]
+
+                if success:
+                    print(f"✓ Grading successful (model: {result['model']})")
+                    scores = result["scores"]
+                    if scores:
+                        print(f"  Total: {scores['total']} / {scores['max_total']}")
+                    if result["feedback_path"]:
+                        print(f"  Feedback saved to: {result['feedback_path']}")
+                    if ensemble_models:
+                        print(feedback)
                 else:
                     print(f"✗ Grading failed: {feedback}")
                     return 1
@@ -279,46 +533,108 @@ class AIAssessorCLI:
                 return 1
 
             try:
-                # Get all docx files
-                docx_files = FileUtils.get_docx_files(args.dir)
+                # Get the docx files to grade, without superseded attempts
+                docx_files, superseded = self.assessor.list_submissions(args.dir)
 
                 if not docx_files:
                     print("No submission files (*.docx) found in the directory.")
                     return 1
 
                 print(f"Found {len(docx_files)} submission files")
+                if superseded:
+                    print(f"Skipping {len(superseded)} superseded attempts:")
+                    for filename, latest in sorted(superseded.items()):
+                        print(f"  {filename} (superseded by {latest})")
                 print(f"Using model: {model}, temperature: {temperature}")
 
                 # Grade all submissions with progress bar
-                success_count = 0
-                fail_count = 0
-
-                for filename in tqdm(docx_files, desc="Grading submissions"):
-                    submission_path = os.path.join(args.dir, filename)
-
-                    try:
-                        success, feedback = self.assessor.grade_submission(
-                            submission_file=submission_path,
+                with tqdm(total=len(docx_files), desc="Grading submissions") as bar:
+
+                    def on_progress(filename, result):
+                        if not result["success"]:
+                            bar.write(
+                                f"✗ Failed to grade {filename}: {result['feedback']}"
+                            )
+                        elif ModelRouter.is_auto(model):
+                            bar.write(f"✓ {filename} -> {result['model']}")
+                        bar.update(1)
+
+                    success_count, fail_count, results = (
+                        self.assessor.grade_all_submissions(
+                            submissions_folder=args.dir,
                             system_prompt=system_prompt,
                             user_prompt=user_prompt,
                             support_files=support_folder,
                             output_folder=output_folder,
                             model=model,
                             temperature=temperature,
+                            template_file=template_file,
+                            rubric_file=rubric_file,
+                            per_criterion=True if args.per_criterion else None,
+                            ensemble_models=ensemble_models,
+                            samples=samples,
+                            pack=True if args.pack else None,
+                            progress_callback=on_progress,
+                            max_workers=args.workers,
                         )
+                    )
 
-                        if success:
-                            success_count += 1
-                        else:
-                            fail_count += 1
-                            print(f"✗ Failed to grade {filename}: {feedback}")
-                    except Exception as e:
-                        fail_count += 1
-                        print(f"✗ Error grading {filename}: {e}")
+                if "error" in results:
+                    print(f"Error processing submissions: {results['error']}")
+                    return 1
 
                 print(
                     f"Grading completed: {success_count} succeeded, {fail_count} failed"
                 )
+                needs_review = self.assessor.stats.get("needs_review")
+                if needs_review:
+                    print(f"Needs human review (not sent to the API): {needs_review}")
+                packed = self.assessor.stats.get("packed_submissions")
+                if packed:
+                    print(
+                        f"Packed {packed} submissions into "
+                        f"{self.assessor.stats.get('packed_requests')} requests"
+                    )
+                corrections = self.assessor.stats.get("total_corrections")
+                if corrections:
+                    print(f"Corrected model-reported totals: {corrections}")
+                reserve_saved = self.assessor.stats.get("max_tokens_saved")
+                reruns = self.assessor.stats.get("max_tokens_reruns")
+                if reserve_saved or reruns:
+                    print(
+                        f"Output reservation lowered by ~{reserve_saved} tokens "
+                        f"({reruns} reruns wasting "
+                        f"~{self.assessor.stats.get('max_tokens_rerun_tokens')} tokens)"
+                    )
+                continuations = self.assessor.stats.get("continuations")
+                if continuations:
+                    print(
+                        f"Truncated feedback continued {continuations} times "
+                        f"(~{self.assessor.stats.get('continuation_tokens')} tokens)"
+                    )
+                write_errors = self.assessor.stats.get("feedback_write_errors")
+                if write_errors:
+                    print(f"Feedback files that could not be written: {write_errors}")
+                tokens_saved = self.assessor.stats.get("template_tokens_saved")
+                if tokens_saved:
+                    print(f"Template boilerplate removed: ~{tokens_saved} tokens")
+                if output_folder:
+                    for name in (
+                        self.assessor.RESULTS_LOG_FILENAME,
+                        self.assessor.GRADEBOOK_FILENAME,
+                    ):
+                        path = os.path.join(output_folder, name)
+                        if os.path.exists(path):
+                            print(f"Wrote {path}")
+                self.print_render_stats()
+                self.print_cascade_stats()
+                self.print_endpoint_stats()
+                self.print_hedge_stats()
+                self.print_coalesced_stats()
+                self.print_concurrency_report()
+                if ensemble_models:
+                    disagreements = self.assessor.stats.get("ensemble_disagreements")
+                    print(f"Ensemble disagreements flagged: {disagreements}")
 
                 if fail_count > 0:
                     return 1
@@ -333,6 +649,84 @@ class AIAssessorCLI:
 
         return 0
 
+    def print_render_stats(self):
+        """Print the input size reduction from Markdown rendering, if used."""
+        stats = self.assessor.stats
+        chars_before = stats.get("render_chars_before")
+        if not chars_before:
+            return
+
+        chars_after = stats.get("render_chars_after")
+        tokens_before = stats.get("render_tokens_before")
+        tokens_after = stats.get("render_tokens_after")
+        reduction = 100.0 * (1 - chars_after / chars_before)
+        print(
+            f"Markdown rendering: {chars_before} -> {chars_after} chars, "
+            f"~{tokens_before} -> ~{tokens_after} tokens ({reduction:.1f}% smaller)"
+        )
+
+    def print_cascade_stats(self):
+        """Print escalation rate, latency and cost saved by the model cascade."""
+        stats = self.assessor.stats
+        submissions = stats.get("cascade_submissions")
+        if not submissions:
+            return
+
+        escalations = stats.get("cascade_escalations")
+        first_pass_avg = stats.get("cascade_first_pass_seconds") / submissions
+        print(
+            f"Model cascade: {escalations}/{submissions} escalated "
+            f"({100.0 * escalations / submissions:.1f}%), "
+            f"first pass avg {first_pass_avg:.1f}s"
+        )
+        if escalations:
+            premium_avg = stats.get("cascade_premium_seconds") / escalations
+            print(f"  Premium re-grade avg {premium_avg:.1f}s")
+        print(f"  Estimated cost saved: {stats.get('cascade_cost_saved'):.4f}")
+
+    def print_hedge_stats(self):
+        """Print how many requests were hedged and what the duplicates cost."""
+        stats = self.assessor.stats
+        hedged = stats.get("hedged_requests")
+        if not hedged:
+            return
+
+        print(
+            f"Hedged requests: {hedged} ({stats.get('hedge_wins')} won by the "
+            f"duplicate), ~{stats.get('hedge_extra_tokens')} extra tokens"
+        )
+
+    def print_coalesced_stats(self):
+        """Print how many identical requests shared a response in flight."""
+        coalesced = self.assessor.stats.get("coalesced_requests")
+        if coalesced:
+            print(f"Identical requests coalesced: {coalesced}")
+
+    def print_concurrency_report(self):
+        """Print the concurrency adaptive limits settled on."""
+        report = self.assessor.concurrency_report()
+        if not report:
+            return
+
+        print("Adaptive concurrency settled at:")
+        for name, limits in report.items():
+            for model, limit in limits.items():
+                print(f"  {name} / {model}: {limit}")
+
+    def print_endpoint_stats(self):
+        """Print how many requests each configured endpoint served."""
+        pool = self.assessor.endpoint_pool
+        if not pool:
+            return
+
+        print("Endpoints:")
+        for endpoint in pool.endpoints:
+            state = "healthy" if endpoint.is_healthy() else "cooling down"
+            print(
+                f"  {endpoint.name}: {endpoint.served} served, "
+                f"{endpoint.failures} failed ({state})"
+            )
+
     def start_interactive_mode(self):
         """
         Start interactive CLI mode.
@@ -377,6 +771,9 @@ class AIAssessorCLI:
         print("  config --get KEY          Get a configuration value")
         print("  grade --file FILE         Grade a single submission file")
         print("  grade --dir DIRECTORY     Grade all submissions in a directory")
+        print("  results [--run ID]        Show the latest result for each submission")
+        print("  search QUERY              Search all stored feedback")
+        print("  archive FILE [--full]     Show archived requests for a submission")
         print("  help                      Show this help message")
         print("  exit                      Exit interactive mode")
         print()
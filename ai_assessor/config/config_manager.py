@@ -16,6 +16,10 @@ class ConfigManager:
             "SupportFolder": "",
             "SubmissionsFolder": "",
             "OutputFolder": "",
+            "TemplatePath": "",
+            "RubricPath": "",
+            "ResultsDatabase": "aiassessor.db",
+            "FeedbackTemplate": "",
         },
         "API": {
             "Key": "",
@@ -23,12 +27,84 @@ class ConfigManager:
             "Temperature": "0.7",
             "BaseURL": "",
             "SSLVerify": "True",
+            "KeyTokensPerMinute": "0",
+            "KeyRequestsPerMinute": "0",
+            "HedgeRequests": "False",
+            "HedgePercentile": "95",
+            "HedgeMinSamples": "10",
+            "CoalesceRequests": "True",
+            "ConnectTimeout": "10",
+            "ReadTimeout": "600",
+            "RequestTimeout": "0",
+            "MaxContinuations": "2",
+        },
+        "Processing": {
+            "RenderMode": "text",
+            "ScreenSubmissions": "True",
+            "ScreenMinWords": "25",
+            "ScreenMaxTemplateFraction": "0.95",
+            "ScreenMinTextFraction": "0.5",
+        },
+        "Grading": {
+            "PerCriterion": "False",
+            "PerCriterionMaxTokens": "1200",
+            "MaxParallelRequests": "6",
+            "AdaptiveMaxTokens": "False",
+            "MaxTokensPercentile": "95",
+            "MaxTokensMargin": "0.2",
+            "MaxTokensMinSamples": "10",
+        },
+        "Ensemble": {
+            "Models": "",
+            "Samples": "1",
+            "DisagreementThreshold": "10",
+        },
+        "Batch": {
+            "PackSubmissions": "False",
+            "PackTokenBudget": "6000",
+            "PackMaxSubmissions": "4",
+            "PackMaxOutputTokens": "4000",
+            "EndpointSlowSeconds": "60",
+            "EndpointCooldown": "30",
+            "AdaptiveConcurrency": "False",
+            "AdaptiveInitialConcurrency": "2",
+            "AdaptiveMaxConcurrency": "16",
+            "AdaptiveLatencyFactor": "2.0",
+            "Deadline": "0",
+            "MaxInFlightPromptBytes": "0",
+            "ResultsLog": "True",
+            "ResultsSyncEvery": "20",
+            "ResultsSyncSeconds": "2",
+            "WriteBehind": "True",
+            "FeedbackSyncEvery": "20",
+            "FeedbackQueueSize": "256",
+            "FeedbackDocx": "False",
+            "LatestAttemptOnly": "False",
+            "StudentPattern": r"^(?P<student>[^_.]+)(?:.*?attempt[_-]?(?P<attempt>[\d-]+))?",
+        },
+        "Archive": {
+            "Folder": "",
+            "SegmentMB": "64",
+            "CompressionLevel": "6",
+        },
+        "Routing": {
+            # name = model, max_context, relative_speed, cost; used with model "auto"
         },
         "Models": {
             # Default models - will be populated from provider
+            "CascadeEnabled": "False",
+            "CascadeFirstPassModel": "",
+            "CascadeConfidenceThreshold": "0.75",
+            "CascadeBoundaries": "50, 65, 75, 85",
+            "CascadeBoundaryMargin": "3",
+            "CascadeFirstPassCost": "0.0006",
+            "CascadePremiumCost": "0.01",
         },
     }
 
+    # Options in [Models] with these prefixes are settings, not models
+    MODEL_SETTING_PREFIXES = ("cascade",)
+
     def __init__(self, config_file="config.ini"):
         """
         Initialize the configuration manager.
@@ -98,6 +174,59 @@ class ConfigManager:
             ErrorHandler.handle_validation_error(e, f"{section}.{option}")
             return default
 
+    def get_bool(self, section, option, default=False):
+        """
+        Get a configuration value as a boolean.
+
+        Args:
+            section (str): Configuration section
+            option (str): Configuration option
+            default (bool): Default value if not found or invalid
+
+        Returns:
+            bool: Configuration value or default
+        """
+        value = self.get_value(section, option)
+        if value is None or str(value).strip() == "":
+            return default
+        return str(value).strip().lower() in ("true", "yes", "on", "1")
+
+    def get_int(self, section, option, default=0):
+        """
+        Get a configuration value as an integer.
+
+        Args:
+            section (str): Configuration section
+            option (str): Configuration option
+            default (int): Default value if not found or invalid
+
+        Returns:
+            int: Configuration value or default
+        """
+        try:
+            return int(self.get_value(section, option, default))
+        except (TypeError, ValueError) as e:
+            ErrorHandler.handle_validation_error(e, f"{section}.{option}")
+            return default
+
+    def get_float(self, section, option, default=0.0):
+        """
+        Get a configuration value as a float.
+
+        Args:
+            section (str): Configuration section
+            option (str): Configuration option
+            default (float): Default value if not found or invalid
+
+        Returns:
+            float: Configuration value or default
+        """
+        try:
+            return float(self.get_value(section, option, default))
+        except (TypeError, ValueError) as e:
+            ErrorHandler.handle_validation_error(e, f"{section}.{option}")
+            return default
+
     def set_value(self, section, option, value):
         """
         Set a configuration value.
@@ -139,6 +268,47 @@ class ConfigManager:
             ErrorHandler.handle_file_error(e, self.config_file)
             return False
 
+    def is_model_setting(self, option):
+        """
+        Check whether an option in [Models] is a setting rather than a model.
+
+        Args:
+            option (str): Option name in the Models section
+
+        Returns:
+            bool: True for settings such as the cascade configuration
+        """
+        return option.lower().startswith(self.MODEL_SETTING_PREFIXES)
+
+    def get_model_keys(self):
+        """
+        Get the model keys configured in the Models section.
+
+        Returns:
+            list: Model keys, excluding settings stored in the same section
+        """
+        if not self.config.has_section("Models"):
+            return []
+        return [
+            option
+            for option in self.config.options("Models")
+            if not self.is_model_setting(option)
+        ]
+
+    def replace_models(self, model_ids):
+        """
+        Replace the configured models while keeping Models settings.
+
+        Args:
+            model_ids (list): Model IDs to store (key and value are the same)
+        """
+        if not self.config.has_section("Models"):
+            self.config.add_section("Models")
+        for option in self.get_model_keys():
+            self.config.remove_option("Models", option)
+        for model_id in model_ids:
+            self.set_value("Models", model_id, model_id)
+
     def get_model_name(self, model_key):
         """
         Get the actual model name from the model key.
@@ -1,4 +1,5 @@
 from .api_client import OpenAIClient
 from .assessor import Assessor
+from .batch_stats import BatchStats
 
-__all__ = ["OpenAIClient", "Assessor"]
+__all__ = ["OpenAIClient", "Assessor", "BatchStats"]
@@ -1,21 +1,85 @@
 import httpx
 import logging
-from openai import OpenAI
+import socket
+import threading
+from openai import (
+    APIConnectionError,
+    APIStatusError,
+    APITimeoutError,
+    OpenAI,
+    RateLimitError,
+)
+
+from ..utils.token_utils import TokenEstimator
+from .cancellation import CancellationToken, RequestCancelled
+from .key_pool import KeyPool
+
+
+class ResponseTruncated(Exception):
+    """
+    Raised when prose output is still cut off at max_tokens.
+
+    Attributes:
+        completion (dict): The truncated completion, as generate_completion
+            would have returned it
+    """
+
+    def __init__(self, message, completion):
+        super().__init__(message)
+        self.completion = completion
 
 
 class OpenAIClient:
-    """Client for OpenAI-compatible API providers."""
+    """
+    Client for OpenAI-compatible API providers.
 
-    def __init__(self, api_key, base_url=None, ssl_verify=True):
+    The API key may be a comma-separated list of keys for the same provider;
+    requests are then spread over the keys according to their rate limits.
+    """
+
+    # Follow-up message asking the model to finish a truncated response
+    CONTINUE_PROMPT = (
+        "Your previous response was cut off. Continue exactly where it stopped, "
+        "without repeating anything."
+    )
+
+    def __init__(
+        self,
+        api_key,
+        base_url=None,
+        ssl_verify=True,
+        tokens_per_minute=0,
+        requests_per_minute=0,
+        concurrency=None,
+        connect_timeout=10.0,
+        read_timeout=600.0,
+        request_timeout=0,
+        max_continuations=2,
+    ):
         self.api_key = api_key
         self.base_url = base_url
         self.ssl_verify = ssl_verify
+        self.tokens_per_minute = tokens_per_minute
+        self.requests_per_minute = requests_per_minute
+        # AdaptiveConcurrency controlling requests in flight, if enabled
+        self.concurrency = concurrency
+        # Seconds; a request_timeout of 0 means no overall limit
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.request_timeout = request_timeout
+        # Continuation requests allowed when a response hits max_tokens
+        self.max_continuations = max_continuations
         self.client = None
+        self.clients = {}
+        self.key_pool = None
+        # Each thread's abortable HTTP client for cancellable requests
+        self._thread_clients = threading.local()
 
     def initialize(self):
         """Initialize the API client for OpenAI-compatible providers."""
         # Validate required parameters
-        if not self.api_key:
+        keys = KeyPool.parse(self.api_key)
+        if not keys:
             raise ValueError("API key is required")
 
         if not self.base_url or self.base_url.strip() == "":
@@ -34,21 +98,66 @@ class OpenAIClient:
                 f"OpenAIClient.initialize - Base_url already ends with /v1: '{url}'"
             )
 
-        http_client = httpx.Client(verify=self.ssl_verify)
-        self.client = OpenAI(
-            api_key=self.api_key, base_url=url, http_client=http_client
+        timeout = httpx.Timeout(self.read_timeout, connect=self.connect_timeout)
+        http_client = httpx.Client(verify=self.ssl_verify, timeout=timeout)
+        self.key_pool = KeyPool(
+            keys,
+            tokens_per_minute=self.tokens_per_minute,
+            requests_per_minute=self.requests_per_minute,
         )
+        self.clients = {
+            key: OpenAI(
+                api_key=key, base_url=url, http_client=http_client, timeout=timeout
+            )
+            for key in self.key_pool.keys
+        }
+        self.client = self.clients[self.key_pool.keys[0]]
+        self._thread_clients = threading.local()
+        if len(self.clients) > 1:
+            logging.info(f"OpenAIClient.initialize - Using {len(self.clients)} keys")
 
-    def update(self, api_key, base_url, ssl_verify):
+    def update(
+        self,
+        api_key,
+        base_url,
+        ssl_verify,
+        tokens_per_minute=None,
+        requests_per_minute=None,
+        connect_timeout=None,
+        read_timeout=None,
+        request_timeout=None,
+        max_continuations=None,
+    ):
         """
         Update the API client with new settings.
         This is useful if the user changes settings in the UI.
+        Optional settings left as None keep their current value, and the
+        client is only rebuilt when a setting changed.
         """
-        self.api_key = api_key
-        self.base_url = base_url
-        self.ssl_verify = ssl_verify
+        settings = {
+            "api_key": api_key,
+            "base_url": base_url,
+            "ssl_verify": ssl_verify,
+            "tokens_per_minute": tokens_per_minute,
+            "requests_per_minute": requests_per_minute,
+            "connect_timeout": connect_timeout,
+            "read_timeout": read_timeout,
+            "request_timeout": request_timeout,
+            "max_continuations": max_continuations,
+        }
+        settings = {
+            name: getattr(self, name) if value is None else value
+            for name, value in settings.items()
+        }
+        if self.client and all(
+            getattr(self, name) == value for name, value in settings.items()
+        ):
+            return
+        for name, value in settings.items():
+            setattr(self, name, value)
+        masked = ", ".join(KeyPool.mask(key) for key in KeyPool.parse(api_key))
         logging.debug(
-            f"OpenAIClient.update: api_key={api_key}, base_url={base_url}, ssl_verify={ssl_verify}"
+            f"OpenAIClient.update: api_key={masked}, base_url={base_url}, ssl_verify={ssl_verify}"
         )
         self.initialize()
 
@@ -70,7 +179,14 @@ class OpenAIClient:
             raise Exception(f"API call failed: {str(e)}")
 
     def generate_assessment(
-        self, system_content, user_content, model, temperature=0.7, max_tokens=3500
+        self,
+        system_content,
+        user_content,
+        model,
+        temperature=0.7,
+        max_tokens=3500,
+        response_format=None,
+        cancel_token=None,
     ):
         """
         Generate an assessment using the LLM provider's API.
@@ -81,6 +197,10 @@ class OpenAIClient:
             model (str): The model to use
             temperature (float): The temperature setting (0-1)
             max_tokens (int): Maximum tokens in the response
+            response_format (dict, optional): Structured output format, e.g. a
+                JSON schema built from a rubric
+            cancel_token (CancellationToken, optional): Token that aborts the
+                request
 
         Returns:
             str: The generated feedback
@@ -88,9 +208,87 @@ class OpenAIClient:
         Raises:
             Exception: If API call fails
         """
+        return self.generate_completion(
+            system_content,
+            user_content,
+            model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            response_format=response_format,
+            cancel_token=cancel_token,
+        )["content"]
+
+    def generate_completion(
+        self,
+        system_content,
+        user_content,
+        model,
+        temperature=0.7,
+        max_tokens=3500,
+        response_format=None,
+        logprobs=False,
+        n=1,
+        cancel_token=None,
+        on_first_token=None,
+    ):
+        """
+        Generate a completion and return it with its metadata.
+
+        When a cancel token or first-token callback is given the response is
+        streamed, so the request can be abandoned between chunks. Prose cut
+        off at max_tokens is finished with up to max_continuations follow-up
+        requests that resend the partial answer, and the pieces are stitched
+        together.
+
+        Args:
+            system_content (str): The system prompt with any support materials
+            user_content (str): The user prompt with student submission
+            model (str): The model to use
+            temperature (float): The temperature setting (0-1)
+            max_tokens (int): Maximum tokens in the response
+            response_format (dict, optional): Structured output format
+            logprobs (bool): Request token log probabilities
+            n (int): Number of completions to sample from the same prompt
+            cancel_token (CancellationToken, optional): Token checked while
+                the response streams in
+            on_first_token (callable, optional): Called once when the first
+                content arrives
+
+        Returns:
+            dict: "content", "finish_reason", "model", "usage" (a dict with
+                prompt_tokens, completion_tokens and total_tokens), "logprobs"
+                (list of floats, or None if not requested/available) and
+                "choices" (the content of every returned completion),
+                "finish_reasons" (the finish reason of each completion),
+                "continuations" (follow-up requests made) and
+                "continuation_tokens" (tokens they used, included in usage)
+
+        Raises:
+            RequestCancelled: If the cancel token was cancelled
+            ResponseTruncated: If prose output is cut off at max_tokens and
+                could not be continued (several samples, continuations
+                disabled or used up); structured output is returned as is
+            Exception: If API call fails
+        """
         import logging
 
+        # The overall request timeout cancels a child of the caller's token
+        request_token = cancel_token
+        if self.request_timeout:
+            request_token = (
+                cancel_token.child(self.request_timeout)
+                if cancel_token is not None
+                else CancellationToken(timeout=self.request_timeout)
+            )
+
+        limiter = self.concurrency.limiter(model) if self.concurrency else None
+        started = None
+        outcome = "success"
         try:
+            # Adaptive concurrency: wait for a slot for this model
+            if limiter:
+                started = limiter.acquire(request_token)
+
             # Initialize client if not already done
             if not self.client:
                 self.initialize()
@@ -113,6 +311,16 @@ class OpenAIClient:
                     {"role": "user", "content": user_content},
                 ],
             }
+            if response_format:
+                params["response_format"] = response_format
+            if logprobs:
+                params["logprobs"] = True
+            if n > 1:
+                params["n"] = n
+            stream = request_token is not None or on_first_token is not None
+            if stream:
+                params["stream"] = True
+                params["stream_options"] = {"include_usage": True}
 
             # Check if this is a GPT-5 or reasoning model (o1, o3, o4, etc.)
             # These models require max_completion_tokens instead of max_tokens
@@ -137,17 +345,448 @@ class OpenAIClient:
                 params["max_tokens"] = max_tokens
                 params["temperature"] = temperature
 
-            # Use the new API format
-            response = self.client.chat.completions.create(**params)
+            # Use the new API format, on whichever key has headroom
+            prompt_tokens = TokenEstimator.estimate_tokens(
+                system_content
+            ) + TokenEstimator.estimate_tokens(user_content)
+            estimated_tokens = prompt_tokens + max_tokens * n
 
-            # Extract the response (new API format)
-            result = response.choices[0].message.content.strip()
-            logging.info(f"API call successful, response length: {len(result)} chars")
-            return result
+            def send(first_token_callback=None, http_client=None):
+                response = self._create_completion(
+                    params, estimated_tokens, http_client
+                )
+                if stream:
+                    return self._read_stream(
+                        response,
+                        request_token,
+                        first_token_callback,
+                        prompt_tokens,
+                    )
+                return self._response_to_dict(response)
+
+            def run(first_token_callback=None):
+                if request_token is None:
+                    return send(first_token_callback)
+                # A cancellable request goes out on this thread's abortable
+                # client, shut down on cancellation so the request stops at
+                # once instead of running on until the read timeout
+                http_client, abort = self._thread_http_client()
+                request_token.add_callback(abort)
+                try:
+                    return self._run_cancellable(
+                        lambda: send(first_token_callback, http_client),
+                        request_token,
+                    )
+                finally:
+                    request_token.remove_callback(abort)
+
+            completion = run(on_first_token)
+
+            # Continue truncated prose instead of regenerating it. Structured
+            # output is left alone: a continuation cannot satisfy the schema.
+            completion["continuations"] = 0
+            completion["continuation_tokens"] = 0
+            messages = params["messages"]
+            while (
+                completion["finish_reason"] == "length"
+                and not response_format
+                and n == 1
+                and completion["continuations"] < self.max_continuations
+            ):
+                logging.info(
+                    f"Response truncated at {len(completion['content'])} chars; "
+                    f"continuing"
+                )
+                params["messages"] = messages + [
+                    {"role": "assistant", "content": completion["content"]},
+                    {"role": "user", "content": self.CONTINUE_PROMPT},
+                ]
+                continuation = run()
+                completion["content"] += continuation["content"]
+                completion["choices"] = [completion["content"]]
+                completion["finish_reason"] = continuation["finish_reason"]
+                completion["finish_reasons"] = [continuation["finish_reason"]]
+                completion["logprobs"] = None
+                completion["usage"] = {
+                    name: completion["usage"][name] + continuation["usage"][name]
+                    for name in completion["usage"]
+                }
+                completion["continuations"] += 1
+                completion["continuation_tokens"] += continuation["usage"][
+                    "total_tokens"
+                ]
+            # Truncated prose is never returned as if it were complete:
+            # not when continuations ran out, are disabled (MaxContinuations
+            # = 0) or do not apply (several samples)
+            truncated = completion["finish_reasons"].count("length")
+            if truncated and not response_format:
+                if completion["continuations"]:
+                    message = (
+                        f"Response still truncated after "
+                        f"{completion['continuations']} continuations"
+                    )
+                else:
+                    message = (
+                        f"Response truncated at {max_tokens} tokens "
+                        f"({truncated} of {len(completion['finish_reasons'])} "
+                        f"completions)"
+                    )
+                raise ResponseTruncated(message, completion)
+
+            completion["content"] = completion["content"].strip()
+            completion["choices"] = [choice.strip() for choice in completion["choices"]]
+            completion["model"] = completion["model"] or model
+            logging.info(
+                f"API call successful, response length: "
+                f"{len(completion['content'])} chars"
+            )
+            return completion
+        except RequestCancelled:
+            outcome = None
+            logging.info(f"API call cancelled: {model}")
+            raise
+        except ResponseTruncated as e:
+            # The provider answered normally; the answer was too long
+            logging.error(f"API call failed with error: {str(e)}")
+            raise
         except Exception as e:
+            outcome = "overload" if self.is_overload(e) else "error"
             logging.error(f"API call failed with error: {str(e)}")
             logging.error(f"Error type: {type(e).__name__}")
             import traceback
 
             logging.error(f"Full traceback: {traceback.format_exc()}")
             raise Exception(f"API call failed: {str(e)}")
+        finally:
+            if started is not None:
+                limiter.release(started, outcome)
+            if request_token is not cancel_token:
+                request_token.detach()
+
+    @staticmethod
+    def is_overload(error):
+        """
+        Check whether a failed request means the provider is overloaded.
+
+        Args:
+            error (Exception): Error raised by a request, possibly wrapping
+                the provider's error
+
+        Returns:
+            bool: True for rate limits and timeouts
+        """
+        while error is not None:
+            if isinstance(error, (RateLimitError, APITimeoutError)):
+                return True
+            error = error.__cause__ or error.__context__
+        return False
+
+    @staticmethod
+    def is_endpoint_failure(error):
+        """
+        Check whether a failed request points at the server, not the request.
+
+        Rate limits, timeouts, connection errors and server errors (5xx) are
+        worth retrying elsewhere; a bad request, a prompt that is too long,
+        an authentication error or a truncated answer are not.
+
+        Args:
+            error (Exception): Error raised by a request, possibly wrapping
+                the provider's error
+
+        Returns:
+            bool: True if another endpoint may succeed
+        """
+        while error is not None:
+            if isinstance(
+                error, (RateLimitError, APIConnectionError, httpx.TransportError)
+            ):
+                return True
+            if isinstance(error, APIStatusError) and error.status_code >= 500:
+                return True
+            error = error.__cause__ or error.__context__
+        return False
+
+    @staticmethod
+    def _run_cancellable(send, cancel_token):
+        """
+        Run a request so the caller is released as soon as it is cancelled.
+
+        The request runs on a helper thread. On cancellation the caller gets
+        RequestCancelled immediately; send is expected to close its
+        connection on the same token, which ends the helper thread.
+
+        Args:
+            send (callable): Function sending the request
+            cancel_token (CancellationToken): Token for this request
+
+        Returns:
+            The value returned by send
+
+        Raises:
+            RequestCancelled: If the token is cancelled first
+        """
+        cancel_token.raise_if_cancelled()
+        outcome = {}
+        finished = threading.Event()
+
+        def run():
+            try:
+                outcome["value"] = send()
+            except BaseException as e:
+                outcome["error"] = e
+            finally:
+                finished.set()
+
+        cancel_token.add_callback(finished.set)
+        threading.Thread(target=run, name="cancellable-request", daemon=True).start()
+        finished.wait()
+        cancel_token.remove_callback(finished.set)
+
+        if "error" in outcome:
+            raise outcome["error"]
+        if "value" in outcome:
+            return outcome["value"]
+        raise RequestCancelled(cancel_token.reason)
+
+    def _response_to_dict(self, response):
+        """
+        Convert a non-streamed chat completion to a completion dict.
+
+        Args:
+            response: Chat completion response
+
+        Returns:
+            dict: Same fields as generate_completion
+        """
+        choice = response.choices[0]
+        return {
+            "content": choice.message.content or "",
+            "finish_reason": choice.finish_reason,
+            "model": getattr(response, "model", None),
+            "usage": self._usage_to_dict(getattr(response, "usage", None)),
+            "logprobs": self._logprobs_to_list(getattr(choice, "logprobs", None)),
+            "choices": [item.message.content or "" for item in response.choices],
+            "finish_reasons": [item.finish_reason for item in response.choices],
+        }
+
+    def _thread_http_client(self):
+        """
+        Get the calling thread's abortable HTTP client.
+
+        Each thread keeps one client, so a worker's connections are reused
+        across its requests like those of the shared client. Closing an httpx
+        client does not interrupt a thread blocked reading from it, so the
+        client's sockets are recorded (through the httpcore trace extension)
+        and shut down on abort. An aborted client is replaced on the
+        thread's next request.
+
+        Returns:
+            tuple: (httpx.Client with this provider's SSL and timeout
+                settings, function that aborts its requests from any thread)
+        """
+        current = getattr(self._thread_clients, "client", None)
+        if current is not None and not current[0].is_closed:
+            return current
+
+        sockets = []
+
+        def trace(event_name, info):
+            if event_name == "connection.connect_tcp.complete":
+                sock = info["return_value"].get_extra_info("socket")
+                if sock is not None:
+                    # Forget connections the pool has since closed
+                    sockets[:] = [known for known in sockets if known.fileno() != -1]
+                    sockets.append(sock)
+
+        def add_trace(request):
+            request.extensions["trace"] = trace
+
+        timeout = httpx.Timeout(self.read_timeout, connect=self.connect_timeout)
+        http_client = httpx.Client(
+            verify=self.ssl_verify,
+            timeout=timeout,
+            event_hooks={"request": [add_trace]},
+        )
+
+        def abort():
+            for sock in list(sockets):
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+            http_client.close()
+
+        self._thread_clients.client = (http_client, abort)
+        return self._thread_clients.client
+
+    def _create_completion(self, params, estimated_tokens, http_client=None):
+        """
+        Send a chat completion on the key with the most headroom.
+
+        A key that hits the provider's rate limit is rested and the request
+        moves to the next key.
+
+        Args:
+            params (dict): Chat completion parameters
+            estimated_tokens (int): Estimated prompt and output tokens
+            http_client (httpx.Client, optional): Client to send the
+                request on instead of the shared one
+
+        Returns:
+            The chat completion response
+
+        Raises:
+            RateLimitError: If every key is rate limited
+        """
+        tried = set()
+        while True:
+            key = self.key_pool.acquire(estimated_tokens, exclude=tried)
+            tried.add(key)
+            try:
+                client = self.clients[key]
+                if http_client is not None:
+                    client = client.with_options(http_client=http_client)
+                response = client.chat.completions.create(**params)
+            except RateLimitError as e:
+                self.key_pool.record(key, estimated_tokens, 0)
+                retry_after = e.response.headers.get("retry-after")
+                try:
+                    retry_after = float(retry_after)
+                except (TypeError, ValueError):
+                    retry_after = None
+                self.key_pool.rest(key, retry_after)
+                logging.warning(f"Rate limited on key {KeyPool.mask(key)}")
+                if len(tried) >= len(self.clients):
+                    raise
+                continue
+            except Exception:
+                self.key_pool.record(key, estimated_tokens, 0)
+                raise
+
+            usage = getattr(response, "usage", None)
+            self.key_pool.record(
+                key, estimated_tokens, getattr(usage, "total_tokens", 0) or 0
+            )
+            return response
+
+    def _read_stream(self, stream, cancel_token, on_first_token, prompt_tokens):
+        """
+        Collect a streamed completion.
+
+        Cancelling the token closes the stream at once, which drops the
+        connection and stops generation on the server.
+
+        Args:
+            stream: Streaming chat completion response
+            cancel_token (CancellationToken, optional): Token for this request
+            on_first_token (callable, optional): Called when content first
+                arrives
+            prompt_tokens (int): Estimated prompt tokens, reported if the
+                request is cancelled
+
+        Returns:
+            dict: Same fields as generate_completion
+
+        Raises:
+            RequestCancelled: If the token is cancelled mid-stream
+        """
+        contents = {}
+        finish_reasons = {}
+        logprobs = []
+        usage = None
+        model = None
+
+        def cancelled():
+            completion_tokens = TokenEstimator.estimate_tokens(
+                "".join(contents.values())
+            )
+            return RequestCancelled(
+                cancel_token.reason,
+                usage={
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            )
+
+        if cancel_token is not None:
+            cancel_token.add_callback(stream.close)
+        try:
+            for chunk in stream:
+                if cancel_token is not None and cancel_token.cancelled:
+                    raise cancelled()
+                model = model or getattr(chunk, "model", None)
+                usage = getattr(chunk, "usage", None) or usage
+                for choice in chunk.choices or []:
+                    text = getattr(choice.delta, "content", None)
+                    if text:
+                        if on_first_token is not None and not contents:
+                            on_first_token()
+                        contents[choice.index] = contents.get(choice.index, "") + text
+                    if choice.finish_reason:
+                        finish_reasons[choice.index] = choice.finish_reason
+                    if choice.index == 0:
+                        logprobs.extend(
+                            self._logprobs_to_list(getattr(choice, "logprobs", None))
+                            or []
+                        )
+        except RequestCancelled:
+            raise
+        except Exception:
+            # Reading a stream closed by cancellation fails; report why
+            if cancel_token is not None and cancel_token.cancelled:
+                raise cancelled() from None
+            raise
+        finally:
+            if cancel_token is not None:
+                cancel_token.remove_callback(stream.close)
+            stream.close()
+        if cancel_token is not None and cancel_token.cancelled and not finish_reasons:
+            # The stream was cut short by cancellation
+            raise cancelled()
+
+        choices = [contents[index] for index in sorted(contents)]
+        return {
+            "content": contents.get(0, ""),
+            "finish_reason": finish_reasons.get(0),
+            "model": model,
+            "usage": self._usage_to_dict(usage),
+            "logprobs": logprobs or None,
+            "choices": choices or [""],
+            "finish_reasons": [finish_reasons.get(index) for index in sorted(contents)]
+            or [finish_reasons.get(0)],
+        }
+
+    @staticmethod
+    def _logprobs_to_list(logprobs):
+        """
+        Extract per-token log probabilities from a choice.
+
+        Args:
+            logprobs: Logprobs object from the choice (may be None)
+
+        Returns:
+            list: Log probability of each output token, or None
+        """
+        content = getattr(logprobs, "content", None)
+        if not content:
+            return None
+        return [token.logprob for token in content]
+
+    @staticmethod
+    def _usage_to_dict(usage):
+        """
+        Convert an API usage object to a plain dict.
+
+        Args:
+            usage: Usage object from the response (may be None)
+
+        Returns:
+            dict: prompt_tokens, completion_tokens and total_tokens
+        """
+        return {
+            "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+            "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+            "total_tokens": getattr(usage, "total_tokens", 0) or 0,
+        }
@@ -0,0 +1,375 @@
+import contextvars
+import glob
+import hashlib
+import json
+import os
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+
+from ..utils.error_handling import ErrorHandler
+from .cancellation import RequestCancelled
+
+# Run and submissions that requests made in this context belong to
+_scope = contextvars.ContextVar("archive_scope", default=None)
+
+
+@contextmanager
+def archive_scope(submission_files=(), run_id=None):
+    """
+    Attribute requests made inside the block to submissions and a run.
+
+    Unset values are inherited from an enclosing scope. Worker threads do
+    not inherit the scope; run their work through contextvars.copy_context.
+
+    Args:
+        submission_files (list): Paths of the submissions being graded
+        run_id (int, optional): Results database run id
+    """
+    parent = _scope.get() or {}
+    token = _scope.set(
+        {
+            "run_id": run_id if run_id is not None else parent.get("run_id"),
+            "submissions": list(submission_files) or parent.get("submissions", []),
+        }
+    )
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+
+class RequestArchive:
+    """
+    Append-only, compressed archive of every request and response.
+
+    Each distinct system content is stored once under its SHA-256 in
+    system/. Requests are stored as zlib-compressed JSON frames (a 4-byte
+    length, then the compressed record) appended to segment files in
+    segments/; a new segment is started when the current one reaches
+    segment_bytes, and on every open, so a segment cut off by a crash is
+    never appended to. An SQLite index maps each submission and run to the
+    segment and offset of its frames, so any record is read with one seek.
+    """
+
+    INDEX_SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS records (
+            id INTEGER PRIMARY KEY,
+            run_id INTEGER,
+            submission TEXT,
+            folder TEXT,
+            model TEXT,
+            system_hash TEXT NOT NULL,
+            segment TEXT NOT NULL,
+            offset INTEGER NOT NULL,
+            length INTEGER NOT NULL,
+            created TEXT NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_records_submission "
+        "ON records(submission, id)",
+        "CREATE INDEX IF NOT EXISTS idx_records_run ON records(run_id, id)",
+    )
+
+    FRAME_HEADER = struct.Struct(">I")
+
+    def __init__(self, folder, segment_bytes=64 * 1024 * 1024, level=6):
+        """
+        Open (and create if needed) the archive.
+
+        Args:
+            folder (str): Archive folder
+            segment_bytes (int): Size at which a new segment is started
+            level (int): zlib compression level (1-9)
+        """
+        self.folder = folder
+        self.segment_bytes = max(1, segment_bytes)
+        self.level = level
+        self._lock = threading.Lock()
+        self._system_hashes = set()
+        os.makedirs(os.path.join(folder, "system"), exist_ok=True)
+        os.makedirs(os.path.join(folder, "segments"), exist_ok=True)
+
+        self._connection = sqlite3.connect(
+            os.path.join(folder, "index.db"), check_same_thread=False
+        )
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        for statement in self.INDEX_SCHEMA:
+            self._connection.execute(statement)
+        self._connection.commit()
+
+        existing = glob.glob(os.path.join(folder, "segments", "*.seg"))
+        self._segment_number = max(
+            (int(os.path.basename(path)[:-4]) for path in existing), default=0
+        )
+        self._segment = None
+
+    def _system_path(self, system_hash):
+        """Path of a stored system content."""
+        return os.path.join(self.folder, "system", f"{system_hash}.zlib")
+
+    def _store_system(self, system_content):
+        """
+        Store a system content once.
+
+        Returns:
+            str: Its SHA-256 hex digest
+        """
+        data = (system_content or "").encode("utf-8")
+        system_hash = hashlib.sha256(data).hexdigest()
+        if system_hash in self._system_hashes:
+            return system_hash
+        path = self._system_path(system_hash)
+        if not os.path.exists(path):
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(zlib.compress(data, self.level))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, path)
+        self._system_hashes.add(system_hash)
+        return system_hash
+
+    def _open_segment(self):
+        """Start the next segment file."""
+        if self._segment is not None:
+            self._segment.flush()
+            os.fsync(self._segment.fileno())
+            self._segment.close()
+        self._segment_number += 1
+        name = f"{self._segment_number:06d}.seg"
+        self._segment = open(os.path.join(self.folder, "segments", name), "ab")
+        self._segment_name = name
+
+    def record(self, system_content, record, submissions=(), run_id=None):
+        """
+        Append one request and its response.
+
+        Args:
+            system_content (str): System content sent
+            record (dict): Everything else about the request (JSON-compatible)
+            submissions (list): Paths of the submissions the request graded
+            run_id (int, optional): Results database run id
+
+        Returns:
+            int: Offset of the frame in its segment
+        """
+        created = time.strftime("%Y-%m-%dT%H:%M:%S")
+        with self._lock:
+            system_hash = self._store_system(system_content)
+            payload = dict(
+                record,
+                system_hash=system_hash,
+                time=created,
+                run_id=run_id,
+                submissions=[os.path.basename(path) for path in submissions],
+            )
+            frame = zlib.compress(
+                json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8"),
+                self.level,
+            )
+            if self._segment is None or (
+                self._segment.tell()
+                and self._segment.tell() + len(frame) > self.segment_bytes
+            ):
+                self._open_segment()
+            offset = self._segment.tell()
+            self._segment.write(self.FRAME_HEADER.pack(len(frame)) + frame)
+            self._segment.flush()
+
+            rows = [
+                (os.path.basename(path), os.path.abspath(os.path.dirname(path)))
+                for path in submissions
+            ] or [(None, None)]
+            self._connection.executemany(
+                "INSERT INTO records (run_id, submission, folder, model, "
+                "system_hash, segment, offset, length, created) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        run_id,
+                        submission,
+                        folder,
+                        record.get("model"),
+                        system_hash,
+                        self._segment_name,
+                        offset,
+                        len(frame),
+                        created,
+                    )
+                    for submission, folder in rows
+                ],
+            )
+            self._connection.commit()
+            return offset
+
+    def find(self, submission=None, run_id=None, limit=100):
+        """
+        List index entries, newest first.
+
+        Args:
+            submission (str, optional): Submission filename
+            run_id (int, optional): Results database run id
+            limit (int): Most entries returned
+
+        Returns:
+            list: Index rows (id, run_id, submission, folder, model, ...)
+        """
+        conditions = []
+        params = []
+        if submission is not None:
+            conditions.append("submission = ?")
+            params.append(submission)
+        if run_id is not None:
+            conditions.append("run_id = ?")
+            params.append(run_id)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT * FROM records {where} ORDER BY id DESC LIMIT ?",
+                params + [limit],
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def read(self, entry):
+        """
+        Read an archived request with its system content restored.
+
+        Args:
+            entry (dict): Index row from find
+
+        Returns:
+            dict: The archived record, including "system_content"
+        """
+        with self._lock:
+            if self._segment is not None:
+                self._segment.flush()
+        path = os.path.join(self.folder, "segments", entry["segment"])
+        with open(path, "rb") as f:
+            f.seek(entry["offset"])
+            (length,) = self.FRAME_HEADER.unpack(f.read(self.FRAME_HEADER.size))
+            record = json.loads(zlib.decompress(f.read(length)).decode("utf-8"))
+        with open(self._system_path(record["system_hash"]), "rb") as f:
+            record["system_content"] = zlib.decompress(f.read()).decode("utf-8")
+        return record
+
+    def close(self):
+        """Sync the current segment and close the archive."""
+        with self._lock:
+            if self._segment is not None:
+                self._segment.flush()
+                os.fsync(self._segment.fileno())
+                self._segment.close()
+                self._segment = None
+            self._connection.close()
+
+
+class ArchivingClient:
+    """
+    Archives every request and response passing through a client.
+
+    Wraps the client chain used for grading (outside request coalescing,
+    so every submission's request is archived). Requests are attributed to
+    the submissions and run of the enclosing archive_scope. Failed requests
+    are archived with their error; cancelled ones are not.
+    """
+
+    # Request arguments that do not shape the response
+    UNRECORDED = ("cancel_token", "on_first_token")
+
+    def __init__(self, client, archive):
+        """
+        Initialize the archiving client.
+
+        Args:
+            client: Client that sends requests
+            archive (RequestArchive): Archive to append to
+        """
+        self.client = client
+        self.archive = archive
+
+    def generate_completion(self, system_content, user_content, model, **kwargs):
+        """
+        Generate a completion and archive the exchange.
+
+        Takes the same arguments as OpenAIClient.generate_completion.
+
+        Returns:
+            dict: The completion
+        """
+        record = {
+            "model": model,
+            "user_content": user_content,
+            "settings": {
+                name: value
+                for name, value in kwargs.items()
+                if name not in self.UNRECORDED
+            },
+        }
+        try:
+            completion = self.client.generate_completion(
+                system_content, user_content, model, **kwargs
+            )
+        except RequestCancelled:
+            raise
+        except Exception as e:
+            record["error"] = str(e)
+            self._append(system_content, record)
+            raise
+
+        record["response"] = {
+            "content": completion.get("content"),
+            "usage": completion.get("usage"),
+            "finish_reason": completion.get("finish_reason"),
+        }
+        if len(completion.get("choices") or []) > 1:
+            record["response"]["choices"] = completion["choices"]
+        self._append(system_content, record)
+        return completion
+
+    def _append(self, system_content, record):
+        """Archive a record; archiving problems never fail grading."""
+        scope = _scope.get() or {}
+        try:
+            self.archive.record(
+                system_content,
+                record,
+                submissions=scope.get("submissions", []),
+                run_id=scope.get("run_id"),
+            )
+        except Exception as e:
+            ErrorHandler.handle_file_error(e, self.archive.folder)
+
+    def generate_assessment(
+        self,
+        system_content,
+        user_content,
+        model,
+        temperature=0.7,
+        max_tokens=3500,
+        response_format=None,
+        cancel_token=None,
+    ):
+        """
+        Generate an assessment and archive the exchange.
+
+        Takes the same arguments as OpenAIClient.generate_assessment.
+
+        Returns:
+            str: The generated feedback
+        """
+        return self.generate_completion(
+            system_content,
+            user_content,
+            model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            response_format=response_format,
+            cancel_token=cancel_token,
+        )["content"]
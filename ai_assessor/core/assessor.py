@@ -1,9 +1,37 @@
+import contextvars
+import json
 import logging
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 from ..utils.document_processor import DocumentProcessor
 from ..utils.error_handling import ErrorHandler
 from ..utils.file_utils import FileUtils
+from ..utils.template_filter import TemplateFilter
+from ..utils.token_utils import TokenEstimator
+from .api_client import ResponseTruncated
+from .archive import ArchivingClient, RequestArchive, archive_scope
+from .batch_stats import BatchStats
+from .cancellation import CancellationToken, RequestCancelled
+from .cascade import CascadePolicy
+from .concurrency import AdaptiveConcurrency
+from .endpoints import EndpointPool
+from .ensemble import EnsembleAggregator
+from .feedback_writer import FeedbackWriter
+from .hedging import HedgedClient, LatencyTracker
+from .memory_budget import ByteBudget
+from .output_budget import OutputBudget
+from .packing import SubmissionPacker
+from .results_sink import ResultsSink
+from .results_store import ResultsStore
+from .router import ModelRouter
+from .rubric import Rubric
+from .scheduler import JobScheduler
+from .screening import SubmissionScreener
+from .single_flight import CoalescingClient, SingleFlight
 
 
 class Assessor:
@@ -11,6 +39,16 @@ class Assessor:
     Core business logic for assessment functionality.
     """
 
+    # Tokens reserved for the response when sizing requests
+    OUTPUT_TOKEN_RESERVE = 3500
+
+    # Most bytes reserved for a submission's text before it is read
+    PROMPT_PLACEHOLDER_BYTES = 4096
+
+    # Run log and gradebook written to the output folder
+    RESULTS_LOG_FILENAME = "results.jsonl"
+    GRADEBOOK_FILENAME = "gradebook.csv"
+
     def __init__(self, api_client, config_manager):
         """
         Initialize the assessor.
@@ -25,57 +63,934 @@ class Assessor:
         # Initialize document processor
         self.doc_processor = DocumentProcessor()
 
-    def prepare_system_content(self, system_prompt, support_files_path):
+        # Statistics for the current batch
+        self.stats = BatchStats()
+
+        # Template filters keyed by template path, built once per template
+        self._template_filters = {}
+
+        # Rubrics keyed by definition file path
+        self._rubrics = {}
+
+        # Pool of [Endpoint:<name>] servers, if any are configured
+        self._endpoint_pool = None
+
+        # Observed output lengths used to size max_tokens
+        self._output_budget = OutputBudget(
+            percentile=self.config.get_float("Grading", "MaxTokensPercentile", 95.0),
+            margin=self.config.get_float("Grading", "MaxTokensMargin", 0.2),
+            min_samples=self.config.get_int("Grading", "MaxTokensMinSamples", 10),
+        )
+
+        # Time-to-first-token history used to decide when to hedge
+        self._latency_tracker = LatencyTracker(
+            min_samples=self.config.get_int("API", "HedgeMinSamples", 10)
+        )
+
+        # Identical requests in flight, shared by every grading thread
+        self._single_flight = SingleFlight()
+
+        # Shared interactive/batch job queue, created on first use
+        self._scheduler = None
+
+        # History of runs and results, opened on first use
+        self._results_store = None
+        self._results_store_lock = threading.Lock()
+
+        # Write-behind feedback files, created on first use
+        self._feedback_writer = None
+        self._feedback_writer_settings = None
+        self._feedback_writer_lock = threading.Lock()
+
+        # Archive of every request and response, opened on first use
+        self._archive = None
+        self._archive_lock = threading.Lock()
+
+        # Cap on prompt bytes held by requests in flight
+        self._prompt_budget = ByteBudget(
+            self.config.get_int("Batch", "MaxInFlightPromptBytes", 0)
+        )
+        # (system content, its encoded size), shared by a batch's requests
+        self._system_bytes = (None, 0)
+
+    def reset_stats(self):
+        """Start a fresh set of batch statistics."""
+        self.stats = BatchStats()
+
+    def get_template_filter(self, template_file):
+        """
+        Get the boilerplate filter for an assignment template.
+
+        The template is fingerprinted the first time it is requested and the
+        filter is reused for every later submission.
+
+        Args:
+            template_file (str): Path to the template Word document
+
+        Returns:
+            TemplateFilter: Filter for the template, or None if unavailable
+        """
+        if not template_file or not os.path.exists(template_file):
+            return None
+
+        render_mode = self.get_render_mode()
+        key = (os.path.abspath(template_file), render_mode)
+        if key not in self._template_filters:
+            try:
+                self._template_filters[key] = TemplateFilter(
+                    template_file, render_mode=render_mode
+                )
+            except Exception as e:
+                ErrorHandler.handle_file_error(e, template_file)
+                self._template_filters[key] = None
+        return self._template_filters[key]
+
+    def get_render_mode(self):
+        """
+        Get the configured rendering of Word documents.
+
+        Returns:
+            str: "text" or "markdown" (Processing.RenderMode)
+        """
+        mode = self.config.get_value(
+            "Processing", "RenderMode", DocumentProcessor.RENDER_TEXT
+        )
+        mode = (mode or "").strip().lower()
+        if mode == DocumentProcessor.RENDER_MARKDOWN:
+            return mode
+        return DocumentProcessor.RENDER_TEXT
+
+    def read_submission(self, submission_path):
+        """
+        Extract a submission using the configured rendering.
+
+        In Markdown mode the plain-text rendering is also produced from the
+        same parsed document so the size reduction can be reported.
+
+        Args:
+            submission_path (str): Path to submission file
+
+        Returns:
+            str: Extracted submission text
+        """
+        render_mode = self.get_render_mode()
+        doc = self.doc_processor.load_document(submission_path)
+        text = self.doc_processor.render_document(doc, render_mode)
+
+        if render_mode == DocumentProcessor.RENDER_MARKDOWN:
+            plain = self.doc_processor.render_plain_text(doc)
+            self.stats.increment("render_chars_before", len(plain))
+            self.stats.increment("render_chars_after", len(text))
+            self.stats.increment(
+                "render_tokens_before", TokenEstimator.estimate_tokens(plain)
+            )
+            self.stats.increment(
+                "render_tokens_after", TokenEstimator.estimate_tokens(text)
+            )
+
+        return text
+
+    def list_submissions(self, submissions_folder):
+        """
+        List the submissions in a folder that should be graded.
+
+        With Batch.LatestAttemptOnly, earlier attempts by the same student
+        (identified by Batch.StudentPattern) are left out.
+
+        Args:
+            submissions_folder (str): Path to submissions folder
+
+        Returns:
+            tuple: (filenames to grade, dict mapping each superseded filename
+                to the attempt that replaced it)
+        """
+        docx_files = FileUtils.get_docx_files(submissions_folder)
+        if not self.config.get_bool("Batch", "LatestAttemptOnly", False):
+            return docx_files, {}
+
+        pattern = self.config.get_value(
+            "Batch", "StudentPattern", FileUtils.DEFAULT_STUDENT_PATTERN
+        )
+        docx_files, superseded = FileUtils.latest_attempts(
+            submissions_folder, docx_files, pattern
+        )
+        for filename, latest in sorted(superseded.items()):
+            logging.info(f"Skipping {filename}: superseded by {latest}")
+        return docx_files, superseded
+
+    def prepare_system_content(self, system_prompt, support_files_path):
+        """
+        Prepare system content with support files.
+
+        Args:
+            system_prompt (str): System prompt text
+            support_files_path (str): Path to support files
+
+        Returns:
+            str: Complete system content
+        """
+        system_content = f"System: {system_prompt}\n"
+
+        # Add support files if path exists
+        if support_files_path and os.path.exists(support_files_path):
+            try:
+                # Get all Word documents in the support folder
+                docx_files = FileUtils.get_docx_files(support_files_path)
+
+                # Read and append each support file
+                for idx, filename in enumerate(docx_files):
+                    file_path = os.path.join(support_files_path, filename)
+                    file_content = self.doc_processor.read_word_document(
+                        file_path, self.get_render_mode()
+                    )
+                    system_content += (
+                        f"\nSupport File {idx + 1} ({filename}):\n{file_content}\n"
+                    )
+            except Exception as e:
+                ErrorHandler.handle_file_error(e, support_files_path)
+
+        return system_content
+
+    def extract_submission_text(self, submission_path, template_file=None):
+        """
+        Extract a submission and strip template boilerplate from it.
+
+        Args:
+            submission_path (str): Path to submission file
+            template_file (str, optional): Path to the assignment template whose
+                boilerplate is removed from the submission
+
+        Returns:
+            str: Submission text as it is sent to the provider
+        """
+        return self.strip_template(self.read_submission(submission_path), template_file)
+
+    def strip_template(self, student_work, template_file=None):
+        """
+        Strip boilerplate copied from the assignment template.
+
+        Args:
+            student_work (str): Extracted submission text
+            template_file (str, optional): Path to the assignment template
+
+        Returns:
+            str: Submission text without the template boilerplate
+        """
+        template_filter = self.get_template_filter(template_file)
+        if template_filter:
+            student_work, tokens_saved = template_filter.strip(student_work)
+            self.stats.increment("template_tokens_saved", tokens_saved)
+        return student_work
+
+    def screen_submission(self, submission_path, template_file=None):
+        """
+        Extract a submission and screen it locally before any API call.
+
+        Args:
+            submission_path (str): Path to submission file
+            template_file (str, optional): Path to the assignment template whose
+                boilerplate is removed from the submission
+
+        Returns:
+            tuple: (submission text as it is sent, or None if it could not be
+                extracted; list of reasons the submission needs human review)
+        """
+        screener = SubmissionScreener.from_config(self.config)
+        try:
+            original = self.read_submission(submission_path)
+        except Exception as e:
+            error_msg = ErrorHandler.handle_file_error(e, submission_path)
+            if not screener.enabled:
+                return None, []
+            return None, [f"text could not be extracted ({error_msg})"]
+
+        student_work = self.strip_template(original, template_file)
+        return student_work, screener.screen(student_work, original)
+
+    def needs_review_result(self, submission_file, reasons, result=None):
+        """
+        Mark a submission for human review instead of grading it.
+
+        Args:
+            submission_file (str): Path to submission file
+            reasons (list): Reasons from screen_submission
+            result (dict, optional): Result dict to update
+
+        Returns:
+            dict: The result, unsuccessful with "needs_review" set
+        """
+        result = result if result is not None else {"model": None}
+        result["success"] = False
+        result["needs_review"] = True
+        result["feedback"] = f"Needs human review: {'; '.join(reasons)}"
+        self.stats.increment("needs_review")
+        logging.warning(f"{result['feedback']} ({submission_file})")
+        return result
+
+    @staticmethod
+    def format_user_content(user_prompt, student_work):
+        """
+        Combine the user prompt with the submission text.
+
+        Args:
+            user_prompt (str): User prompt text
+            student_work (str): Submission text, or None if it could not be
+                extracted
+
+        Returns:
+            str: Complete user content
+        """
+        if student_work is None:
+            return user_prompt
+        return f"{user_prompt}\nStudent's Submission:\n{student_work}\n"
+
+    def prepare_user_content(self, user_prompt, submission_path, template_file=None):
+        """
+        Prepare user content with submission.
+
+        Args:
+            user_prompt (str): User prompt text
+            submission_path (str): Path to submission file
+            template_file (str, optional): Path to the assignment template whose
+                boilerplate is removed from the submission
+
+        Returns:
+            str: Complete user content
+        """
+        try:
+            # Read the student's submission
+            student_work = self.extract_submission_text(submission_path, template_file)
+
+            # Combine with user prompt
+            return self.format_user_content(user_prompt, student_work)
+        except Exception as e:
+            ErrorHandler.handle_file_error(e, submission_path)
+            return user_prompt
+
+    @property
+    def client(self):
+        """
+        Client used for completions.
+
+        This is the endpoint pool when one is configured, otherwise the API
+        client; with API.HedgeRequests enabled it is wrapped so slow requests
+        are duplicated, with API.CoalesceRequests identical requests in
+        flight are sent only once, and with an [Archive] folder every
+        request and response is archived.
+        """
+        client = self._endpoint_pool or self.api_client
+        if self.config.get_bool("API", "HedgeRequests", False):
+            client = HedgedClient(
+                client,
+                self._latency_tracker,
+                percentile=self.config.get_float("API", "HedgePercentile", 95.0),
+                stats=self.stats,
+            )
+        if self.config.get_bool("API", "CoalesceRequests", True):
+            client = CoalescingClient(client, self._single_flight, stats=self.stats)
+        archive = self.archive
+        if archive is not None:
+            client = ArchivingClient(client, archive)
+        return client
+
+    @property
+    def archive(self):
+        """
+        Archive of requests and responses ([Archive] Folder, SegmentMB and
+        CompressionLevel).
+
+        Returns None when no folder is set or the archive cannot be opened;
+        grading never depends on it.
+        """
+        folder = self.config.get_value("Archive", "Folder", "")
+        if not folder:
+            return None
+        folder = os.path.expanduser(folder)
+        with self._archive_lock:
+            if self._archive is None or self._archive.folder != folder:
+                try:
+                    self._archive = RequestArchive(
+                        folder,
+                        segment_bytes=int(
+                            self.config.get_float("Archive", "SegmentMB", 64)
+                            * 1024
+                            * 1024
+                        ),
+                        level=self.config.get_int("Archive", "CompressionLevel", 6),
+                    )
+                except Exception as e:
+                    ErrorHandler.handle_file_error(e, folder)
+                    return None
+            return self._archive
+
+    @property
+    def endpoint_pool(self):
+        """EndpointPool: Configured endpoint pool, or None."""
+        return self._endpoint_pool
+
+    def refresh_api_client(self):
+        """
+        Update the API client with the latest settings from config.
+
+        When [Endpoint:<name>] sections are configured, requests go to the
+        endpoint pool instead. The pool is only rebuilt when its settings
+        change, so health and load survive between submissions.
+        """
+        pool = EndpointPool.from_config(self.config)
+        if pool.endpoints:
+            if (
+                self._endpoint_pool is None
+                or self._endpoint_pool.settings() != pool.settings()
+            ):
+                logging.info(f"Using {len(pool.endpoints)} endpoints")
+                self._endpoint_pool = pool
+            return
+        self._endpoint_pool = None
+
+        if not self.config.get_bool("Batch", "AdaptiveConcurrency", False):
+            self.api_client.concurrency = None
+        elif self.api_client.concurrency is None:
+            self.api_client.concurrency = AdaptiveConcurrency.from_config(self.config)
+
+        self.api_client.update(
+            api_key=self.config.get_value("API", "Key"),
+            base_url=self.config.get_value("API", "BaseURL"),
+            ssl_verify=self.config.get_value("API", "SSLVerify", "True").lower()
+            == "true",
+            tokens_per_minute=self.config.get_int("API", "KeyTokensPerMinute", 0),
+            requests_per_minute=self.config.get_int("API", "KeyRequestsPerMinute", 0),
+            connect_timeout=self.config.get_float("API", "ConnectTimeout", 10.0),
+            read_timeout=self.config.get_float("API", "ReadTimeout", 600.0),
+            request_timeout=self.config.get_float("API", "RequestTimeout", 0),
+            max_continuations=self.config.get_int("API", "MaxContinuations", 2),
+        )
+
+    def default_workers(self):
+        """
+        Get the number of submissions to grade at once.
+
+        Returns:
+            int: Batch.MaxWorkers, defaulting to the endpoint pool's capacity,
+                Batch.AdaptiveMaxConcurrency with adaptive concurrency, or 1
+        """
+        # Endpoints serve several submissions at once
+        self.refresh_api_client()
+        if self._endpoint_pool:
+            default_workers = self._endpoint_pool.capacity
+        elif self.config.get_bool("Batch", "AdaptiveConcurrency", False):
+            # Enough workers for the adaptive limit to grow into
+            default_workers = self.config.get_int("Batch", "AdaptiveMaxConcurrency", 16)
+        else:
+            default_workers = 1
+        return max(1, self.config.get_int("Batch", "MaxWorkers", default_workers))
+
+    @property
+    def scheduler(self):
+        """
+        Job scheduler shared by interactive and batch grading.
+
+        The number of workers follows default_workers; it can grow between
+        runs but threads already started are kept.
+        """
+        if self._scheduler is None:
+            self._scheduler = JobScheduler()
+        self._scheduler.workers = max(self._scheduler.workers, self.default_workers())
+        return self._scheduler
+
+    def estimate_submission_tokens(self, submission_path):
+        """
+        Estimate the prompt tokens a submission adds, for job ordering.
+
+        Uses the file size, so queueing a batch never opens a document;
+        the order only has to be roughly right.
+
+        Args:
+            submission_path (str): Path to submission file
+
+        Returns:
+            int: Estimated tokens (0 if the file cannot be found)
+        """
+        try:
+            return os.path.getsize(submission_path) // 4
+        except OSError:
+            return 0
+
+    def system_content_bytes(self, system_content):
+        """
+        Get the encoded size of the system content.
+
+        The size is remembered for the last system content seen, so a batch
+        sharing one system content encodes it once.
+
+        Args:
+            system_content (str): System content
+
+        Returns:
+            int: UTF-8 bytes
+        """
+        cached, nbytes = self._system_bytes
+        if cached is not system_content:
+            nbytes = ByteBudget.size(system_content)
+            self._system_bytes = (system_content, nbytes)
+        return nbytes
+
+    def estimate_prompt_bytes(self, submission_path, system_content=None):
+        """
+        Estimate the prompt bytes a submission holds, before it is read.
+
+        The file size stands in for the extracted text, so the byte budget
+        can be reserved before the submission is opened. A .docx is a zip
+        that may hold images, so the estimate is capped at
+        PROMPT_PLACEHOLDER_BYTES; the reservation is corrected once the text
+        is extracted.
+
+        Args:
+            submission_path (str): Path to submission file
+            system_content (str, optional): System content sent with it
+
+        Returns:
+            int: Estimated bytes of the request's prompt
+        """
+        try:
+            nbytes = os.path.getsize(submission_path)
+        except OSError:
+            nbytes = 0
+        nbytes = min(nbytes, self.PROMPT_PLACEHOLDER_BYTES)
+        return nbytes + self.system_content_bytes(system_content)
+
+    def concurrency_report(self):
+        """
+        Report the limits adaptive concurrency has settled on.
+
+        Returns:
+            dict: Endpoint names ("API" for the single API client) mapped to
+                dicts of model names and their current concurrency limit
+        """
+        if self._endpoint_pool:
+            controllers = {e.name: e.concurrency for e in self._endpoint_pool.endpoints}
+        else:
+            controllers = {"API": getattr(self.api_client, "concurrency", None)}
+
+        report = {}
+        for name, concurrency in controllers.items():
+            if concurrency and concurrency.snapshot():
+                report[name] = concurrency.snapshot()
+        return report
+
+    def resolve_model(
+        self, model, system_content, user_content, output_tokens=OUTPUT_TOKEN_RESERVE
+    ):
+        """
+        Resolve a model key to the model name sent to the provider.
+
+        The "auto" key picks the fastest model from the [Routing] table whose
+        context window fits this request.
+
+        Args:
+            model (str): Model key (e.g., "gpt-4o" or "auto")
+            system_content (str): Complete system content
+            user_content (str): Complete user content
+            output_tokens (int): Tokens reserved for the response
+
+        Returns:
+            str: Model name
+        """
+        if not ModelRouter.is_auto(model):
+            return self.config.get_model_name(model)
+
+        prompt_tokens = TokenEstimator.estimate_tokens(
+            system_content
+        ) + TokenEstimator.estimate_tokens(user_content)
+        model_name = ModelRouter.from_config(self.config).select(
+            prompt_tokens, output_tokens
+        )
+        logging.info(f"Routed ~{prompt_tokens} prompt tokens to {model_name}")
+        self.stats.increment(f"routed_to_{model_name}")
+        return self.config.get_model_name(model_name)
+
+    def resolve_temperature(self, temperature):
+        """
+        Validate a temperature, falling back to the configured value.
+
+        Args:
+            temperature (float): Requested temperature
+
+        Returns:
+            float: Temperature between 0 and 1
+        """
+        if not isinstance(temperature, float) or temperature < 0 or temperature > 1:
+            temperature = float(self.config.get_value("API", "Temperature", "0.7"))
+        return temperature
+
+    @staticmethod
+    def get_feedback_path(submission_file, output_folder, suffix="_feedback.txt"):
+        """
+        Get the feedback file path for a submission.
+
+        Args:
+            submission_file (str): Path to submission file
+            output_folder (str): Path to output folder
+            suffix (str): Replaces the ".docx" extension
+
+        Returns:
+            str: Path of the feedback text file
+        """
+        feedback_filename = os.path.basename(submission_file).replace(".docx", suffix)
+        return os.path.join(output_folder, feedback_filename)
+
+    def save_feedback(
+        self, submission_file, output_folder, feedback, suffix="_feedback.txt"
+    ):
+        """
+        Save feedback next to the other results if an output folder is set.
+
+        The file is handed to the feedback writer, which writes it
+        atomically and usually in the background; see write_feedback to
+        learn whether it reached the disk.
+
+        Args:
+            submission_file (str): Path to submission file
+            output_folder (str, optional): Path to output folder
+            feedback (str): Feedback text
+            suffix (str): Replaces the ".docx" extension of the submission
+
+        Returns:
+            str: Path the file is written to, or None if nothing is written
+        """
+        feedback_path, _ = self.write_feedback(
+            submission_file, output_folder, feedback, suffix
+        )
+        return feedback_path
+
+    def write_feedback(
+        self, submission_file, output_folder, feedback, suffix="_feedback.txt"
+    ):
+        """
+        Hand feedback to the feedback writer.
+
+        With Batch.FeedbackDocx, feedback is also rendered as
+        <name>_feedback.docx.
+
+        Args:
+            submission_file (str): Path to submission file
+            output_folder (str, optional): Path to output folder
+            feedback (str): Feedback text
+            suffix (str): Replaces the ".docx" extension of the submission
+
+        Returns:
+            tuple: (path, Future completed once the file is on disk), or
+                (None, None) without an output folder
+        """
+        if not output_folder:
+            return None, None
+        feedback_path = self.get_feedback_path(submission_file, output_folder, suffix)
+        writer = self.feedback_writer
+        written = writer.write(feedback_path, feedback)
+        if suffix == "_feedback.txt" and self.config.get_bool(
+            "Batch", "FeedbackDocx", False
+        ):
+            writer.write_docx(
+                self.get_feedback_path(
+                    submission_file, output_folder, "_feedback.docx"
+                ),
+                feedback,
+            )
+        return feedback_path, written
+
+    def on_feedback_written(self, result, callback):
+        """
+        Call back with a result once its feedback file is on disk.
+
+        A result whose feedback could not be written is marked failed, with
+        the write error as its feedback and no feedback_path. Results with
+        no pending file are passed on at once. The callback may run on the
+        feedback writer's thread.
+
+        Args:
+            result (dict): Result from grade_submission_result
+            callback (callable): Called as callback(result)
+        """
+        written = result.pop("feedback_written", None)
+        if written is None:
+            callback(result)
+            return
+
+        def done(future):
+            error = future.exception()
+            if error is not None:
+                result["success"] = False
+                result["feedback_path"] = None
+                result["feedback"] = (
+                    f"Feedback could not be written: {str(error)}\n\n"
+                    f"{result.get('feedback') or ''}"
+                )
+            callback(result)
+
+        written.add_done_callback(done)
+
+    def wait_for_feedback(self, result):
+        """
+        Wait until a result's feedback file is on disk.
+
+        Args:
+            result (dict): Result from grade_submission_result
+
+        Returns:
+            dict: The result, marked failed if the feedback was not written
+        """
+        written = result.get("feedback_written")
+        if written is not None:
+            try:
+                written.result()
+            except Exception:
+                pass
+        self.on_feedback_written(result, lambda settled: None)
+        return result
+
+    @property
+    def feedback_writer(self):
+        """
+        Writer for feedback files (Batch.WriteBehind, FeedbackSyncEvery,
+        FeedbackQueueSize and Paths.FeedbackTemplate).
+
+        A new writer replaces the current one when these settings change.
+        """
+        settings = (
+            self.config.get_bool("Batch", "WriteBehind", True),
+            self.config.get_int("Batch", "FeedbackSyncEvery", 20),
+            self.config.get_int("Batch", "FeedbackQueueSize", 256),
+            self.config.get_value("Paths", "FeedbackTemplate", ""),
+        )
+        with self._feedback_writer_lock:
+            if self._feedback_writer is not None:
+                if self._feedback_writer_settings == settings:
+                    return self._feedback_writer
+                self._feedback_writer.close()
+            background, sync_every, max_queued, template = settings
+            try:
+                writer = FeedbackWriter(sync_every, max_queued, template, background)
+            except OSError as e:
+                ErrorHandler.handle_file_error(e, template)
+                writer = FeedbackWriter(sync_every, max_queued, None, background)
+            self._feedback_writer = writer
+            self._feedback_writer_settings = settings
+            return writer
+
+    def flush_feedback(self):
+        """
+        Wait until all saved feedback is on disk.
+
+        Returns:
+            list: (path, message) for each file that could not be written;
+                each also counts as a "feedback_write_errors" statistic
+        """
+        with self._feedback_writer_lock:
+            writer = self._feedback_writer
+        if writer is None:
+            return []
+        errors = writer.flush()
+        if errors:
+            self.stats.increment("feedback_write_errors", len(errors))
+        return errors
+
+    def spill_error(self, submission_file, output_folder, message):
+        """
+        Write a failure message to disk and keep only its summary.
+
+        Batches keep status in memory rather than full messages, which may
+        carry tracebacks. A message that fits in its summary is not written.
+
+        Args:
+            submission_file (str): Path to submission file
+            output_folder (str, optional): Path to output folder
+            message (str): Full error message
+
+        Returns:
+            tuple: (first line of the message, path of the written
+                <name>_error.txt or None)
+        """
+        summary = (message or "").strip().split("\n", 1)[0][:200]
+        if summary == (message or "").strip():
+            return summary, None
+        try:
+            error_path, written = self.write_feedback(
+                submission_file, output_folder, message or "", suffix="_error.txt"
+            )
+            if written is not None:
+                # Failures are rare; only report a file that exists
+                written.result()
+        except Exception as e:
+            ErrorHandler.handle_file_error(e, submission_file)
+            error_path = None
+        return summary, error_path
+
+    def open_results_sink(self, output_folder):
+        """
+        Open the results log of a grading run.
+
+        Args:
+            output_folder (str, optional): Path to output folder
+
+        Returns:
+            ResultsSink: Sink appending to <output_folder>/results.jsonl, or
+                None without an output folder or with Batch.ResultsLog off
+        """
+        if not output_folder or not self.config.get_bool("Batch", "ResultsLog", True):
+            return None
+        try:
+            FileUtils.ensure_dir_exists(output_folder)
+            return ResultsSink(
+                os.path.join(output_folder, self.RESULTS_LOG_FILENAME),
+                sync_every=self.config.get_int("Batch", "ResultsSyncEvery", 20),
+                sync_seconds=self.config.get_float("Batch", "ResultsSyncSeconds", 2.0),
+            )
+        except Exception as e:
+            ErrorHandler.handle_file_error(e, output_folder)
+            return None
+
+    def close_results_sink(self, sink):
+        """
+        Close a results log and export the gradebook next to it.
+
+        Args:
+            sink (ResultsSink): Sink from open_results_sink, or None
+
+        Returns:
+            str: Path of the gradebook CSV, or None if none was written
+        """
+        if sink is None:
+            return None
+        gradebook_path = os.path.join(
+            os.path.dirname(sink.path), self.GRADEBOOK_FILENAME
+        )
+        try:
+            sink.close()
+            ResultsSink.export_gradebook(sink.path, gradebook_path)
+            return gradebook_path
+        except Exception as e:
+            ErrorHandler.handle_file_error(e, gradebook_path)
+            return None
+
+    @property
+    def results_store(self):
+        """
+        Database of past runs and results (Paths.ResultsDatabase).
+
+        Returns None when the setting is empty or the database cannot be
+        opened; grading never depends on it.
+        """
+        path = self.config.get_value("Paths", "ResultsDatabase", "aiassessor.db")
+        if not path:
+            return None
+        path = os.path.expanduser(path)
+        with self._results_store_lock:
+            if self._results_store is None or self._results_store.path != path:
+                try:
+                    self._results_store = ResultsStore(path)
+                except Exception as e:
+                    ErrorHandler.handle_file_error(e, path)
+                    return None
+            return self._results_store
+
+    def start_results_run(self, model, system_prompt, user_prompt, output_folder):
+        """
+        Record the start of a grading run in the results database.
+
+        Args:
+            model (str): Model key
+            system_prompt (str): System prompt text
+            user_prompt (str): User prompt text
+            output_folder (str, optional): Path to output folder
+
+        Returns:
+            dict: Run handle for store_result, or None without a database
+        """
+        store = self.results_store
+        if store is None:
+            return None
+        prompt_hash = ResultsStore.hash_text(system_prompt, user_prompt)
+        try:
+            run_id = store.start_run(model, prompt_hash, output_folder)
+        except Exception as e:
+            ErrorHandler.handle_file_error(e, store.path)
+            return None
+        return {"id": run_id, "prompt_hash": prompt_hash, "store": store}
+
+    def store_result(self, run, submission_file, result, latency=None):
         """
-        Prepare system content with support files.
+        Record one submission's result in the results database.
 
         Args:
-            system_prompt (str): System prompt text
-            support_files_path (str): Path to support files
+            run (dict): Handle from start_results_run, or None
+            submission_file (str): Path to submission file
+            result (dict): Result from grade_submission_result
+            latency (float, optional): Seconds spent grading
+        """
+        if run is None:
+            return
+        filename = os.path.basename(submission_file)
+        try:
+            student = FileUtils.student_id(
+                filename,
+                self.config.get_value(
+                    "Batch", "StudentPattern", FileUtils.DEFAULT_STUDENT_PATTERN
+                ),
+            )
+        except ValueError:
+            student = None
+        try:
+            run["store"].record(
+                run["id"],
+                filename,
+                result,
+                latency=latency,
+                folder=os.path.abspath(os.path.dirname(submission_file)),
+                student=student,
+                submission_hash=ResultsStore.hash_file(submission_file),
+                prompt_hash=run["prompt_hash"],
+            )
+        except Exception as e:
+            ErrorHandler.handle_file_error(e, run["store"].path)
 
-        Returns:
-            str: Complete system content
+    def get_rubric(self, rubric_file):
         """
-        system_content = f"System: {system_prompt}\n"
+        Get the rubric loaded from a definition file.
 
-        # Add support files if path exists
-        if support_files_path and os.path.exists(support_files_path):
-            try:
-                # Get all Word documents in the support folder
-                docx_files = FileUtils.get_docx_files(support_files_path)
+        Args:
+            rubric_file (str): Path to the JSON rubric definition
 
-                # Read and append each support file
-                for idx, filename in enumerate(docx_files):
-                    file_path = os.path.join(support_files_path, filename)
-                    file_content = self.doc_processor.read_word_document(file_path)
-                    system_content += (
-                        f"\nSupport File {idx + 1} ({filename}):\n{file_content}\n"
-                    )
-            except Exception as e:
-                ErrorHandler.handle_file_error(e, support_files_path)
+        Returns:
+            Rubric: The rubric, or None if no rubric file is configured
 
-        return system_content
+        Raises:
+            Exception: If the rubric file cannot be loaded
+        """
+        if not rubric_file:
+            return None
 
-    def prepare_user_content(self, user_prompt, submission_path):
+        key = os.path.abspath(rubric_file)
+        if key not in self._rubrics:
+            self._rubrics[key] = Rubric.load(rubric_file)
+        return self._rubrics[key]
+
+    def save_scores(self, submission_file, output_folder, scores):
         """
-        Prepare user content with submission.
+        Save parsed rubric scores next to the feedback file.
 
         Args:
-            user_prompt (str): User prompt text
-            submission_path (str): Path to submission file
+            submission_file (str): Path to submission file
+            output_folder (str, optional): Path to output folder
+            scores (dict): Validated scores
 
         Returns:
-            str: Complete user content
+            str: Path of the written file, or None if nothing was written
         """
-        try:
-            # Read the student's submission
-            student_work = self.doc_processor.read_word_document(submission_path)
-
-            # Combine with user prompt
-            return f"{user_prompt}\nStudent's Submission:\n{student_work}\n"
-        except Exception as e:
-            ErrorHandler.handle_file_error(e, submission_path)
-            return user_prompt
+        return self.save_feedback(
+            submission_file,
+            output_folder,
+            json.dumps(scores, indent=2),
+            suffix="_scores.json",
+        )
 
     def grade_submission(
         self,
@@ -86,6 +1001,11 @@ class Assessor:
         output_folder=None,
         model="GPT-4",
         temperature=0.7,
+        template_file=None,
+        rubric_file=None,
+        per_criterion=None,
+        system_content=None,
+        cancel_token=None,
     ):
         """
         Grade a single submission.
@@ -98,11 +1018,82 @@ class Assessor:
             output_folder (str, optional): Path to output folder
             model (str): Model to use (e.g., "GPT-3", "GPT-4")
             temperature (float): Temperature setting (0-1)
+            template_file (str, optional): Path to the assignment template
+                (defaults to Paths.TemplatePath)
+            rubric_file (str, optional): Path to the JSON rubric definition
+                (defaults to Paths.RubricPath)
+            per_criterion (bool, optional): Grade each rubric criterion in a
+                separate concurrent request (defaults to Grading.PerCriterion)
+            system_content (str, optional): Precomputed system content, so a
+                batch reads the support files only once
+            cancel_token (CancellationToken, optional): Token that aborts the
+                grading, including requests in flight
 
         Returns:
             tuple: (success, feedback or error message)
         """
+        result = self.grade_submission_result(
+            submission_file,
+            system_prompt,
+            user_prompt,
+            support_files=support_files,
+            output_folder=output_folder,
+            model=model,
+            temperature=temperature,
+            template_file=template_file,
+            rubric_file=rubric_file,
+            per_criterion=per_criterion,
+            system_content=system_content,
+            cancel_token=cancel_token,
+        )
+        self.wait_for_feedback(result)
+        return result["success"], result["feedback"]
+
+    def grade_submission_result(
+        self,
+        submission_file,
+        system_prompt,
+        user_prompt,
+        support_files=None,
+        output_folder=None,
+        model="GPT-4",
+        temperature=0.7,
+        template_file=None,
+        rubric_file=None,
+        per_criterion=None,
+        system_content=None,
+        cancel_token=None,
+        student_work=None,
+    ):
+        """
+        Grade a single submission and return the full result.
+
+        Takes the same arguments as grade_submission, and:
+
+        Args:
+            student_work (str, optional): Submission text already extracted
+                and screened (skips extraction and screening)
+
+        Returns:
+            dict: "success", "feedback" (or error message), "model", "scores"
+                (validated rubric scores or None), "usage", "feedback_path",
+                "feedback_written" (Future of the feedback file, settled with
+                on_feedback_written or wait_for_feedback) and "needs_review"
+                (screened out before any API call)
+        """
+        result = {
+            "success": False,
+            "feedback": "",
+            "model": None,
+            "scores": None,
+            "usage": None,
+            "feedback_path": None,
+            "needs_review": False,
+        }
         try:
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+
             # Validate inputs
             FileUtils.validate_path(submission_file, must_exist=True, must_be_file=True)
 
@@ -110,48 +1101,574 @@ class Assessor:
                 FileUtils.ensure_dir_exists(output_folder)
 
             # Prepare content
-            system_content = self.prepare_system_content(system_prompt, support_files)
-            user_content = self.prepare_user_content(user_prompt, submission_file)
+            if template_file is None:
+                template_file = self.config.get_value("Paths", "TemplatePath", "")
+            if rubric_file is None:
+                rubric_file = self.config.get_value("Paths", "RubricPath", "")
+            rubric = self.get_rubric(rubric_file)
+            if per_criterion is None:
+                per_criterion = self.config.get_bool("Grading", "PerCriterion", False)
+
+            if system_content is None:
+                system_content = self.prepare_system_content(
+                    system_prompt, support_files
+                )
+
+            # Hold the prompt against the in-flight byte cap from before the
+            # submission is read until the response arrives, so waiting
+            # workers do not already hold their prompts
+            prompt_bytes = self.estimate_prompt_bytes(submission_file, system_content)
+            with self._prompt_budget.reserve(prompt_bytes, cancel_token) as reservation:
+                # Screen locally; blank or unreadable work costs no API call
+                if student_work is None:
+                    student_work, reasons = self.screen_submission(
+                        submission_file, template_file
+                    )
+                    if reasons:
+                        return self.needs_review_result(
+                            submission_file, reasons, result
+                        )
+
+                user_content = self.format_user_content(user_prompt, student_work)
+                reservation.resize(
+                    self.system_content_bytes(system_content)
+                    + ByteBudget.size(user_content)
+                )
+
+                # Get actual model name from config, or route by submission size
+                model_name = self.resolve_model(model, system_content, user_content)
+                result["model"] = model_name
+
+                # Validate temperature
+                temperature = self.resolve_temperature(temperature)
+
+                # Update API client with the latest settings from config
+                self.refresh_api_client()
+
+                cascade = CascadePolicy.from_config(self.config)
+                if rubric and per_criterion:
+                    # One concurrent request per criterion, merged locally
+                    scores, result["usage"] = self._grade_per_criterion(
+                        rubric,
+                        system_content,
+                        user_content,
+                        model_name,
+                        temperature,
+                        cancel_token,
+                    )
+                    feedback = None
+                elif cascade.enabled:
+                    # Cheap first pass, premium model only when needed
+                    assessment, result["model"] = self._grade_with_cascade(
+                        cascade,
+                        rubric,
+                        system_content,
+                        user_content,
+                        model_name,
+                        temperature,
+                        cancel_token,
+                    )
+                    feedback, scores = assessment["feedback"], assessment["scores"]
+                    result["usage"] = assessment["usage"]
+                else:
+                    assessment = self._request_assessment(
+                        rubric,
+                        system_content,
+                        user_content,
+                        model_name,
+                        temperature,
+                        cancel_token=cancel_token,
+                    )
+                    feedback, scores = assessment["feedback"], assessment["scores"]
+                    result["usage"] = assessment["usage"]
+
+            if scores:
+                result["scores"] = scores
+                feedback = Rubric.format_feedback(scores)
+                self.save_scores(submission_file, output_folder, scores)
 
-            # Get actual model name from config
-            model_name = self.config.get_model_name(model)
+            # Save feedback if output folder is provided
+            result["feedback_path"], result["feedback_written"] = self.write_feedback(
+                submission_file, output_folder, feedback
+            )
 
-            # Validate temperature
-            if not isinstance(temperature, float) or temperature < 0 or temperature > 1:
-                temperature = float(self.config.get_value("API", "Temperature", "0.7"))
+            logging.info(f"Submission graded: {submission_file}")
+            result["success"] = True
+            result["feedback"] = feedback
 
-            # Update API client with the latest settings from config
-            self.api_client.update(
-                api_key=self.config.get_value("API", "Key"),
-                base_url=self.config.get_value("API", "BaseURL"),
-                ssl_verify=self.config.get_value("API", "SSLVerify", "True").lower()
-                == "true",
+        except Exception as e:
+            result["feedback"] = ErrorHandler.handle_api_error(
+                e, f"Failed to grade {submission_file}"
             )
+        return result
+
+    def _request_assessment(
+        self,
+        rubric,
+        system_content,
+        user_content,
+        model_name,
+        temperature,
+        with_confidence=False,
+        cancel_token=None,
+    ):
+        """
+        Request one complete assessment.
+
+        Args:
+            rubric (Rubric, optional): Rubric for structured scoring
+            system_content (str): Complete system content
+            user_content (str): Complete user content
+            model_name (str): Model to use
+            temperature (float): Temperature setting (0-1)
+            with_confidence (bool): Collect a confidence signal, self-reported
+                with a rubric or from token logprobs without one
+            cancel_token (CancellationToken, optional): Token that aborts the
+                request
+
+        Returns:
+            dict: "feedback", "scores" (or None), "usage" and "confidence"
+
+        Raises:
+            Exception: If the request fails or the structured output is invalid
+        """
+        if rubric:
+            user_content += "\n" + rubric.instructions(with_confidence) + "\n"
 
-            # Call the API
-            feedback = self.api_client.generate_assessment(
+        # Reserve output tokens from observed lengths when enabled
+        budget_key = OutputBudget.key(system_content, model_name)
+        max_tokens = self.OUTPUT_TOKEN_RESERVE
+        if self.config.get_bool("Grading", "AdaptiveMaxTokens", False):
+            max_tokens = self._output_budget.reservation(budget_key, max_tokens)
+
+        def request(max_tokens):
+            return self.client.generate_completion(
                 system_content=system_content,
                 user_content=user_content,
                 model=model_name,
                 temperature=temperature,
+                max_tokens=max_tokens,
+                response_format=(
+                    rubric.response_format(with_confidence) if rubric else None
+                ),
+                logprobs=with_confidence and not rubric,
+                cancel_token=cancel_token,
             )
 
-            # Save feedback if output folder is provided
+        # Call the API
+        try:
+            response = request(max_tokens)
+        except ResponseTruncated as e:
+            # Prose cut off by a reduced reservation is rerun below
+            if max_tokens >= self.OUTPUT_TOKEN_RESERVE:
+                raise
+            response = e.completion
+        usage = response["usage"]
+        if (
+            response.get("finish_reason") == "length"
+            and max_tokens < self.OUTPUT_TOKEN_RESERVE
+        ):
+            # The reduced reservation was too small; rerun with the full one.
+            # Nothing was saved, and the truncated attempt was wasted.
+            logging.info(f"Output truncated at {max_tokens} tokens; rerunning")
+            self.stats.increment("max_tokens_reruns")
+            self.stats.increment(
+                "max_tokens_rerun_tokens", (usage or {}).get("total_tokens", 0)
+            )
+            response = request(self.OUTPUT_TOKEN_RESERVE)
+            usage = self._sum_usage(usage, response["usage"])
+        else:
+            self.stats.increment(
+                "max_tokens_saved", self.OUTPUT_TOKEN_RESERVE - max_tokens
+            )
+        if response.get("finish_reason") != "length":
+            self._output_budget.record(
+                budget_key, (response.get("usage") or {}).get("completion_tokens")
+            )
+        self.stats.increment("continuations", response.get("continuations", 0))
+        self.stats.increment(
+            "continuation_tokens", response.get("continuation_tokens", 0)
+        )
+
+        assessment = {
+            "feedback": response["content"],
+            "scores": None,
+            "usage": usage,
+            "confidence": None,
+        }
+
+        # Validate structured output and check the total locally
+        if rubric:
+            scores = rubric.parse_response(response["content"])
+            if scores["total_mismatch"]:
+                self.stats.increment("total_corrections")
+            assessment["scores"] = scores
+            assessment["confidence"] = scores.get("confidence")
+        elif with_confidence:
+            assessment["confidence"] = CascadePolicy.confidence_from_logprobs(
+                response.get("logprobs")
+            )
+        return assessment
+
+    def _grade_with_cascade(
+        self,
+        cascade,
+        rubric,
+        system_content,
+        user_content,
+        model_name,
+        temperature,
+        cancel_token=None,
+    ):
+        """
+        Grade with the cheap model and escalate to the premium one if needed.
+
+        Args:
+            cascade (CascadePolicy): The cascade policy
+            rubric (Rubric, optional): Rubric for structured scoring
+            system_content (str): Complete system content
+            user_content (str): Complete user content
+            model_name (str): Premium model to escalate to
+            temperature (float): Temperature setting (0-1)
+            cancel_token (CancellationToken, optional): Token that aborts the
+                requests
+
+        Returns:
+            tuple: (assessment, name of the model whose result is used)
+
+        Raises:
+            Exception: If the premium request fails
+        """
+        first_pass_model = self.config.get_model_name(cascade.first_pass_model)
+        self.stats.increment("cascade_submissions")
+
+        start = time.monotonic()
+        try:
+            first = self._request_assessment(
+                rubric,
+                system_content,
+                user_content,
+                first_pass_model,
+                temperature,
+                with_confidence=True,
+                cancel_token=cancel_token,
+            )
+            escalate, reason = cascade.should_escalate(
+                first["scores"], first["confidence"]
+            )
+        except RequestCancelled:
+            raise
+        except Exception as e:
+            logging.warning(f"Cascade first pass failed: {str(e)}")
+            first = None
+            escalate, reason = True, "first pass failed"
+        self.stats.increment("cascade_first_pass_seconds", time.monotonic() - start)
+
+        first_usage = first["usage"] if first else None
+        first_cost = cascade.cost(first_usage, cascade.first_pass_cost)
+        if not escalate:
+            # Saved what the premium model would have cost for the same tokens
+            self.stats.increment(
+                "cascade_cost_saved",
+                cascade.cost(first_usage, cascade.premium_cost) - first_cost,
+            )
+            return first, first_pass_model
+
+        logging.info(f"Cascade escalating to {model_name}: {reason}")
+        self.stats.increment("cascade_escalations")
+        self.stats.increment("cascade_cost_saved", -first_cost)
+
+        start = time.monotonic()
+        final = self._request_assessment(
+            rubric,
+            system_content,
+            user_content,
+            model_name,
+            temperature,
+            cancel_token=cancel_token,
+        )
+        self.stats.increment("cascade_premium_seconds", time.monotonic() - start)
+
+        final["usage"] = self._sum_usage(first_usage, final["usage"])
+        return final, model_name
+
+    @staticmethod
+    def _sum_usage(*usages):
+        """
+        Add token usage dicts together.
+
+        Args:
+            *usages (dict): Usage dicts (None entries are ignored)
+
+        Returns:
+            dict: Summed usage
+        """
+        total = {}
+        for usage in usages:
+            for key, value in (usage or {}).items():
+                total[key] = total.get(key, 0) + value
+        return total
+
+    def _grade_per_criterion(
+        self,
+        rubric,
+        system_content,
+        user_content,
+        model_name,
+        temperature,
+        cancel_token=None,
+    ):
+        """
+        Grade each rubric criterion in its own concurrent request.
+
+        Every request shares the same system and user content so providers
+        can reuse the cached prompt prefix; only the trailing criterion
+        instruction differs. Wall-clock time tracks the slowest criterion.
+
+        Args:
+            rubric (Rubric): The rubric being applied
+            system_content (str): Complete system content
+            user_content (str): Complete user content
+            model_name (str): Model to use
+            temperature (float): Temperature setting (0-1)
+            cancel_token (CancellationToken, optional): Token that aborts the
+                requests
+
+        Returns:
+            tuple: (merged scores, summed usage)
+
+        Raises:
+            Exception: If any criterion request fails or is invalid
+        """
+        max_tokens = self.config.get_int("Grading", "PerCriterionMaxTokens", 1200)
+        max_workers = self.config.get_int(
+            "Grading", "MaxParallelRequests", len(rubric.criteria)
+        )
+
+        def grade_criterion(name):
+            response = self.client.generate_completion(
+                system_content=system_content,
+                user_content=f"{user_content}\n{rubric.criterion_instructions(name)}\n",
+                model=model_name,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                response_format=rubric.criterion_response_format(name),
+                cancel_token=cancel_token,
+            )
+            entry = rubric.parse_criterion_response(name, response["content"])
+            return entry, response["usage"]
+
+        # Each request runs in the caller's archive scope
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = [
+                executor.submit(contextvars.copy_context().run, grade_criterion, name)
+                for name in rubric.names
+            ]
+            outcomes = [future.result() for future in futures]
+
+        usage = self._sum_usage(*(criterion_usage for _, criterion_usage in outcomes))
+        self.stats.increment("per_criterion_requests", len(outcomes))
+        return rubric.merge_criteria([entry for entry, _ in outcomes]), usage
+
+    def grade_ensemble(
+        self,
+        submission_file,
+        system_prompt,
+        user_prompt,
+        models,
+        support_files=None,
+        output_folder=None,
+        temperature=0.7,
+        samples=1,
+        template_file=None,
+        rubric_file=None,
+        system_content=None,
+        cancel_token=None,
+    ):
+        """
+        Grade one submission with several models concurrently.
+
+        The submission is extracted and the prompt assembled once, then sent
+        to every model (with n=samples each). Each member's feedback is saved
+        as <name>_feedback_<member>.txt and the aggregate as
+        <name>_ensemble.txt and <name>_ensemble.json.
+
+        Args:
+            submission_file (str): Path to submission file
+            system_prompt (str): System prompt text
+            user_prompt (str): User prompt text
+            models (list): Model keys to grade with
+            support_files (str, optional): Path to support files folder
+            output_folder (str, optional): Path to output folder
+            temperature (float): Temperature setting (0-1)
+            samples (int): Completions requested from each model
+            template_file (str, optional): Path to the assignment template
+                (defaults to Paths.TemplatePath)
+            rubric_file (str, optional): Path to the JSON rubric definition
+                (defaults to Paths.RubricPath)
+            system_content (str, optional): Precomputed system content
+            cancel_token (CancellationToken, optional): Token that aborts the
+                grading, including requests in flight
+
+        Returns:
+            dict: "success", "feedback" (the moderation report or an error
+                message), "model", "members" (member label to feedback),
+                "aggregate", "usage", "feedback_path", "feedback_written" (as
+                for grade_submission_result) and "needs_review"
+        """
+        result = {
+            "success": False,
+            "feedback": "",
+            "model": ", ".join(models),
+            "members": {},
+            "aggregate": None,
+            "scores": None,
+            "usage": None,
+            "feedback_path": None,
+            "needs_review": False,
+        }
+        try:
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+
+            # Validate inputs
+            FileUtils.validate_path(submission_file, must_exist=True, must_be_file=True)
+            if not models:
+                raise ValueError("Ensemble grading needs at least one model")
+
             if output_folder:
-                feedback_filename = os.path.basename(submission_file).replace(
-                    ".docx", "_feedback.txt"
+                FileUtils.ensure_dir_exists(output_folder)
+
+            # Extract and assemble the prompt once for every member
+            if template_file is None:
+                template_file = self.config.get_value("Paths", "TemplatePath", "")
+            if rubric_file is None:
+                rubric_file = self.config.get_value("Paths", "RubricPath", "")
+            rubric = self.get_rubric(rubric_file)
+            if system_content is None:
+                system_content = self.prepare_system_content(
+                    system_prompt, support_files
                 )
-                feedback_path = os.path.join(output_folder, feedback_filename)
-                self.doc_processor.write_text_file(feedback_path, feedback)
 
-            logging.info(f"Submission graded: {submission_file}")
-            return True, feedback
+            # Every member holds its own copy of the serialized prompt; the
+            # budget is held from before the submission is read
+            prompt_bytes = self.estimate_prompt_bytes(
+                submission_file, system_content
+            ) * len(models)
+            with self._prompt_budget.reserve(prompt_bytes, cancel_token) as reservation:
+                student_work, reasons = self.screen_submission(
+                    submission_file, template_file
+                )
+                if reasons:
+                    return self.needs_review_result(submission_file, reasons, result)
+                user_content = self.format_user_content(user_prompt, student_work)
+                if rubric:
+                    user_content += "\n" + rubric.instructions() + "\n"
+                reservation.resize(
+                    (
+                        self.system_content_bytes(system_content)
+                        + ByteBudget.size(user_content)
+                    )
+                    * len(models)
+                )
+                temperature = self.resolve_temperature(temperature)
+                self.refresh_api_client()
+
+                def run_member(model):
+                    model_name = self.resolve_model(model, system_content, user_content)
+                    response = self.client.generate_completion(
+                        system_content=system_content,
+                        user_content=user_content,
+                        model=model_name,
+                        temperature=temperature,
+                        response_format=rubric.response_format() if rubric else None,
+                        n=samples,
+                        cancel_token=cancel_token,
+                    )
+                    return model_name, response
+
+                with ThreadPoolExecutor(max_workers=len(models)) as executor:
+                    futures = [
+                        executor.submit(
+                            contextvars.copy_context().run, run_member, model
+                        )
+                        for model in models
+                    ]
+                    outcomes = []
+                    for model, future in zip(models, futures):
+                        try:
+                            outcomes.append(future.result())
+                        except Exception as e:
+                            ErrorHandler.handle_api_error(e, f"Ensemble member {model}")
+
+            # Save each member's feedback and collect its scores
+            member_scores = {}
+            usages = []
+            for model_name, response in outcomes:
+                usages.append(response["usage"])
+                choices = response["choices"][:samples] or [response["content"]]
+                for index, content in enumerate(choices):
+                    label = EnsembleAggregator.member_label(model_name, index, samples)
+                    feedback = content
+                    member_scores[label] = None
+                    if rubric:
+                        try:
+                            scores = rubric.parse_response(content)
+                            member_scores[label] = scores
+                            feedback = Rubric.format_feedback(scores)
+                        except ValueError as e:
+                            logging.warning(f"Ensemble member {label}: {str(e)}")
+                    result["members"][label] = feedback
+                    self.save_feedback(
+                        submission_file,
+                        output_folder,
+                        feedback,
+                        suffix=f"_feedback_{label}.txt",
+                    )
+
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            if not result["members"]:
+                raise Exception("Every ensemble member failed")
+
+            # Aggregate marks and flag disagreements
+            aggregator = EnsembleAggregator(
+                self.config.get_float("Ensemble", "DisagreementThreshold", 10.0)
+            )
+            aggregate = aggregator.aggregate(member_scores)
+            if aggregate:
+                report = EnsembleAggregator.format_report(aggregate)
+                self.save_feedback(
+                    submission_file,
+                    output_folder,
+                    json.dumps(
+                        {"aggregate": aggregate, "members": member_scores}, indent=2
+                    ),
+                    suffix="_ensemble.json",
+                )
+                if aggregate["disagreement"]:
+                    self.stats.increment("ensemble_disagreements")
+            else:
+                report = "\n\n".join(
+                    f"=== {label} ===\n{feedback}"
+                    for label, feedback in result["members"].items()
+                )
+            self.stats.increment("ensemble_members", len(result["members"]))
+
+            result["feedback_path"], result["feedback_written"] = self.write_feedback(
+                submission_file, output_folder, report, suffix="_ensemble.txt"
+            )
+            result["aggregate"] = aggregate
+            result["usage"] = self._sum_usage(*usages)
+            result["success"] = True
+            result["feedback"] = report
+            logging.info(f"Submission graded (ensemble): {submission_file}")
 
         except Exception as e:
-            error_msg = ErrorHandler.handle_api_error(
+            result["feedback"] = ErrorHandler.handle_api_error(
                 e, f"Failed to grade {submission_file}"
             )
-            return False, error_msg
+        return result
 
     def grade_all_submissions(
         self,
@@ -162,6 +1679,15 @@ class Assessor:
         output_folder=None,
         model="GPT-4",
         temperature=0.7,
+        template_file=None,
+        pack=None,
+        progress_callback=None,
+        rubric_file=None,
+        per_criterion=None,
+        ensemble_models=None,
+        samples=1,
+        max_workers=None,
+        cancel_token=None,
     ):
         """
         Grade all submissions in a folder.
@@ -174,50 +1700,384 @@ class Assessor:
             output_folder (str, optional): Path to output folder
             model (str): Model to use (e.g., "GPT-3", "GPT-4")
             temperature (float): Temperature setting (0-1)
+            template_file (str, optional): Path to the assignment template
+                (defaults to Paths.TemplatePath)
+            pack (bool, optional): Pack several short submissions into one
+                request (defaults to Batch.PackSubmissions)
+            progress_callback (callable, optional): Called as
+                callback(filename, result) after each submission, where result
+                is a dict with at least "success", "feedback" and "model"
+            rubric_file (str, optional): Path to the JSON rubric definition
+                (defaults to Paths.RubricPath)
+            per_criterion (bool, optional): Grade each rubric criterion in a
+                separate concurrent request (defaults to Grading.PerCriterion)
+            ensemble_models (list, optional): Grade every submission with all
+                of these models concurrently (see grade_ensemble)
+            samples (int): Completions per ensemble model
+            max_workers (int, optional): Submissions graded at once (defaults
+                to Batch.MaxWorkers, or the endpoint pool's capacity)
+            cancel_token (CancellationToken, optional): Token that stops the
+                batch; requests in flight are aborted and submissions not yet
+                started are recorded as failed
+
+        With an output folder each result is also appended to results.jsonl
+        as it completes, and gradebook.csv is exported at the end. Results
+        are recorded in the results database as well.
 
         Returns:
-            tuple: (success_count, fail_count, results)
+            tuple: (success_count, fail_count, results), where results maps
+                each filename to its status: "success", "model",
+                "needs_review", "feedback_path" and, for failures, "error" (the
+                first line of the message) and "error_path"
         """
+        # Batch.Deadline cancels a child of the caller's token
+        batch_token = cancel_token
+        sink = None
+        deadline = self.config.get_float("Batch", "Deadline", 0)
+        if deadline > 0:
+            batch_token = (
+                cancel_token.child(deadline)
+                if cancel_token is not None
+                else CancellationToken(timeout=deadline)
+            )
         try:
             # Validate submissions folder
             FileUtils.validate_path(
                 submissions_folder, must_exist=True, must_be_dir=True
             )
 
-            # Get all Word documents in the submissions folder
-            docx_files = FileUtils.get_docx_files(submissions_folder)
+            # Get the Word documents to grade, without superseded attempts
+            docx_files, superseded = self.list_submissions(submissions_folder)
+
+            # Start fresh statistics for this batch
+            self.reset_stats()
+            self.stats.increment("superseded_attempts", len(superseded))
 
-            # Results storage
+            if template_file is None:
+                template_file = self.config.get_value("Paths", "TemplatePath", "")
+            if rubric_file is None:
+                rubric_file = self.config.get_value("Paths", "RubricPath", "")
+            if pack is None:
+                pack = self.config.get_bool("Batch", "PackSubmissions", False)
+            if pack and (rubric_file or ensemble_models):
+                # Packed responses carry prose only, not per-criterion scores
+                logging.info("Packing disabled: grading submissions individually")
+                pack = False
+
+            # Support files are read once for the whole batch; every worker
+            # shares this one immutable string
+            system_content = self.prepare_system_content(system_prompt, support_files)
+            self._prompt_budget.limit = self.config.get_int(
+                "Batch", "MaxInFlightPromptBytes", 0
+            )
+            self._prompt_budget.peak = self._prompt_budget.in_use
+
+            # Results storage: status only, feedback and errors live on disk
             results = {}
-            success_count = 0
-            fail_count = 0
+            counts = {"success": 0, "fail": 0}
+            sink = self.open_results_sink(output_folder)
+            run = self.start_results_run(
+                model, system_prompt, user_prompt, output_folder
+            )
 
-            # Process each submission
-            for filename in docx_files:
-                submission_path = os.path.join(submissions_folder, filename)
-                success, feedback = self.grade_submission(
-                    submission_file=submission_path,
-                    system_prompt=system_prompt,
-                    user_prompt=user_prompt,
-                    support_files=support_files,
-                    output_folder=output_folder,
-                    model=model,
-                    temperature=temperature,
+            lock = threading.Lock()
+
+            def finish(filename, result):
+                if sink is not None:
+                    sink.write(filename, result, result.get("latency"))
+                self.store_result(
+                    run,
+                    os.path.join(submissions_folder, filename),
+                    result,
+                    result.get("latency"),
                 )
+                entry = {
+                    "success": result["success"],
+                    "model": result.get("model"),
+                    "needs_review": result.get("needs_review", False),
+                    "feedback_path": result.get("feedback_path"),
+                }
+                if not result["success"]:
+                    entry["error"], entry["error_path"] = self.spill_error(
+                        os.path.join(submissions_folder, filename),
+                        output_folder,
+                        result["feedback"],
+                    )
+                with lock:
+                    results[filename] = entry
+                    counts["success" if result["success"] else "fail"] += 1
+                    if progress_callback:
+                        progress_callback(filename, result)
+
+            def record(filename, result):
+                # Recorded once its feedback is on disk, off the API workers
+                self.on_feedback_written(result, partial(finish, filename))
+
+            run_id = run["id"] if run else None
+
+            def grade_one(filename, student_work=None):
+                if batch_token is not None and batch_token.cancelled:
+                    record(
+                        filename,
+                        {
+                            "success": False,
+                            "feedback": f"Not graded: {batch_token.reason}",
+                            "model": None,
+                        },
+                    )
+                    return
+
+                submission_path = os.path.join(submissions_folder, filename)
+                started = time.monotonic()
+                with archive_scope([submission_path], run_id):
+                    if ensemble_models:
+                        result = self.grade_ensemble(
+                            submission_file=submission_path,
+                            system_prompt=system_prompt,
+                            user_prompt=user_prompt,
+                            models=ensemble_models,
+                            support_files=support_files,
+                            output_folder=output_folder,
+                            temperature=temperature,
+                            samples=samples,
+                            template_file=template_file,
+                            rubric_file=rubric_file,
+                            system_content=system_content,
+                            cancel_token=batch_token,
+                        )
+                    else:
+                        result = self.grade_submission_result(
+                            submission_file=submission_path,
+                            system_prompt=system_prompt,
+                            user_prompt=user_prompt,
+                            support_files=support_files,
+                            output_folder=output_folder,
+                            model=model,
+                            temperature=temperature,
+                            template_file=template_file,
+                            rubric_file=rubric_file,
+                            per_criterion=per_criterion,
+                            system_content=system_content,
+                            cancel_token=batch_token,
+                            student_work=student_work,
+                        )
 
                 # Track results
-                results[filename] = {"success": success, "feedback": feedback}
-                if success:
-                    success_count += 1
+                result["latency"] = time.monotonic() - started
+                record(filename, result)
+
+            if max_workers is None:
+                max_workers = self.default_workers()
+            max_workers = max(1, max_workers)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                if pack and len(docx_files) > 1:
+                    # Packs and whatever is left over share the same workers
+                    with archive_scope(run_id=run_id):
+                        self._grade_packed(
+                            submissions_folder,
+                            docx_files,
+                            system_prompt,
+                            user_prompt,
+                            support_files,
+                            output_folder,
+                            model,
+                            temperature,
+                            template_file,
+                            record,
+                            grade_one,
+                            executor,
+                            max_workers,
+                            system_content,
+                            batch_token,
+                        )
                 else:
-                    fail_count += 1
+                    list(executor.map(grade_one, docx_files))
 
+            # Every result is recorded once its feedback has been written
+            self.flush_feedback()
+            success_count = counts["success"]
+            fail_count = counts["fail"]
             logging.info(
                 f"Graded {success_count} submissions successfully, {fail_count} failed"
             )
+            self.stats.increment("peak_prompt_bytes", self._prompt_budget.peak)
+            logging.info(f"Batch statistics:\n{self.stats.summary()}")
+            self.close_results_sink(sink)
+            sink = None
             return success_count, fail_count, results
 
         except Exception as e:
             error_msg = ErrorHandler.handle_file_error(e, submissions_folder)
             logging.error(error_msg)
             return 0, 0, {"error": error_msg}
+        finally:
+            if batch_token is not cancel_token:
+                batch_token.detach()
+            if sink is not None:
+                self.flush_feedback()
+                self.close_results_sink(sink)
+
+    def _grade_packed(
+        self,
+        submissions_folder,
+        docx_files,
+        system_prompt,
+        user_prompt,
+        support_files,
+        output_folder,
+        model,
+        temperature,
+        template_file,
+        record,
+        grade_single,
+        executor,
+        workers,
+        system_content=None,
+        cancel_token=None,
+    ):
+        """
+        Grade submissions in packed requests on the batch's workers.
+
+        Submissions are extracted and packed on the calling thread, one at a
+        time; each pack is graded on the executor alongside the submissions
+        that have to be graded on their own. At most two jobs per worker are
+        queued, so only the texts of those packs are held in memory.
+
+        Args:
+            submissions_folder (str): Path to submissions folder
+            docx_files (list): Submission filenames
+            system_prompt (str): System prompt text
+            user_prompt (str): User prompt text
+            support_files (str, optional): Path to support files folder
+            output_folder (str, optional): Path to output folder
+            model (str): Model key
+            temperature (float): Temperature setting (0-1)
+            template_file (str, optional): Path to the assignment template
+            record (callable): Called as record(filename, result)
+            grade_single (callable): Grades one submission on its own, called
+                as grade_single(filename, student_work=None)
+            executor (Executor): Workers of the batch
+            workers (int): Number of workers
+            system_content (str, optional): Precomputed system content
+            cancel_token (CancellationToken, optional): Token that aborts the
+                requests
+
+        Raises:
+            Exception: If a grading job failed unexpectedly
+        """
+        packer = SubmissionPacker(
+            token_budget=self.config.get_int("Batch", "PackTokenBudget", 6000),
+            max_per_pack=self.config.get_int("Batch", "PackMaxSubmissions", 4),
+        )
+        max_tokens = self.config.get_int("Batch", "PackMaxOutputTokens", 4000)
+        if output_folder:
+            FileUtils.ensure_dir_exists(output_folder)
+        if system_content is None:
+            system_content = self.prepare_system_content(system_prompt, support_files)
+        temperature = self.resolve_temperature(temperature)
+        self.refresh_api_client()
+
+        pending = threading.Semaphore(2 * workers)
+        futures = []
+
+        def submit(function, *args):
+            # Jobs never submit further jobs, so waiting here cannot deadlock
+            pending.acquire()
+
+            def job():
+                try:
+                    function(*args)
+                finally:
+                    pending.release()
+
+            futures.append(executor.submit(contextvars.copy_context().run, job))
+
+        def screened():
+            # Extract and screen each submission as packing reaches it;
+            # unreadable ones are graded singly unless screening marks them
+            # for review
+            for filename in docx_files:
+                if cancel_token is not None and cancel_token.cancelled:
+                    # Recorded as not graded without reading the file
+                    grade_single(filename)
+                    continue
+                submission_path = os.path.join(submissions_folder, filename)
+                text, reasons = self.screen_submission(submission_path, template_file)
+                if reasons:
+                    record(filename, self.needs_review_result(submission_path, reasons))
+                elif text is None:
+                    submit(grade_single, filename)
+                else:
+                    yield filename, text
+
+        def grade_pack(pack):
+            # Short ids keep the delimiters compact and avoid leaking names
+            ids = {f"S{i + 1}": filename for i, filename in enumerate(pack)}
+            user_content = packer.build_user_content(
+                user_prompt, {key: pack[filename] for key, filename in ids.items()}
+            )
+
+            pack_paths = [
+                os.path.join(submissions_folder, filename) for filename in pack
+            ]
+            model_name = None
+            try:
+                model_name = self.resolve_model(
+                    model, system_content, user_content, max_tokens
+                )
+                prompt_bytes = ByteBudget.size(user_content) + system_bytes
+                with self._prompt_budget.reserve(prompt_bytes, cancel_token):
+                    with archive_scope(pack_paths):
+                        response = self.client.generate_assessment(
+                            system_content=system_content,
+                            user_content=user_content,
+                            model=model_name,
+                            temperature=temperature,
+                            max_tokens=max_tokens,
+                            cancel_token=cancel_token,
+                        )
+                feedback_by_id = packer.parse_response(response, list(ids))
+                self.stats.increment("packed_requests")
+            except RequestCancelled:
+                # Every submission of the pack is recorded as not graded
+                feedback_by_id = {}
+            except Exception as e:
+                ErrorHandler.handle_api_error(e, "Packed request failed")
+                self.stats.increment("packed_requests")
+                feedback_by_id = {}
+
+            for key, filename in ids.items():
+                feedback = feedback_by_id.get(key)
+                if feedback is None:
+                    if cancel_token is None or not cancel_token.cancelled:
+                        self.stats.increment("pack_fallbacks")
+                    grade_single(filename, pack[filename])
+                    continue
+
+                submission_path = os.path.join(submissions_folder, filename)
+                feedback_path, written = self.write_feedback(
+                    submission_path, output_folder, feedback
+                )
+                self.stats.increment("packed_submissions")
+                logging.info(f"Submission graded (packed): {submission_path}")
+                record(
+                    filename,
+                    {
+                        "success": True,
+                        "feedback": feedback,
+                        "model": model_name,
+                        "feedback_path": feedback_path,
+                        "feedback_written": written,
+                    },
+                )
+
+        system_bytes = self.system_content_bytes(system_content)
+        for pack in packer.pack_stream(screened()):
+            if len(pack) < 2:
+                for filename, text in pack.items():
+                    submit(grade_single, filename, text)
+            else:
+                submit(grade_pack, pack)
+
+        for future in futures:
+            future.result()
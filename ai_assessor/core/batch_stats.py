@@ -0,0 +1,57 @@
+import threading
+
+
+class BatchStats:
+    """
+    Thread-safe counters collected while grading a batch.
+    """
+
+    def __init__(self):
+        """Initialize an empty set of counters."""
+        self._lock = threading.Lock()
+        self._counters = {}
+
+    def increment(self, name, amount=1):
+        """
+        Add to a counter.
+
+        Args:
+            name (str): Counter name
+            amount (int or float): Amount to add
+        """
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def get(self, name, default=0):
+        """
+        Get the current value of a counter.
+
+        Args:
+            name (str): Counter name
+            default: Value returned if the counter was never set
+
+        Returns:
+            int or float: Counter value
+        """
+        with self._lock:
+            return self._counters.get(name, default)
+
+    def as_dict(self):
+        """
+        Get a snapshot of all counters.
+
+        Returns:
+            dict: Counter names mapped to values
+        """
+        with self._lock:
+            return dict(self._counters)
+
+    def summary(self):
+        """
+        Format the counters for logs and console output.
+
+        Returns:
+            str: One "name: value" pair per line, sorted by name
+        """
+        snapshot = self.as_dict()
+        return "\n".join(f"{name}: {snapshot[name]}" for name in sorted(snapshot))
@@ -0,0 +1,151 @@
+import logging
+import threading
+
+
+class RequestCancelled(Exception):
+    """
+    Raised when an in-flight request is cancelled or runs out of time.
+
+    Attributes:
+        usage (dict): Estimated prompt, completion and total tokens spent
+            before the request was cancelled
+    """
+
+    def __init__(self, message="Request cancelled", usage=None):
+        super().__init__(message)
+        self.usage = usage or {
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "total_tokens": 0,
+        }
+
+
+class CancellationToken:
+    """
+    Thread-safe flag used to cancel work in flight.
+
+    A token may carry a timeout, after which it cancels itself, and may be
+    the child of another token, so cancelling a batch cancels every request
+    in it. Callbacks registered with add_callback run on cancellation; the
+    API client uses them to close open connections.
+    """
+
+    def __init__(self, timeout=None, parent=None):
+        """
+        Initialize a token that is not cancelled.
+
+        Args:
+            timeout (float, optional): Seconds until the token cancels itself
+            parent (CancellationToken, optional): Token whose cancellation
+                also cancels this one
+        """
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+        self.reason = None
+
+        self._parent = parent
+        if parent is not None:
+            parent.add_callback(self._cancel_from_parent)
+
+        self._timer = None
+        if timeout:
+            self._timer = threading.Timer(
+                timeout, self.cancel, args=(f"Timed out after {timeout:g}s",)
+            )
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _cancel_from_parent(self):
+        """Propagate the parent's cancellation."""
+        self.cancel(self._parent.reason)
+
+    def child(self, timeout=None):
+        """
+        Create a token cancelled together with this one.
+
+        Args:
+            timeout (float, optional): Seconds until the child cancels itself
+
+        Returns:
+            CancellationToken: The child token
+        """
+        return CancellationToken(timeout=timeout, parent=self)
+
+    def cancel(self, reason="Cancelled"):
+        """
+        Cancel the work holding this token.
+
+        Args:
+            reason (str): Why the work was cancelled
+        """
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks = list(self._callbacks)
+            self._callbacks = []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logging.debug(f"Cancellation callback failed: {str(e)}")
+
+    @property
+    def cancelled(self):
+        """bool: Whether cancel has been called."""
+        return self._event.is_set()
+
+    def wait(self, timeout=None):
+        """
+        Wait until the token is cancelled.
+
+        Args:
+            timeout (float, optional): Seconds to wait
+
+        Returns:
+            bool: True if the token was cancelled
+        """
+        return self._event.wait(timeout)
+
+    def add_callback(self, callback):
+        """
+        Run a callback on cancellation (at once if already cancelled).
+
+        Args:
+            callback (callable): Function taking no arguments
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def remove_callback(self, callback):
+        """
+        Stop a callback from running on cancellation.
+
+        Args:
+            callback (callable): Callback passed to add_callback
+        """
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def detach(self):
+        """Stop the timeout and forget the parent once the work is done."""
+        if self._timer is not None:
+            self._timer.cancel()
+        if self._parent is not None:
+            self._parent.remove_callback(self._cancel_from_parent)
+
+    def raise_if_cancelled(self):
+        """
+        Stop the current work if the token was cancelled.
+
+        Raises:
+            RequestCancelled: If the token was cancelled
+        """
+        if self.cancelled:
+            raise RequestCancelled(self.reason)
@@ -0,0 +1,142 @@
+import math
+
+
+class CascadePolicy:
+    """
+    Decides when a cheap first-pass assessment must be re-graded.
+
+    A fast, cheap model grades every submission first. Only submissions whose
+    total lands near a grade boundary, or whose confidence is low, are sent
+    to the configured premium model. The policy is configured with the
+    Cascade* options in the [Models] section.
+    """
+
+    def __init__(
+        self,
+        enabled=False,
+        first_pass_model="",
+        confidence_threshold=0.75,
+        boundaries=None,
+        boundary_margin=3.0,
+        first_pass_cost=0.0,
+        premium_cost=0.0,
+    ):
+        """
+        Initialize the policy.
+
+        Args:
+            enabled (bool): Whether the cascade is active
+            first_pass_model (str): Model key used for the first pass
+            confidence_threshold (float): Escalate below this confidence (0-1)
+            boundaries (list): Grade boundaries as percentages of the total
+            boundary_margin (float): Escalate if the percentage is within this
+                many points of a boundary
+            first_pass_cost (float): First-pass price per 1K tokens
+            premium_cost (float): Premium price per 1K tokens
+        """
+        self.enabled = enabled and bool(first_pass_model)
+        self.first_pass_model = first_pass_model
+        self.confidence_threshold = confidence_threshold
+        self.boundaries = boundaries or []
+        self.boundary_margin = boundary_margin
+        self.first_pass_cost = first_pass_cost
+        self.premium_cost = premium_cost
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Build the policy from the [Models] section.
+
+        Args:
+            config (ConfigManager): Configuration manager
+
+        Returns:
+            CascadePolicy: The configured policy
+        """
+        boundaries = []
+        for value in config.get_value("Models", "CascadeBoundaries", "").split(","):
+            try:
+                boundaries.append(float(value))
+            except ValueError:
+                continue
+
+        return cls(
+            enabled=config.get_bool("Models", "CascadeEnabled", False),
+            first_pass_model=config.get_value("Models", "CascadeFirstPassModel", ""),
+            confidence_threshold=config.get_float(
+                "Models", "CascadeConfidenceThreshold", 0.75
+            ),
+            boundaries=boundaries,
+            boundary_margin=config.get_float("Models", "CascadeBoundaryMargin", 3.0),
+            first_pass_cost=config.get_float("Models", "CascadeFirstPassCost", 0.0),
+            premium_cost=config.get_float("Models", "CascadePremiumCost", 0.0),
+        )
+
+    def is_borderline(self, total, max_total):
+        """
+        Check whether a total is close to a grade boundary.
+
+        Args:
+            total (float): Awarded marks
+            max_total (float): Maximum marks
+
+        Returns:
+            bool: True if within the margin of any boundary
+        """
+        if not max_total:
+            return False
+        percentage = 100.0 * total / max_total
+        return any(
+            abs(percentage - boundary) <= self.boundary_margin
+            for boundary in self.boundaries
+        )
+
+    def should_escalate(self, scores, confidence):
+        """
+        Decide whether the first-pass result needs the premium model.
+
+        Args:
+            scores (dict, optional): Validated rubric scores
+            confidence (float, optional): Confidence signal (0-1)
+
+        Returns:
+            tuple: (escalate, reason)
+        """
+        if confidence is None:
+            return True, "no confidence signal"
+        if confidence < self.confidence_threshold:
+            return True, f"low confidence ({confidence:.2f})"
+        if scores and self.is_borderline(scores["total"], scores["max_total"]):
+            return True, f"borderline total ({scores['total']})"
+        return False, "confident first pass"
+
+    @staticmethod
+    def confidence_from_logprobs(logprobs):
+        """
+        Derive a confidence signal from token log probabilities.
+
+        Args:
+            logprobs (list, optional): Log probability of each output token
+
+        Returns:
+            float: Geometric mean token probability (0-1), or None
+        """
+        if not logprobs:
+            return None
+        return math.exp(sum(logprobs) / len(logprobs))
+
+    @staticmethod
+    def cost(usage, price_per_1k):
+        """
+        Estimate the cost of a request.
+
+        Args:
+            usage (dict, optional): Token usage with total_tokens
+            price_per_1k (float): Price per 1K tokens
+
+        Returns:
+            float: Estimated cost
+        """
+        if not usage:
+            return 0.0
+        return usage.get("total_tokens", 0) / 1000.0 * price_per_1k
@@ -0,0 +1,210 @@
+import threading
+import time
+
+
+class AIMDLimiter:
+    """
+    Concurrency limit that adapts with additive increase, multiplicative
+    decrease.
+
+    Each healthy response raises the limit by about one request per round
+    trip; a rate limit, timeout or latency spike cuts it by a constant
+    factor. Only one cut is made per round of requests, so a burst of
+    failures from the same overload does not collapse the limit.
+    """
+
+    # Successful responses needed before the latency baseline is trusted
+    WARMUP_SAMPLES = 5
+
+    # Longest wait between checks of the cancel token
+    POLL_SECONDS = 0.5
+
+    def __init__(
+        self, initial=2, minimum=1, maximum=32, decrease=0.5, latency_factor=2.0
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            initial (int): Starting limit
+            minimum (int): Lowest limit
+            maximum (int): Highest limit
+            decrease (float): Factor applied to the limit on overload
+            latency_factor (float): Latency above this multiple of the
+                baseline counts as a spike
+        """
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.in_flight = 0
+        self.baseline = None
+        self.samples = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self, cancel_token=None):
+        """
+        Wait for a free slot under the current limit.
+
+        Args:
+            cancel_token (CancellationToken, optional): Token that stops the
+                wait; checked at least every POLL_SECONDS
+
+        Returns:
+            float: Monotonic start time, passed back to release
+
+        Raises:
+            RequestCancelled: If the token is cancelled while waiting
+        """
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+                self._condition.wait(timeout=self.POLL_SECONDS)
+            self.in_flight += 1
+            return time.monotonic()
+
+    def try_acquire(self):
+        """
+        Take a free slot without waiting.
+
+        Returns:
+            float: Monotonic start time, passed back to release, or None if
+                the limit is reached
+        """
+        with self._condition:
+            if self.in_flight >= int(self.limit):
+                return None
+            self.in_flight += 1
+            return time.monotonic()
+
+    def has_room(self):
+        """
+        Check whether a slot is free without taking it.
+
+        Returns:
+            bool: True if below the current limit
+        """
+        return self.in_flight < int(self.limit)
+
+    def release(self, started, outcome):
+        """
+        Free a slot and adapt the limit.
+
+        Args:
+            started (float): Value returned by acquire
+            outcome (str): "success", "overload" (rate limit or timeout),
+                "error" or None for a cancelled request
+        """
+        latency = time.monotonic() - started
+        with self._condition:
+            self.in_flight -= 1
+            if outcome == "success":
+                spike = (
+                    self.samples >= self.WARMUP_SAMPLES
+                    and latency > self.baseline * self.latency_factor
+                )
+                self.baseline = (
+                    latency
+                    if self.baseline is None
+                    else 0.9 * self.baseline + 0.1 * latency
+                )
+                self.samples += 1
+                if spike:
+                    self._cut(started)
+                else:
+                    self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            elif outcome == "overload":
+                self._cut(started)
+            self._condition.notify_all()
+
+    def _cut(self, started):
+        """Decrease the limit unless it was already cut during this request."""
+        if started < self._last_decrease:
+            return
+        self.limit = max(self.minimum, self.limit * self.decrease)
+        self._last_decrease = time.monotonic()
+
+    @property
+    def current(self):
+        """int: Requests currently allowed in flight."""
+        return int(self.limit)
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD limiters for one API client, kept separately per model.
+    """
+
+    def __init__(self, initial=2, minimum=1, maximum=32, latency_factor=2.0):
+        """
+        Initialize the controller.
+
+        Args:
+            initial (int): Starting limit for each model
+            minimum (int): Lowest limit
+            maximum (int): Highest limit
+            latency_factor (float): Latency spike threshold (see AIMDLimiter)
+        """
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_factor = latency_factor
+        self._lock = threading.Lock()
+        self._limiters = {}
+
+    @classmethod
+    def from_config(cls, config, maximum=None):
+        """
+        Build the controller from the Batch.Adaptive* options.
+
+        Args:
+            config (ConfigManager): Configuration manager
+            maximum (int, optional): Highest limit (defaults to
+                Batch.AdaptiveMaxConcurrency)
+
+        Returns:
+            AdaptiveConcurrency: The controller, or None when
+                Batch.AdaptiveConcurrency is off
+        """
+        if not config.get_bool("Batch", "AdaptiveConcurrency", False):
+            return None
+        if maximum is None:
+            maximum = config.get_int("Batch", "AdaptiveMaxConcurrency", 16)
+        return cls(
+            initial=config.get_int("Batch", "AdaptiveInitialConcurrency", 2),
+            maximum=maximum,
+            latency_factor=config.get_float("Batch", "AdaptiveLatencyFactor", 2.0),
+        )
+
+    def limiter(self, model):
+        """
+        Get the limiter for a model, creating it on first use.
+
+        Args:
+            model (str): Model name
+
+        Returns:
+            AIMDLimiter: The model's limiter
+        """
+        with self._lock:
+            if model not in self._limiters:
+                self._limiters[model] = AIMDLimiter(
+                    initial=self.initial,
+                    minimum=self.minimum,
+                    maximum=self.maximum,
+                    latency_factor=self.latency_factor,
+                )
+            return self._limiters[model]
+
+    def snapshot(self):
+        """
+        Get the limit each model has settled on.
+
+        Returns:
+            dict: Model names mapped to their current limit
+        """
+        with self._lock:
+            return {model: lim.current for model, lim in self._limiters.items()}
@@ -0,0 +1,517 @@
+import logging
+import threading
+import time
+
+from .api_client import OpenAIClient
+from .cancellation import RequestCancelled
+from .concurrency import AdaptiveConcurrency
+
+
+class Endpoint:
+    """
+    One OpenAI-compatible server in an endpoint pool.
+
+    Tracks the requests currently in flight and a health state. An endpoint
+    that fails, or whose average time to first token exceeds the slow
+    threshold, is taken out of rotation for a cool-down period; so is one
+    with a request still waiting for its first token after the slow
+    threshold, while it waits. Latency is measured to the first token so
+    that long answers, which take a while to decode on a healthy server,
+    do not count as slow. With adaptive concurrency each model also has an
+    AIMD limit on the endpoint, below max_concurrency.
+    """
+
+    def __init__(
+        self, name, base_url, api_key, ssl_verify=True, max_concurrency=4, weight=1.0
+    ):
+        """
+        Initialize the endpoint.
+
+        Args:
+            name (str): Endpoint name used in logs and statistics
+            base_url (str): Base URL of the provider
+            api_key (str): API key for the provider
+            ssl_verify (bool): Whether to verify SSL certificates
+            max_concurrency (int): Maximum requests in flight at once
+            weight (float): Relative share of the load
+        """
+        self.name = name
+        self.base_url = base_url
+        self.api_key = api_key
+        self.ssl_verify = ssl_verify
+        self.max_concurrency = max(1, max_concurrency)
+        self.weight = weight if weight > 0 else 1.0
+        self.client = OpenAIClient(api_key, base_url, ssl_verify)
+        # AdaptiveConcurrency consulted by the pool, if enabled
+        self.concurrency = None
+
+        self.in_flight = 0
+        # Start times of the requests waiting for their first token (None
+        # once the answer is streaming in)
+        self.running = {}
+        self.served = 0
+        self.failures = 0
+        self.latency = None
+        self.unhealthy_until = 0.0
+
+    def is_healthy(self, now=None):
+        """
+        Check whether the endpoint is in rotation.
+
+        Args:
+            now (float, optional): Current monotonic time
+
+        Returns:
+            bool: True unless the endpoint is cooling down
+        """
+        return (now if now is not None else time.monotonic()) >= self.unhealthy_until
+
+    def is_stuck(self, slow_seconds, now=None):
+        """
+        Check whether a request has waited too long for its first token.
+
+        Args:
+            slow_seconds (float): Longest expected time to first token
+            now (float, optional): Current monotonic time
+
+        Returns:
+            bool: True if a request started more than slow_seconds ago and
+                has produced nothing yet
+        """
+        now = now if now is not None else time.monotonic()
+        return any(
+            started is not None and now - started > slow_seconds
+            for started in self.running.values()
+        )
+
+    def limiter(self, model):
+        """
+        Get the adaptive limiter for a model on this endpoint.
+
+        Args:
+            model (str, optional): Model name
+
+        Returns:
+            AIMDLimiter: The limiter, or None without adaptive concurrency
+        """
+        if self.concurrency is None or model is None:
+            return None
+        return self.concurrency.limiter(model)
+
+    def has_capacity(self, model=None):
+        """
+        Check whether another request may be sent.
+
+        Args:
+            model (str, optional): Model of the request
+
+        Returns:
+            bool: True if below the concurrency limit and the model's
+                adaptive limit
+        """
+        limiter = self.limiter(model)
+        return self.in_flight < self.max_concurrency and (
+            limiter is None or limiter.has_room()
+        )
+
+    def load(self):
+        """
+        Weighted load used to pick the least-loaded endpoint.
+
+        Returns:
+            float: Requests in flight divided by the weight
+        """
+        return self.in_flight / self.weight
+
+    def settings(self):
+        """
+        Connection settings that identify this endpoint.
+
+        Returns:
+            tuple: (name, base_url, api_key, ssl_verify, max_concurrency,
+                weight, adaptive, connect, read and request timeouts)
+        """
+        return (
+            self.name,
+            self.base_url,
+            self.api_key,
+            self.ssl_verify,
+            self.max_concurrency,
+            self.weight,
+            self.concurrency is not None,
+            self.client.connect_timeout,
+            self.client.read_timeout,
+            self.client.request_timeout,
+        )
+
+
+class EndpointPool:
+    """
+    Spreads requests over several endpoints with failover.
+
+    Endpoints are configured in config.ini as one section each::
+
+        [Endpoint:gpu1]
+        BaseURL = http://gpu1:11434
+        Key = ollama
+        MaxConcurrency = 2
+        Weight = 1
+
+    Every request goes to the least-loaded healthy endpoint that has a free
+    slot, counting the adaptive limit of the request's model, so a request
+    never queues behind a host whose limit was cut while another has room.
+    If the request fails because of the endpoint (rate limit, timeout,
+    connection error or server error) it is retried on the next endpoint
+    and the failing one is cooled down; errors about the request itself
+    (bad request, context too long, authentication, truncated output) are
+    raised at once, since every endpoint would reject it the same way.
+    Requests are streamed so the pool can time the first token. The pool
+    exposes the same completion methods
+    as OpenAIClient, so the assessor can use either.
+    """
+
+    SECTION_PREFIX = "Endpoint:"
+
+    def __init__(self, endpoints, slow_seconds=60.0, cooldown_seconds=30.0):
+        """
+        Initialize the pool.
+
+        Args:
+            endpoints (list): Endpoint instances
+            slow_seconds (float): Average time to first token above which an
+                endpoint is treated as unhealthy
+            cooldown_seconds (float): Time an unhealthy endpoint is skipped
+        """
+        self.endpoints = list(endpoints)
+        self.slow_seconds = slow_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self._condition = threading.Condition()
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Build the pool from the [Endpoint:<name>] sections.
+
+        Args:
+            config (ConfigManager): Configuration manager
+
+        Returns:
+            EndpointPool: The configured pool (empty if none are configured)
+        """
+        endpoints = []
+        for section in config.config.sections():
+            if not section.startswith(cls.SECTION_PREFIX):
+                continue
+            name = section[len(cls.SECTION_PREFIX) :].strip()
+            base_url = config.get_value(section, "BaseURL", "")
+            if not name or not base_url:
+                logging.warning(f"Ignoring endpoint without a BaseURL: {section}")
+                continue
+            endpoint = Endpoint(
+                name,
+                base_url,
+                config.get_value(section, "Key", ""),
+                ssl_verify=config.get_bool(section, "SSLVerify", True),
+                max_concurrency=config.get_int(section, "MaxConcurrency", 4),
+                weight=config.get_float(section, "Weight", 1.0),
+            )
+            endpoint.client.connect_timeout = config.get_float(
+                "API", "ConnectTimeout", 10.0
+            )
+            endpoint.client.read_timeout = config.get_float("API", "ReadTimeout", 600.0)
+            endpoint.client.request_timeout = config.get_float(
+                "API", "RequestTimeout", 0
+            )
+            endpoint.client.max_continuations = config.get_int(
+                "API", "MaxContinuations", 2
+            )
+            # MaxConcurrency caps the adaptive limit of each endpoint
+            endpoint.concurrency = AdaptiveConcurrency.from_config(
+                config, maximum=endpoint.max_concurrency
+            )
+            endpoints.append(endpoint)
+        return cls(
+            endpoints,
+            slow_seconds=config.get_float("Batch", "EndpointSlowSeconds", 60.0),
+            cooldown_seconds=config.get_float("Batch", "EndpointCooldown", 30.0),
+        )
+
+    def settings(self):
+        """
+        Settings of every endpoint, used to detect configuration changes.
+
+        Returns:
+            tuple: Settings tuples of all endpoints in order
+        """
+        return tuple(endpoint.settings() for endpoint in self.endpoints) + (
+            self.slow_seconds,
+            self.cooldown_seconds,
+        )
+
+    @property
+    def capacity(self):
+        """int: Total requests the pool can have in flight."""
+        return sum(endpoint.max_concurrency for endpoint in self.endpoints)
+
+    def _pick(self, exclude, model=None):
+        """
+        Choose the least-loaded endpoint with a free slot.
+
+        Unhealthy endpoints, and endpoints with a stuck request, are only
+        used when every endpoint is unhealthy or stuck.
+
+        Args:
+            exclude (set): Names of endpoints already tried for this request
+            model (str, optional): Model of the request
+
+        Returns:
+            Endpoint: Chosen endpoint, or None if all candidates are busy
+        """
+        candidates = [e for e in self.endpoints if e.name not in exclude]
+        now = time.monotonic()
+        healthy = [
+            e
+            for e in candidates
+            if e.is_healthy(now) and not e.is_stuck(self.slow_seconds, now)
+        ]
+        free = [e for e in (healthy or candidates) if e.has_capacity(model)]
+        if not free:
+            return None
+        return min(free, key=lambda endpoint: endpoint.load())
+
+    def acquire(self, exclude=(), model=None, cancel_token=None):
+        """
+        Reserve a slot on the least-loaded healthy endpoint.
+
+        Blocks until a slot frees up. With adaptive concurrency the slot
+        also holds one of the model's requests on the endpoint; release it
+        with the same model.
+
+        Args:
+            exclude (iterable): Names of endpoints to skip
+            model (str, optional): Model of the request
+            cancel_token (CancellationToken, optional): Token that stops the
+                wait
+
+        Returns:
+            Endpoint: Reserved endpoint, or None if every endpoint is excluded
+
+        Raises:
+            RequestCancelled: If the token is cancelled while waiting
+        """
+        exclude = set(exclude)
+        with self._condition:
+            while True:
+                if all(e.name in exclude for e in self.endpoints):
+                    return None
+                endpoint = self._pick(exclude, model)
+                if endpoint:
+                    endpoint.in_flight += 1
+                    limiter = endpoint.limiter(model)
+                    if limiter is not None:
+                        limiter.try_acquire()
+                    return endpoint
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+                # Wake up periodically so cooled-down endpoints rejoin and
+                # cancellation is noticed
+                self._condition.wait(timeout=0.5)
+
+    def release(
+        self,
+        endpoint,
+        success,
+        elapsed,
+        model=None,
+        overloaded=False,
+        first_token=None,
+    ):
+        """
+        Free a slot and update the endpoint's health.
+
+        Args:
+            endpoint (Endpoint): Endpoint returned by acquire
+            success (bool): Whether the request succeeded, or None if it was
+                cancelled or rejected (which says nothing about the
+                endpoint's health)
+            elapsed (float): Request duration in seconds
+            model (str, optional): Model passed to acquire
+            overloaded (bool): Whether the failure was a rate limit or
+                timeout, which cuts the model's adaptive limit
+            first_token (float, optional): Seconds until the first token,
+                used for the latency average instead of elapsed
+        """
+        limiter = endpoint.limiter(model)
+        if limiter is not None:
+            if success is None:
+                outcome = None
+            elif success:
+                outcome = "success"
+            else:
+                outcome = "overload" if overloaded else "error"
+            limiter.release(time.monotonic() - elapsed, outcome)
+        with self._condition:
+            endpoint.in_flight -= 1
+            if success is None:
+                pass
+            elif success:
+                endpoint.served += 1
+                sample = first_token if first_token is not None else elapsed
+                endpoint.latency = (
+                    sample
+                    if endpoint.latency is None
+                    else 0.7 * endpoint.latency + 0.3 * sample
+                )
+                if endpoint.latency > self.slow_seconds:
+                    logging.warning(
+                        f"Endpoint {endpoint.name} is slow "
+                        f"({endpoint.latency:.1f}s average); cooling down"
+                    )
+                    endpoint.unhealthy_until = time.monotonic() + self.cooldown_seconds
+                    # Start afresh once the cool-down is over
+                    endpoint.latency = None
+            else:
+                endpoint.failures += 1
+                endpoint.unhealthy_until = time.monotonic() + self.cooldown_seconds
+            self._condition.notify_all()
+
+    def _send(self, endpoint, method, *args, **kwargs):
+        """
+        Run a client method on an endpoint, timing its first token.
+
+        Returns:
+            tuple: (the method's return value, seconds until the first token
+                or None if it was not observed)
+        """
+        request = object()
+        started = time.monotonic()
+        first_token = []
+        if method == "generate_completion":
+            callback = kwargs.get("on_first_token")
+
+            def on_first_token():
+                first_token.append(time.monotonic() - started)
+                with self._condition:
+                    endpoint.running[request] = None
+                if callback is not None:
+                    callback()
+
+            kwargs["on_first_token"] = on_first_token
+
+        with self._condition:
+            endpoint.running[request] = started
+        try:
+            value = getattr(endpoint.client, method)(*args, **kwargs)
+        finally:
+            with self._condition:
+                del endpoint.running[request]
+        return value, (first_token[0] if first_token else None)
+
+    def _call(self, method, *args, **kwargs):
+        """
+        Run a client method on the pool, failing over between endpoints.
+
+        Args:
+            method (str): OpenAIClient method name
+            *args: Positional arguments for the method
+            **kwargs: Keyword arguments for the method
+
+        Returns:
+            The method's return value
+
+        Raises:
+            Exception: If no endpoints are configured or every endpoint failed
+        """
+        if not self.endpoints:
+            raise Exception("No endpoints configured")
+
+        model = kwargs.get("model", args[2] if len(args) > 2 else None)
+        cancel_token = kwargs.get("cancel_token")
+        tried = set()
+        last_error = None
+        while True:
+            endpoint = self.acquire(
+                exclude=tried, model=model, cancel_token=cancel_token
+            )
+            if endpoint is None:
+                raise Exception(f"All endpoints failed: {str(last_error)}")
+            tried.add(endpoint.name)
+            start = time.monotonic()
+            try:
+                value, first_token = self._send(endpoint, method, *args, **kwargs)
+            except RequestCancelled:
+                self.release(endpoint, None, time.monotonic() - start, model)
+                raise
+            except Exception as e:
+                if not OpenAIClient.is_endpoint_failure(e):
+                    # The request itself was rejected; so would it be elsewhere
+                    self.release(endpoint, None, time.monotonic() - start, model)
+                    raise
+                self.release(
+                    endpoint,
+                    False,
+                    time.monotonic() - start,
+                    model,
+                    overloaded=OpenAIClient.is_overload(e),
+                )
+                logging.warning(f"Endpoint {endpoint.name} failed: {str(e)}")
+                last_error = e
+                continue
+            self.release(
+                endpoint,
+                True,
+                time.monotonic() - start,
+                model,
+                first_token=first_token,
+            )
+            if isinstance(value, dict):
+                value["endpoint"] = endpoint.name
+            return value
+
+    def generate_completion(self, *args, **kwargs):
+        """
+        Generate a completion on the pool.
+
+        Takes the same arguments as OpenAIClient.generate_completion.
+
+        Returns:
+            dict: The completion, with "endpoint" set to the endpoint used
+        """
+        return self._call("generate_completion", *args, **kwargs)
+
+    def generate_assessment(
+        self,
+        system_content,
+        user_content,
+        model,
+        temperature=0.7,
+        max_tokens=3500,
+        response_format=None,
+        cancel_token=None,
+    ):
+        """
+        Generate an assessment on the pool.
+
+        Takes the same arguments as OpenAIClient.generate_assessment.
+
+        Returns:
+            str: The generated feedback
+        """
+        return self.generate_completion(
+            system_content,
+            user_content,
+            model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            response_format=response_format,
+            cancel_token=cancel_token,
+        )["content"]
+
+    def list_models(self):
+        """
+        List models from the first endpoint that answers.
+
+        Returns:
+            list: A list of model IDs
+        """
+        return self._call("list_models")
@@ -0,0 +1,126 @@
+import re
+import statistics
+
+
+class EnsembleAggregator:
+    """
+    Combines rubric scores from several models (or samples) of one submission.
+
+    For every criterion and for the total it reports the mean, median and
+    range, and flags a disagreement when the range exceeds a threshold given
+    as a percentage of the available marks.
+    """
+
+    def __init__(self, disagreement_threshold=10.0):
+        """
+        Initialize the aggregator.
+
+        Args:
+            disagreement_threshold (float): Range, as a percentage of the
+                maximum marks, above which members are said to disagree
+        """
+        self.disagreement_threshold = disagreement_threshold
+
+    @staticmethod
+    def member_label(model_name, sample_index=0, samples=1):
+        """
+        Build a filename-safe label for an ensemble member.
+
+        Args:
+            model_name (str): Model name
+            sample_index (int): Index of the sample for this model
+            samples (int): Number of samples requested per model
+
+        Returns:
+            str: Label such as "gpt-4o" or "llama3.1_8b_2"
+        """
+        label = re.sub(r"[^\w.-]+", "_", model_name).strip("_")
+        if samples > 1:
+            label = f"{label}_{sample_index + 1}"
+        return label
+
+    def _summarize(self, values, max_marks):
+        """
+        Summarize one set of marks.
+
+        Args:
+            values (list): Marks awarded by each member
+            max_marks (float): Maximum marks available
+
+        Returns:
+            dict: mean, median, min, max, spread and disagreement
+        """
+        spread = max(values) - min(values)
+        return {
+            "mean": statistics.mean(values),
+            "median": statistics.median(values),
+            "min": min(values),
+            "max": max(values),
+            "spread": spread,
+            "disagreement": bool(max_marks)
+            and 100.0 * spread / max_marks > self.disagreement_threshold,
+        }
+
+    def aggregate(self, member_scores):
+        """
+        Aggregate validated scores from every member.
+
+        Args:
+            member_scores (dict): Member labels mapped to validated scores
+                (members without scores are left out)
+
+        Returns:
+            dict: "members", "criteria" (per-criterion summaries), "total" and
+                "disagreement", or None if no member returned scores
+        """
+        scored = {label: s for label, s in member_scores.items() if s}
+        if not scored:
+            return None
+
+        first = next(iter(scored.values()))
+        criteria = []
+        for index, entry in enumerate(first["criteria"]):
+            values = [s["criteria"][index]["score"] for s in scored.values()]
+            summary = self._summarize(values, entry["max_marks"])
+            summary["criterion"] = entry["criterion"]
+            summary["max_marks"] = entry["max_marks"]
+            criteria.append(summary)
+
+        total = self._summarize(
+            [s["total"] for s in scored.values()], first["max_total"]
+        )
+        total["max_marks"] = first["max_total"]
+
+        return {
+            "members": {label: s["total"] for label, s in scored.items()},
+            "criteria": criteria,
+            "total": total,
+            "disagreement": total["disagreement"]
+            or any(c["disagreement"] for c in criteria),
+        }
+
+    @staticmethod
+    def format_report(aggregate):
+        """
+        Render an aggregate as a readable moderation report.
+
+        Args:
+            aggregate (dict): Result of aggregate
+
+        Returns:
+            str: Report text
+        """
+        lines = ["Ensemble moderation report", ""]
+        for label, total in aggregate["members"].items():
+            lines.append(f"{label}: {total}")
+        lines.append("")
+
+        rows = aggregate["criteria"] + [dict(aggregate["total"], criterion="Total")]
+        for row in rows:
+            flag = "  <-- DISAGREEMENT" if row["disagreement"] else ""
+            lines.append(
+                f"{row['criterion']} (/{row['max_marks']}): "
+                f"mean {row['mean']:.1f}, median {row['median']:.1f}, "
+                f"range {row['min']}-{row['max']}{flag}"
+            )
+        return "\n".join(lines)
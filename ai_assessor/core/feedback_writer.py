@@ -0,0 +1,249 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import Future
+
+from ..utils.document_processor import DocumentProcessor
+from ..utils.error_handling import ErrorHandler
+
+
+class FeedbackWriter:
+    """
+    Writes feedback files from a dedicated thread.
+
+    Grading threads only queue the text, so a slow disk or network share
+    never holds up an API worker. Each file is written to a temporary file
+    in the target folder and renamed over the final name, so a crash never
+    leaves truncated feedback. Files are synced and renamed in groups of up
+    to sync_every (or as soon as the queue runs dry), with one directory
+    sync per group. Each folder is created once until the next flush.
+
+    Every write returns a Future that completes with the path once the file
+    is in place, or with the error if it could not be written. With
+    background=False writes happen in the calling thread, still
+    atomically. Feedback can also be rendered as a Word document, based on
+    a template that is read once.
+    """
+
+    TEXT = "text"
+    DOCX = "docx"
+
+    def __init__(
+        self, sync_every=20, max_queued=256, docx_template=None, background=True
+    ):
+        """
+        Initialize the writer. The thread starts with the first write.
+
+        Args:
+            sync_every (int): Most files written between syncs
+            max_queued (int): Files queued before writers have to wait
+            docx_template (str, optional): Word document whose styles, headers
+                and content every .docx feedback file starts from
+            background (bool): Write from a dedicated thread
+
+        Raises:
+            OSError: If the template cannot be read
+        """
+        self.sync_every = max(1, sync_every)
+        self.background = background
+        self.docx_template = docx_template
+        self.written = 0
+        self._template_bytes = None
+        if docx_template:
+            with open(docx_template, "rb") as f:
+                self._template_bytes = f.read()
+        self._queue = queue.Queue(maxsize=max(1, max_queued))
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pending = []
+        self._directories = set()
+        self._errors = []
+        self._settled = []
+
+    def write(self, path, content):
+        """
+        Write a text file.
+
+        Args:
+            path (str): Destination path
+            content (str): File content
+
+        Returns:
+            Future: Completed with the path once the file is on disk
+        """
+        return self._submit(self.TEXT, path, content)
+
+    def write_docx(self, path, content):
+        """
+        Write feedback as a Word document.
+
+        Args:
+            path (str): Destination .docx path
+            content (str): Feedback text; "#" lines become headings
+
+        Returns:
+            Future: Completed with the path once the file is on disk
+        """
+        return self._submit(self.DOCX, path, content)
+
+    def _submit(self, kind, path, content):
+        """Queue a file, or write it now without a background thread."""
+        future = Future()
+        item = (kind, path, content, future)
+        # Callbacks run on the writer thread; files they write go inline
+        if not self.background or threading.current_thread() is self._thread:
+            with self._lock:
+                self._stage(*item)
+                self._commit()
+            self._settle()
+            return future
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                if self._thread is None:
+                    atexit.register(self.close)
+                self._thread = threading.Thread(target=self._work, daemon=True)
+                self._thread.start()
+        self._queue.put(item)
+        return future
+
+    def _work(self):
+        """Write queued files until close() queues None."""
+        while True:
+            item = self._queue.get()
+            try:
+                with self._lock:
+                    if item is not None:
+                        self._stage(*item)
+                    if (
+                        item is None
+                        or self._queue.empty()
+                        or len(self._pending) >= self.sync_every
+                    ):
+                        self._commit()
+                self._settle()
+            except Exception as e:
+                logging.error(f"Feedback writer failed: {str(e)}")
+            finally:
+                self._queue.task_done()
+            if item is None:
+                return
+
+    def _stage(self, kind, path, content, future):
+        """Write one file to a temporary name in its folder."""
+        directory = os.path.dirname(path) or "."
+        try:
+            if directory not in self._directories:
+                os.makedirs(directory, exist_ok=True)
+                self._directories.add(directory)
+            temp_path = DocumentProcessor.temp_path(path)
+            if kind == self.DOCX:
+                handle = open(temp_path, "xb")
+            else:
+                handle = open(temp_path, "x", encoding="utf-8")
+        except OSError as e:
+            self._fail(path, e, future)
+            return
+
+        try:
+            if kind == self.DOCX:
+                DocumentProcessor.render_feedback(content, self._template_bytes).save(
+                    handle
+                )
+            else:
+                handle.write(content)
+            self._pending.append((handle, temp_path, path, future))
+        except Exception as e:
+            handle.close()
+            self._discard(temp_path)
+            self._fail(path, e, future)
+
+    def _commit(self):
+        """Sync pending files, rename them into place and sync their folders."""
+        directories = set()
+        pending, self._pending = self._pending, []
+        written = []
+        for handle, temp_path, path, future in pending:
+            try:
+                handle.flush()
+                os.fsync(handle.fileno())
+                handle.close()
+                os.replace(temp_path, path)
+                directories.add(os.path.dirname(path) or ".")
+                written.append((future, path, None))
+                self.written += 1
+            except OSError as e:
+                handle.close()
+                self._discard(temp_path)
+                self._fail(path, e, future)
+        for directory in directories:
+            self._sync_directory(directory)
+        self._settled.extend(written)
+
+    def _settle(self):
+        """
+        Complete the futures of finished files.
+
+        Runs without the lock held, since callbacks may write more files.
+        """
+        with self._lock:
+            settled, self._settled = self._settled, []
+        for future, path, error in settled:
+            if error is None:
+                future.set_result(path)
+            else:
+                future.set_exception(error)
+
+    @staticmethod
+    def _sync_directory(directory):
+        """Make renames durable (not possible on every platform)."""
+        try:
+            fd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _discard(temp_path):
+        """Remove a temporary file that will not be renamed."""
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+    def _fail(self, path, error, future):
+        """Record a file that could not be written."""
+        self._errors.append((path, ErrorHandler.handle_file_error(error, path)))
+        self._settled.append((future, path, error))
+
+    def flush(self):
+        """
+        Wait until every queued file is on disk.
+
+        Folders are checked again on the next write, so a folder removed
+        between batches is recreated.
+
+        Returns:
+            list: (path, message) for each file that could not be written
+                since the last flush
+        """
+        if self._thread is not None:
+            self._queue.join()
+        with self._lock:
+            errors, self._errors = self._errors, []
+            self._directories = set()
+        return errors
+
+    def close(self):
+        """Write everything queued and stop the thread."""
+        with self._lock:
+            thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)
+            thread.join()
@@ -0,0 +1,207 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .cancellation import CancellationToken, RequestCancelled
+
+
+class LatencyTracker:
+    """
+    Thread-safe record of recent time-to-first-token per model.
+    """
+
+    def __init__(self, window=200, min_samples=10):
+        """
+        Initialize the tracker.
+
+        Args:
+            window (int): Latencies kept per model
+            min_samples (int): Samples needed before percentiles are reported
+        """
+        self.window = window
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        self._samples = {}
+
+    def record(self, model, seconds):
+        """
+        Record one observed latency.
+
+        Args:
+            model (str): Model name
+            seconds (float): Observed latency
+        """
+        with self._lock:
+            samples = self._samples.setdefault(model, deque(maxlen=self.window))
+            samples.append(seconds)
+
+    def percentile(self, model, percentile):
+        """
+        Get a latency percentile for a model.
+
+        Args:
+            model (str): Model name
+            percentile (float): Percentile between 0 and 100
+
+        Returns:
+            float: Latency in seconds, or None until enough samples exist
+        """
+        with self._lock:
+            samples = sorted(self._samples.get(model, ()))
+        if len(samples) < self.min_samples:
+            return None
+        index = round(percentile / 100.0 * (len(samples) - 1))
+        return samples[min(max(index, 0), len(samples) - 1)]
+
+
+class HedgedClient:
+    """
+    Cuts tail latency by duplicating slow requests.
+
+    Wraps an OpenAIClient or EndpointPool. If a request has produced no
+    content after the configured percentile of observed time-to-first-token,
+    an identical request is sent (through an endpoint pool it goes to the
+    least-loaded endpoint, usually another one). The first to finish wins and
+    the other is cancelled. Tokens spent on losing requests are counted in
+    the "hedge_extra_tokens" statistic.
+    """
+
+    def __init__(self, client, tracker, percentile=95.0, stats=None):
+        """
+        Initialize the hedged client.
+
+        Args:
+            client (OpenAIClient or EndpointPool): Client that sends requests
+            tracker (LatencyTracker): Shared latency history
+            percentile (float): Hedge after this percentile of latency
+            stats (BatchStats, optional): Statistics for hedging counters
+        """
+        self.client = client
+        self.tracker = tracker
+        self.percentile = percentile
+        self.stats = stats
+
+    def _increment(self, name, amount=1):
+        """Add to a statistics counter if statistics are collected."""
+        if self.stats is not None:
+            self.stats.increment(name, amount)
+
+    def _attempt(self, model, token, first_token, args, kwargs):
+        """
+        Send one copy of the request.
+
+        Args:
+            model (str): Model name, for latency tracking
+            token (CancellationToken): Token cancelling this copy
+            first_token (threading.Event): Set when content first arrives
+            args (tuple): Positional arguments for generate_completion
+            kwargs (dict): Keyword arguments for generate_completion
+
+        Returns:
+            dict: The completion
+        """
+        start = time.monotonic()
+
+        def on_first_token():
+            self.tracker.record(model, time.monotonic() - start)
+            first_token.set()
+
+        return self.client.generate_completion(
+            *args, cancel_token=token, on_first_token=on_first_token, **kwargs
+        )
+
+    def _count_loser(self, future):
+        """Count the tokens spent by a losing request once it stops."""
+        try:
+            usage = future.result()["usage"]
+        except RequestCancelled as e:
+            usage = e.usage
+        except Exception:
+            return
+        self._increment("hedge_extra_tokens", usage.get("total_tokens", 0))
+
+    def generate_completion(self, system_content, user_content, model, **kwargs):
+        """
+        Generate a completion, hedging it if it is slow to start.
+
+        Takes the same arguments as OpenAIClient.generate_completion.
+
+        Returns:
+            dict: The winning completion
+        """
+        args = (system_content, user_content, model)
+        parent = kwargs.pop("cancel_token", None) or CancellationToken()
+        delay = self.tracker.percentile(model, self.percentile)
+        executor = ThreadPoolExecutor(max_workers=2)
+        try:
+            tokens = [parent.child()]
+            first_token = threading.Event()
+            futures = [
+                executor.submit(
+                    self._attempt, model, tokens[0], first_token, args, kwargs
+                )
+            ]
+
+            # Learn latencies first; hedge only once a percentile is known
+            if delay is None or first_token.wait(delay) or futures[0].done():
+                return futures[0].result()
+
+            logging.info(f"Hedging request to {model} after {delay:.1f}s")
+            self._increment("hedged_requests")
+            tokens.append(parent.child())
+            futures.append(
+                executor.submit(
+                    self._attempt, model, tokens[1], first_token, args, kwargs
+                )
+            )
+
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                winner = next((f for f in done if not f.exception()), None)
+                if winner is None:
+                    continue
+                for future, token in zip(futures, tokens):
+                    if future is not winner:
+                        token.cancel()
+                        future.add_done_callback(self._count_loser)
+                if winner is futures[1]:
+                    self._increment("hedge_wins")
+                return winner.result()
+
+            # Both copies failed; report the original error
+            return futures[0].result()
+        finally:
+            for token in tokens:
+                token.detach()
+            executor.shutdown(wait=False)
+
+    def generate_assessment(
+        self,
+        system_content,
+        user_content,
+        model,
+        temperature=0.7,
+        max_tokens=3500,
+        response_format=None,
+        cancel_token=None,
+    ):
+        """
+        Generate an assessment, hedging it if it is slow to start.
+
+        Takes the same arguments as OpenAIClient.generate_assessment.
+
+        Returns:
+            str: The generated feedback
+        """
+        return self.generate_completion(
+            system_content,
+            user_content,
+            model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            response_format=response_format,
+            cancel_token=cancel_token,
+        )["content"]
@@ -0,0 +1,159 @@
+import threading
+import time
+from collections import deque
+
+
+class KeyPool:
+    """
+    Schedules requests over several API keys for the same provider.
+
+    Each key has its own tokens-per-minute and requests-per-minute budget,
+    tracked over a sliding one-minute window. A request goes to the key with
+    the most token headroom; when every key is at its limit the caller waits
+    until one frees up. Keys that hit a provider rate limit are rested until
+    the provider's retry delay has passed.
+    """
+
+    WINDOW_SECONDS = 60.0
+
+    def __init__(self, keys, tokens_per_minute=0, requests_per_minute=0):
+        """
+        Initialize the pool.
+
+        Args:
+            keys (list): API keys
+            tokens_per_minute (int): Token budget per key (0 for unlimited)
+            requests_per_minute (int): Request budget per key (0 for unlimited)
+
+        Raises:
+            ValueError: If no keys are given
+        """
+        self.keys = list(dict.fromkeys(key for key in keys if key))
+        if not self.keys:
+            raise ValueError("API key is required")
+        self.tokens_per_minute = tokens_per_minute
+        self.requests_per_minute = requests_per_minute
+        self._usage = {key: deque() for key in self.keys}
+        self._resting_until = {key: 0.0 for key in self.keys}
+        self._condition = threading.Condition()
+
+    @staticmethod
+    def parse(api_key):
+        """
+        Split an API key setting into individual keys.
+
+        Args:
+            api_key (str or list): One key, a comma-separated list or a list
+
+        Returns:
+            list: Individual keys
+        """
+        if isinstance(api_key, (list, tuple)):
+            values = api_key
+        else:
+            values = str(api_key or "").split(",")
+        return [value.strip() for value in values if value and value.strip()]
+
+    @staticmethod
+    def mask(api_key):
+        """
+        Mask an API key for logs and display.
+
+        Args:
+            api_key (str): API key
+
+        Returns:
+            str: Key reduced to its last four characters, e.g. "...1a2b"
+        """
+        if not api_key:
+            return "<none>"
+        return f"...{api_key[-4:]}" if len(api_key) > 8 else "****"
+
+    def _prune(self, key, now):
+        """Drop usage records older than the window."""
+        usage = self._usage[key]
+        while usage and now - usage[0][0] >= self.WINDOW_SECONDS:
+            usage.popleft()
+
+    def headroom(self, key, now=None):
+        """
+        Tokens the key may still use in the current window.
+
+        Args:
+            key (str): API key
+            now (float, optional): Current monotonic time
+
+        Returns:
+            float: Remaining tokens (infinite when unlimited), or 0 if the
+                key is resting or out of requests
+        """
+        now = now if now is not None else time.monotonic()
+        self._prune(key, now)
+        usage = self._usage[key]
+        if now < self._resting_until[key]:
+            return 0
+        if self.requests_per_minute and len(usage) >= self.requests_per_minute:
+            return 0
+        if not self.tokens_per_minute:
+            return float("inf")
+        return self.tokens_per_minute - sum(tokens for _, tokens in usage)
+
+    def acquire(self, estimated_tokens, exclude=()):
+        """
+        Reserve budget on the key with the most headroom.
+
+        Blocks until a key can take the request. A request larger than a
+        whole minute's budget is sent once a key is completely idle.
+
+        Args:
+            estimated_tokens (int): Estimated tokens of the request
+            exclude (iterable): Keys not to use
+
+        Returns:
+            str: Chosen key, or None if every key is excluded
+        """
+        exclude = set(exclude)
+        with self._condition:
+            while True:
+                candidates = [key for key in self.keys if key not in exclude]
+                if not candidates:
+                    return None
+                now = time.monotonic()
+                key = max(candidates, key=lambda k: self.headroom(k, now))
+                room = self.headroom(key, now)
+                idle = room > 0 and not self._usage[key]
+                if room >= estimated_tokens or idle:
+                    self._usage[key].append((now, estimated_tokens))
+                    return key
+                self._condition.wait(timeout=1.0)
+
+    def record(self, key, estimated_tokens, actual_tokens):
+        """
+        Replace a reservation with the tokens the provider reported.
+
+        Args:
+            key (str): Key returned by acquire
+            estimated_tokens (int): Tokens reserved by acquire
+            actual_tokens (int): Tokens actually used (0 if unknown)
+        """
+        with self._condition:
+            usage = self._usage[key]
+            for index, (stamp, tokens) in enumerate(usage):
+                if tokens == estimated_tokens:
+                    usage[index] = (stamp, actual_tokens or estimated_tokens)
+                    break
+            self._condition.notify_all()
+
+    def rest(self, key, seconds=None):
+        """
+        Take a key out of rotation after a provider rate limit.
+
+        Args:
+            key (str): API key
+            seconds (float, optional): Retry delay given by the provider
+                (defaults to the window length)
+        """
+        with self._condition:
+            delay = seconds if seconds else self.WINDOW_SECONDS
+            self._resting_until[key] = time.monotonic() + delay
+            self._condition.notify_all()
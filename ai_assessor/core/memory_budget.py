@@ -0,0 +1,130 @@
+import threading
+from contextlib import contextmanager
+
+
+class ByteBudget:
+    """
+    Caps the bytes of prompt text held by requests in flight.
+
+    Each grading request reserves the size of its prompt before it is sent
+    (a capped estimate before the submission is read, corrected to the
+    actual prompt once it is built) and releases it when the response
+    arrives. When the cap would be
+    exceeded the request waits, so memory stays flat however many workers
+    or submissions a batch has. A request larger than the whole cap is let
+    through once nothing else is in flight.
+    """
+
+    def __init__(self, limit=0):
+        """
+        Initialize the budget.
+
+        Args:
+            limit (int): Most bytes in flight at once (0 for no cap)
+        """
+        self.limit = limit
+        self.in_use = 0
+        self.peak = 0
+        self.waits = 0
+        self._condition = threading.Condition()
+
+    @staticmethod
+    def size(*texts):
+        """
+        Get the encoded size of prompt texts.
+
+        Args:
+            *texts (str): Texts sent in one request
+
+        Returns:
+            int: Total UTF-8 bytes
+        """
+        return sum(len(text.encode("utf-8")) for text in texts if text)
+
+    def _wait_for_room(self, nbytes, cancel_token):
+        """
+        Wait until nbytes fit beside the bytes in flight.
+
+        Must be called with the condition held.
+
+        Args:
+            nbytes (int): Bytes to add
+            cancel_token (CancellationToken, optional): Token that stops the
+                wait
+
+        Raises:
+            RequestCancelled: If the token is cancelled while waiting
+        """
+        if self.limit and self.in_use and self.in_use + nbytes > self.limit:
+            self.waits += 1
+            while self.in_use and self.in_use + nbytes > self.limit:
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+                self._condition.wait(timeout=0.5)
+
+    @contextmanager
+    def reserve(self, nbytes, cancel_token=None):
+        """
+        Hold part of the budget while a request is in flight.
+
+        The context yields a Reservation whose size can be adjusted once the
+        actual prompt size is known.
+
+        Args:
+            nbytes (int): Bytes the request holds
+            cancel_token (CancellationToken, optional): Token that stops the
+                wait for budget
+
+        Raises:
+            RequestCancelled: If the token is cancelled while waiting
+        """
+        reservation = Reservation(self, cancel_token)
+        reservation.resize(nbytes)
+        try:
+            yield reservation
+        finally:
+            reservation.resize(0)
+
+
+class Reservation:
+    """
+    Bytes held in a ByteBudget by one request.
+    """
+
+    def __init__(self, budget, cancel_token=None):
+        """
+        Initialize an empty reservation.
+
+        Args:
+            budget (ByteBudget): Budget the bytes are held in
+            cancel_token (CancellationToken, optional): Token that stops
+                waits for budget
+        """
+        self.budget = budget
+        self.cancel_token = cancel_token
+        self.nbytes = 0
+
+    def resize(self, nbytes):
+        """
+        Change the bytes held, waiting for room when growing.
+
+        A reservation that has to grow gives up what it holds while it
+        waits, so two growing reservations never wait on each other.
+
+        Args:
+            nbytes (int): Bytes the request holds from now on
+
+        Raises:
+            RequestCancelled: If the token is cancelled while waiting
+        """
+        budget = self.budget
+        with budget._condition:
+            if nbytes > self.nbytes and budget.limit:
+                budget.in_use -= self.nbytes
+                self.nbytes = 0
+                budget._condition.notify_all()
+                budget._wait_for_room(nbytes, self.cancel_token)
+            budget.in_use += nbytes - self.nbytes
+            self.nbytes = nbytes
+            budget.peak = max(budget.peak, budget.in_use)
+            budget._condition.notify_all()
@@ -0,0 +1,87 @@
+import hashlib
+import math
+import threading
+from collections import deque
+
+
+class OutputBudget:
+    """
+    Sizes the max_tokens reservation from observed output lengths.
+
+    Providers count the reserved max_tokens against tokens-per-minute
+    limits, so reserving far more than the feedback needs lowers the
+    number of requests that fit. Completion lengths are recorded per prompt
+    and model, and the reservation is set to a high percentile of them plus
+    a safety margin.
+    """
+
+    def __init__(
+        self, percentile=95.0, margin=0.2, min_samples=10, window=200, minimum=256
+    ):
+        """
+        Initialize the budget.
+
+        Args:
+            percentile (float): Percentile of observed lengths to reserve
+            margin (float): Extra fraction added on top of the percentile
+            min_samples (int): Samples needed before the reservation shrinks
+            window (int): Recent lengths kept per prompt and model
+            minimum (int): Smallest reservation ever made
+        """
+        self.percentile = percentile
+        self.margin = margin
+        self.min_samples = min_samples
+        self.window = window
+        self.minimum = minimum
+        self._lock = threading.Lock()
+        self._samples = {}
+
+    @staticmethod
+    def key(system_content, model):
+        """
+        Build the key under which lengths are tracked.
+
+        Args:
+            system_content (str): Complete system content (the prompt)
+            model (str): Model name
+
+        Returns:
+            tuple: (prompt fingerprint, model)
+        """
+        digest = hashlib.sha1(system_content.encode("utf-8")).hexdigest()[:16]
+        return digest, model
+
+    def record(self, key, completion_tokens):
+        """
+        Record the length of a complete (not truncated) response.
+
+        Args:
+            key (tuple): Key from key()
+            completion_tokens (int): Output tokens the provider reported
+        """
+        if not completion_tokens:
+            return
+        with self._lock:
+            samples = self._samples.setdefault(key, deque(maxlen=self.window))
+            samples.append(completion_tokens)
+
+    def reservation(self, key, maximum):
+        """
+        Get the max_tokens to reserve for the next request.
+
+        Args:
+            key (tuple): Key from key()
+            maximum (int): Largest reservation allowed (the fixed default)
+
+        Returns:
+            int: Tokens to reserve; the maximum until enough samples exist
+        """
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if len(samples) < self.min_samples:
+            return maximum
+        index = min(
+            len(samples) - 1, round(self.percentile / 100.0 * (len(samples) - 1))
+        )
+        reserved = math.ceil(samples[index] * (1 + self.margin))
+        return min(maximum, max(self.minimum, reserved))
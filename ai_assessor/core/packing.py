@@ -0,0 +1,115 @@
+from ..utils.json_utils import JsonUtils
+from ..utils.token_utils import TokenEstimator
+
+
+class SubmissionPacker:
+    """
+    Packs several short submissions into a single chat completion.
+
+    Submissions are packed as they arrive under a token budget, wrapped in
+    clearly delimited blocks and the model is asked for a JSON array with
+    one feedback entry per submission id.
+    """
+
+    PACK_INSTRUCTIONS = (
+        "The submissions below are from different students. Assess each one "
+        "independently, exactly as you would if it were the only submission.\n"
+        "Respond with only a JSON array, one object per submission, in the form:\n"
+        '[{"id": "<submission id>", "feedback": "<complete feedback>"}]\n'
+    )
+
+    def __init__(self, token_budget=6000, max_per_pack=4):
+        """
+        Initialize the packer.
+
+        Args:
+            token_budget (int): Maximum estimated tokens of submission text
+                per packed request
+            max_per_pack (int): Maximum number of submissions per request
+        """
+        self.token_budget = token_budget
+        self.max_per_pack = max_per_pack
+
+    def pack_stream(self, items):
+        """
+        Group submissions into packs as they arrive, using next fit.
+
+        Only the pack being filled is held, so submissions can be extracted
+        one at a time however large the batch is.
+
+        Args:
+            items (iterable): (submission id, extracted text) pairs
+
+        Yields:
+            dict: Submission ids mapped to text for each pack, in arrival
+                order; submissions that do not fit the budget on their own
+                end up in single-item packs
+        """
+        pack = {}
+        used = 0
+        for key, text in items:
+            size = TokenEstimator.estimate_tokens(text)
+            if pack and (
+                len(pack) >= self.max_per_pack or used + size > self.token_budget
+            ):
+                yield pack
+                pack = {}
+                used = 0
+            pack[key] = text
+            used += size
+        if pack:
+            yield pack
+
+    def build_user_content(self, user_prompt, items):
+        """
+        Build the user message for a pack.
+
+        Args:
+            user_prompt (str): User prompt text
+            items (dict): Submission ids mapped to extracted text
+
+        Returns:
+            str: User content containing every submission of the pack
+        """
+        parts = [user_prompt, self.PACK_INSTRUCTIONS]
+        for key, text in items.items():
+            parts.append(f'<<<SUBMISSION id="{key}">>>\n{text}\n<<<END SUBMISSION>>>')
+        return "\n".join(parts) + "\n"
+
+    @staticmethod
+    def parse_response(response, expected_ids):
+        """
+        Parse and validate a packed response.
+
+        Args:
+            response (str): Raw model output
+            expected_ids (list): Submission ids sent in the pack
+
+        Returns:
+            dict: Submission ids mapped to feedback; ids that are missing,
+                duplicated or empty in the response are left out
+        """
+        try:
+            entries = JsonUtils.loads_model_output(response)
+        except ValueError:
+            return {}
+
+        if not isinstance(entries, list):
+            return {}
+
+        expected = set(expected_ids)
+        feedback = {}
+        seen = set()
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            key = str(entry.get("id", ""))
+            value = entry.get("feedback")
+            if key not in expected or not isinstance(value, str) or not value.strip():
+                continue
+            if key in seen:
+                feedback.pop(key, None)
+                continue
+            seen.add(key)
+            feedback[key] = value.strip()
+        return feedback
@@ -0,0 +1,184 @@
+import csv
+import json
+import os
+import threading
+import time
+
+
+def result_status(result):
+    """
+    Summarize a grading result as one status word.
+
+    Args:
+        result (dict): Result from grade_submission_result
+
+    Returns:
+        str: "success", "needs_review" or "failed"
+    """
+    if result.get("needs_review"):
+        return "needs_review"
+    return "success" if result.get("success") else "failed"
+
+
+class ResultsSink:
+    """
+    Appends one JSON line per graded submission as results complete.
+
+    Lines are flushed as they are written so the file can be tailed, and
+    synced to disk every sync_every records or sync_seconds seconds rather
+    than after every line. The log is appended to across runs; each record
+    carries the run it belongs to. export_gradebook turns the log into a
+    compact CSV of the latest marks per submission.
+    """
+
+    FIELDS = ("id", "status", "model", "total", "max_total")
+
+    def __init__(self, path, sync_every=20, sync_seconds=2.0, run_id=None):
+        """
+        Open the log for appending.
+
+        Args:
+            path (str): Path of the JSONL file
+            sync_every (int): Records written between fsync calls
+            sync_seconds (float): Longest time between fsync calls
+            run_id (str, optional): Identifier of this run (defaults to the
+                start time)
+        """
+        self.path = path
+        self.sync_every = max(1, sync_every)
+        self.sync_seconds = sync_seconds
+        self.run_id = run_id or time.strftime("%Y%m%dT%H%M%S")
+        self.count = 0
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @staticmethod
+    def compact_scores(scores):
+        """
+        Reduce validated rubric scores to marks only.
+
+        Args:
+            scores (dict): Scores from Rubric.parse_response, or None
+
+        Returns:
+            dict: "total", "max_total" and "criteria" (name to score), or None
+        """
+        if not scores:
+            return None
+        return {
+            "total": scores.get("total"),
+            "max_total": scores.get("max_total"),
+            "criteria": {
+                entry.get("criterion"): entry.get("score")
+                for entry in scores.get("criteria", [])
+            },
+        }
+
+    def write(self, submission_id, result, latency=None):
+        """
+        Append the record of one submission.
+
+        Args:
+            submission_id (str): Submission filename
+            result (dict): Result from grade_submission_result (or a
+                batch-level result with at least "success" and "feedback")
+            latency (float, optional): Seconds spent grading
+        """
+        record = {
+            "run": self.run_id,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "id": submission_id,
+            "status": result_status(result),
+            "model": result.get("model"),
+            "latency": round(latency, 3) if latency is not None else None,
+            "usage": result.get("usage"),
+            "feedback_path": result.get("feedback_path"),
+            "scores": self.compact_scores(result.get("scores")),
+        }
+        if not result.get("success"):
+            record["error"] = (result.get("feedback") or "").strip().split("\n")[0]
+        line = json.dumps(record, ensure_ascii=False)
+
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            self.count += 1
+            self._unsynced += 1
+            now = time.monotonic()
+            if (
+                self._unsynced >= self.sync_every
+                or now - self._last_sync >= self.sync_seconds
+            ):
+                self._sync(now)
+
+    def _sync(self, now=None):
+        """Force written lines to disk."""
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = now if now is not None else time.monotonic()
+
+    def close(self):
+        """Sync and close the log."""
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.flush()
+            self._sync()
+            self._file.close()
+
+    @classmethod
+    def export_gradebook(cls, jsonl_path, csv_path):
+        """
+        Write the latest marks for every submission in a log as CSV.
+
+        Args:
+            jsonl_path (str): Path of the JSONL results log
+            csv_path (str): Path of the CSV file to write
+
+        Returns:
+            int: Number of submissions written
+        """
+        latest = {}
+        criteria = []
+        with open(jsonl_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A line cut off by a crash; later lines are still valid
+                    continue
+                if record.get("status") == "failed" and record.get("id") in latest:
+                    # Keep the last good result over a failed regrade
+                    continue
+                latest[record.get("id")] = record
+                scores = record.get("scores") or {}
+                for name in scores.get("criteria") or {}:
+                    if name not in criteria:
+                        criteria.append(name)
+
+        with open(csv_path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(list(cls.FIELDS) + criteria)
+            for submission_id in sorted(latest):
+                record = latest[submission_id]
+                scores = record.get("scores") or {}
+                marks = scores.get("criteria") or {}
+                writer.writerow(
+                    [
+                        submission_id,
+                        record.get("status"),
+                        record.get("model"),
+                        scores.get("total"),
+                        scores.get("max_total"),
+                    ]
+                    + [marks.get(name) for name in criteria]
+                )
+        return len(latest)
@@ -0,0 +1,394 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from .results_sink import ResultsSink, result_status
+
+
+class ResultsStore:
+    """
+    SQLite database of grading runs and their results.
+
+    Every graded submission is recorded with its run, a fingerprint of the
+    submission file and of the prompt, the model, feedback, usage, latency
+    and scores. Regrades add rows rather than replacing them, so the history
+    is kept; the latest result per submission is found through an index on
+    (submission, id). The database uses WAL mode so the GUI can read while a
+    batch is writing.
+
+    Feedback is also indexed in an FTS5 table, kept up to date by a trigger
+    as results are recorded, so search finds ranked matches across every
+    cohort without reading the feedback files. Without FTS5 in the SQLite
+    build, search falls back to a slower substring scan.
+    """
+
+    SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS runs (
+            id INTEGER PRIMARY KEY,
+            started TEXT NOT NULL,
+            model TEXT,
+            prompt_hash TEXT,
+            output_folder TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS results (
+            id INTEGER PRIMARY KEY,
+            run_id INTEGER NOT NULL REFERENCES runs(id),
+            submission TEXT NOT NULL,
+            folder TEXT,
+            student TEXT,
+            submission_hash TEXT,
+            prompt_hash TEXT,
+            model TEXT,
+            status TEXT NOT NULL,
+            feedback TEXT,
+            feedback_path TEXT,
+            prompt_tokens INTEGER,
+            completion_tokens INTEGER,
+            total_tokens INTEGER,
+            latency REAL,
+            total REAL,
+            max_total REAL,
+            scores TEXT,
+            created TEXT NOT NULL
+        )
+        """,
+        # Superseded by idx_results_submission_folder in older databases
+        "DROP INDEX IF EXISTS idx_results_submission",
+        "CREATE INDEX IF NOT EXISTS idx_results_submission_folder "
+        "ON results(submission, folder, id)",
+        "CREATE INDEX IF NOT EXISTS idx_results_student ON results(student, id)",
+        "CREATE INDEX IF NOT EXISTS idx_results_run ON results(run_id)",
+    )
+
+    FTS_SCHEMA = (
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS results_fts USING fts5(
+            submission, student, feedback,
+            content='results', content_rowid='id',
+            tokenize='porter unicode61'
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS results_fts_insert AFTER INSERT ON results
+        BEGIN
+            INSERT INTO results_fts (rowid, submission, student, feedback)
+            VALUES (new.id, new.submission, new.student, new.feedback);
+        END
+        """,
+    )
+
+    def __init__(self, path):
+        """
+        Open (and create if needed) the database.
+
+        Args:
+            path (str): Database file path, or ":memory:"
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            for statement in self.SCHEMA:
+                self._connection.execute(statement)
+            self.fts = self._create_fts()
+            self._connection.commit()
+
+    def _create_fts(self):
+        """
+        Create the full-text index, filling it from existing results when it
+        is added to an older database.
+
+        Returns:
+            bool: True if FTS5 is available
+        """
+        existed = self._connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'results_fts'"
+        ).fetchone()
+        try:
+            for statement in self.FTS_SCHEMA:
+                self._connection.execute(statement)
+        except sqlite3.OperationalError as e:
+            logging.warning(f"Full-text search unavailable: {str(e)}")
+            return False
+        if not existed:
+            self._connection.execute(
+                "INSERT INTO results_fts (results_fts) VALUES ('rebuild')"
+            )
+        return True
+
+    def close(self):
+        """Close the database."""
+        with self._lock:
+            self._connection.close()
+
+    @staticmethod
+    def hash_text(*texts):
+        """
+        Fingerprint prompt text.
+
+        Args:
+            *texts (str): Texts that make up the prompt
+
+        Returns:
+            str: Hex digest
+        """
+        digest = hashlib.sha256()
+        for text in texts:
+            digest.update((text or "").encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    @staticmethod
+    def hash_file(path):
+        """
+        Fingerprint a submission file.
+
+        Args:
+            path (str): File path
+
+        Returns:
+            str: Hex digest, or None if the file cannot be read
+        """
+        digest = hashlib.sha256()
+        try:
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(65536), b""):
+                    digest.update(chunk)
+        except OSError:
+            return None
+        return digest.hexdigest()
+
+    def start_run(self, model=None, prompt_hash=None, output_folder=None):
+        """
+        Record the start of a grading run.
+
+        Args:
+            model (str, optional): Model key used for the run
+            prompt_hash (str, optional): Fingerprint of the prompts
+            output_folder (str, optional): Where feedback files are written
+
+        Returns:
+            int: Run id
+        """
+        with self._lock:
+            cursor = self._connection.execute(
+                "INSERT INTO runs (started, model, prompt_hash, output_folder) "
+                "VALUES (?, ?, ?, ?)",
+                (time.strftime("%Y-%m-%dT%H:%M:%S"), model, prompt_hash, output_folder),
+            )
+            self._connection.commit()
+            return cursor.lastrowid
+
+    def record(
+        self,
+        run_id,
+        submission,
+        result,
+        latency=None,
+        folder=None,
+        student=None,
+        submission_hash=None,
+        prompt_hash=None,
+    ):
+        """
+        Record the result of one submission.
+
+        Args:
+            run_id (int): Run from start_run
+            submission (str): Submission filename
+            result (dict): Result from grade_submission_result
+            latency (float, optional): Seconds spent grading
+            folder (str, optional): Folder holding the submission
+            student (str, optional): Student identifier
+            submission_hash (str, optional): Fingerprint of the file
+            prompt_hash (str, optional): Fingerprint of the prompts
+
+        Returns:
+            int: Result id
+        """
+        usage = result.get("usage") or {}
+        scores = result.get("scores") or {}
+        compact = ResultsSink.compact_scores(scores)
+        row = (
+            run_id,
+            submission,
+            folder,
+            student,
+            submission_hash,
+            prompt_hash,
+            result.get("model"),
+            result_status(result),
+            result.get("feedback"),
+            result.get("feedback_path"),
+            usage.get("prompt_tokens"),
+            usage.get("completion_tokens"),
+            usage.get("total_tokens"),
+            latency,
+            scores.get("total"),
+            scores.get("max_total"),
+            json.dumps(compact) if compact else None,
+            time.strftime("%Y-%m-%dT%H:%M:%S"),
+        )
+        with self._lock:
+            cursor = self._connection.execute(
+                "INSERT INTO results (run_id, submission, folder, student, "
+                "submission_hash, prompt_hash, model, status, feedback, "
+                "feedback_path, prompt_tokens, completion_tokens, total_tokens, "
+                "latency, total, max_total, scores, created) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                row,
+            )
+            self._connection.commit()
+            return cursor.lastrowid
+
+    @staticmethod
+    def _to_dict(row):
+        """Convert a result row to a dict with decoded scores."""
+        if row is None:
+            return None
+        record = dict(row)
+        if record.get("scores"):
+            record["scores"] = json.loads(record["scores"])
+        return record
+
+    def latest(self, submission, folder=None):
+        """
+        Get the latest result for a submission.
+
+        Args:
+            submission (str): Submission filename
+            folder (str, optional): Only results for this folder
+
+        Returns:
+            dict: The result row, or None if it was never graded
+        """
+        query = "SELECT * FROM results WHERE submission = ?"
+        params = [submission]
+        if folder is not None:
+            query += " AND folder = ?"
+            params.append(folder)
+        query += " ORDER BY id DESC LIMIT 1"
+        with self._lock:
+            row = self._connection.execute(query, params).fetchone()
+        return self._to_dict(row)
+
+    def latest_results(self, run_id=None, student=None):
+        """
+        Get the latest result for each submission in each folder.
+
+        The same filename in two cohort folders is two submissions.
+
+        Args:
+            run_id (int, optional): Only results from this run
+            student (str, optional): Only results for this student
+
+        Returns:
+            list: Result rows ordered by submission and folder
+        """
+        conditions = []
+        params = []
+        if run_id is not None:
+            conditions.append("run_id = ?")
+            params.append(run_id)
+        if student is not None:
+            conditions.append("student = ?")
+            params.append(student)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = (
+            "SELECT results.* FROM results JOIN ("
+            f"SELECT MAX(id) AS id FROM results {where} GROUP BY submission, folder"
+            ") AS latest ON results.id = latest.id "
+            "ORDER BY results.submission, results.folder"
+        )
+        with self._lock:
+            rows = self._connection.execute(query, params).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def runs(self, limit=20):
+        """
+        Get the most recent runs.
+
+        Args:
+            limit (int): Most runs returned
+
+        Returns:
+            list: Run rows with a "results" count, newest first
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT runs.*, COUNT(results.id) AS results FROM runs "
+                "LEFT JOIN results ON results.run_id = runs.id "
+                "GROUP BY runs.id ORDER BY runs.id DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    @staticmethod
+    def _quote_terms(query):
+        """Turn free text into an FTS5 query matching every word literally."""
+        terms = [term.replace('"', '""') for term in query.split()]
+        return " ".join(f'"{term}"' for term in terms)
+
+    def search(self, query, limit=50, latest_only=True):
+        """
+        Search feedback for words or phrases.
+
+        The query uses FTS5 syntax ("exact phrase", OR, NOT, prefix*); text
+        that is not valid syntax is searched for word by word.
+
+        Args:
+            query (str): Search query
+            limit (int): Most hits returned
+            latest_only (bool): Skip results superseded by a regrade
+
+        Returns:
+            list: Result rows, best match first, each with a "snippet" of
+                the feedback around the match
+        """
+        if not query or not query.strip():
+            return []
+        latest = (
+            " AND NOT EXISTS (SELECT 1 FROM results AS newer "
+            "WHERE newer.submission = results.submission "
+            "AND newer.folder IS results.folder AND newer.id > results.id)"
+            if latest_only
+            else ""
+        )
+
+        if not self.fts:
+            words = query.split()
+            conditions = " AND ".join(["feedback LIKE ?"] * len(words))
+            sql = (
+                "SELECT *, substr(feedback, 1, 120) AS snippet FROM results "
+                f"WHERE {conditions}{latest} ORDER BY id DESC LIMIT ?"
+            )
+            params = [f"%{word}%" for word in words] + [limit]
+            with self._lock:
+                rows = self._connection.execute(sql, params).fetchall()
+            return [self._to_dict(row) for row in rows]
+
+        sql = (
+            "SELECT results.*, "
+            "snippet(results_fts, 2, '[', ']', '...', 16) AS snippet "
+            "FROM results_fts JOIN results ON results.id = results_fts.rowid "
+            f"WHERE results_fts MATCH ?{latest} "
+            "ORDER BY results_fts.rank LIMIT ?"
+        )
+        with self._lock:
+            try:
+                rows = self._connection.execute(sql, (query, limit)).fetchall()
+            except sqlite3.OperationalError:
+                # Not valid FTS5 syntax (e.g. stray quotes or punctuation)
+                rows = self._connection.execute(
+                    sql, (self._quote_terms(query), limit)
+                ).fetchall()
+        return [self._to_dict(row) for row in rows]
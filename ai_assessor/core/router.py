@@ -0,0 +1,110 @@
+import logging
+
+
+class ModelRouter:
+    """
+    Picks a model per submission from the [Routing] table.
+
+    Each option in [Routing] names a route as
+    "model, max_context, relative_speed, cost", e.g.::
+
+        local = llama3.1:8b, 8192, 5, 0
+
+    Model ids go in the value because configparser splits keys at ":" and
+    lowercases them. A plain model id may still be the key, with the value
+    "max_context, relative_speed, cost"::
+
+        gpt-4o-mini = 128000, 3, 0.15
+
+    A submission goes to the fastest model whose context window fits the
+    system content, the submission and the reserved output tokens.
+    """
+
+    # Model key that asks the assessor to route each submission
+    AUTO = "auto"
+
+    def __init__(self, routes):
+        """
+        Initialize the router.
+
+        Args:
+            routes (list): Dicts with "model", "max_context", "speed" and "cost"
+        """
+        self.routes = sorted(routes, key=lambda route: (-route["speed"], route["cost"]))
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Build the router from the [Routing] section.
+
+        Invalid entries are logged and skipped.
+
+        Args:
+            config (ConfigManager): Configuration manager
+
+        Returns:
+            ModelRouter: The configured router
+        """
+        routes = []
+        if config.config.has_section("Routing"):
+            for name in config.config.options("Routing"):
+                parts = [
+                    part.strip()
+                    for part in config.get_value("Routing", name, "").split(",")
+                ]
+                model = parts.pop(0) if len(parts) == 4 else name
+                try:
+                    max_context, speed, cost = [float(part) for part in parts]
+                except ValueError:
+                    logging.warning(f"Ignoring invalid routing entry: {name}")
+                    continue
+                routes.append(
+                    {
+                        "model": model,
+                        "max_context": int(max_context),
+                        "speed": speed,
+                        "cost": cost,
+                    }
+                )
+        return cls(routes)
+
+    @staticmethod
+    def is_auto(model):
+        """
+        Check whether a model key requests automatic routing.
+
+        Args:
+            model (str): Model key
+
+        Returns:
+            bool: True for the "auto" model key
+        """
+        return str(model or "").strip().lower() == ModelRouter.AUTO
+
+    def select(self, prompt_tokens, output_tokens):
+        """
+        Choose the fastest model whose context window fits the request.
+
+        Args:
+            prompt_tokens (int): Estimated tokens of system and user content
+            output_tokens (int): Tokens reserved for the response
+
+        Returns:
+            str: Model name; the largest-context model if nothing fits
+
+        Raises:
+            ValueError: If no routes are configured
+        """
+        if not self.routes:
+            raise ValueError("Model 'auto' requires entries in the [Routing] section")
+
+        needed = prompt_tokens + output_tokens
+        for route in self.routes:
+            if route["max_context"] >= needed:
+                return route["model"]
+
+        largest = max(self.routes, key=lambda route: route["max_context"])
+        logging.warning(
+            f"No routed model fits {needed} tokens; using {largest['model']}"
+        )
+        return largest["model"]
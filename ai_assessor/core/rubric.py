@@ -0,0 +1,390 @@
+import json
+import logging
+import os
+
+from ..utils.json_utils import JsonUtils
+
+
+class Rubric:
+    """
+    Marking rubric used for structured (JSON schema) assessments.
+
+    A rubric definition file is a JSON document of the form::
+
+        {
+            "criteria": [
+                {"name": "Analysis", "max_marks": 40},
+                {"name": "Presentation", "max_marks": 20}
+            ]
+        }
+    """
+
+    SCHEMA_NAME = "rubric_assessment"
+
+    def __init__(self, criteria):
+        """
+        Initialize the rubric.
+
+        Args:
+            criteria (list): Dicts with "name" and "max_marks" keys
+
+        Raises:
+            ValueError: If the criteria are empty, duplicated or invalid
+        """
+        if not criteria:
+            raise ValueError("Rubric must define at least one criterion")
+
+        self.criteria = []
+        names = set()
+        for criterion in criteria:
+            name = str(criterion.get("name", "")).strip()
+            max_marks = criterion.get("max_marks")
+            if not name:
+                raise ValueError("Rubric criterion is missing a name")
+            if name in names:
+                raise ValueError(f"Duplicate rubric criterion: {name}")
+            if not isinstance(max_marks, (int, float)) or max_marks <= 0:
+                raise ValueError(f"Invalid max_marks for criterion: {name}")
+            names.add(name)
+            self.criteria.append({"name": name, "max_marks": max_marks})
+
+    @classmethod
+    def load(cls, rubric_path):
+        """
+        Load a rubric definition file.
+
+        Args:
+            rubric_path (str): Path to the JSON rubric definition
+
+        Returns:
+            Rubric: The loaded rubric
+
+        Raises:
+            FileNotFoundError: If file doesn't exist
+            ValueError: If the file is not a valid rubric definition
+        """
+        if not os.path.exists(rubric_path):
+            raise FileNotFoundError(f"File not found: {rubric_path}")
+
+        with open(rubric_path, "r", encoding="utf-8") as file:
+            data = json.load(file)
+
+        if not isinstance(data, dict) or not isinstance(data.get("criteria"), list):
+            raise ValueError("Rubric file must contain a 'criteria' list")
+        return cls(data["criteria"])
+
+    @property
+    def names(self):
+        """list: Criterion names in rubric order."""
+        return [criterion["name"] for criterion in self.criteria]
+
+    @property
+    def total_marks(self):
+        """int or float: Maximum total mark."""
+        return sum(criterion["max_marks"] for criterion in self.criteria)
+
+    def json_schema(self, include_confidence=False):
+        """
+        Build the JSON schema describing a rubric assessment.
+
+        Args:
+            include_confidence (bool): Also ask for a self-reported confidence
+                between 0 and 1
+
+        Returns:
+            dict: JSON schema for the model output
+        """
+        schema = {
+            "type": "object",
+            "properties": {
+                "criteria": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "criterion": {"type": "string", "enum": self.names},
+                            "score": {"type": "number"},
+                            "feedback": {"type": "string"},
+                        },
+                        "required": ["criterion", "score", "feedback"],
+                        "additionalProperties": False,
+                    },
+                },
+                "total": {"type": "number"},
+                "overall_feedback": {"type": "string"},
+            },
+            "required": ["criteria", "total", "overall_feedback"],
+            "additionalProperties": False,
+        }
+        if include_confidence:
+            schema["properties"]["confidence"] = {"type": "number"}
+            schema["required"].append("confidence")
+        return schema
+
+    def response_format(self, include_confidence=False):
+        """
+        Build the chat completion response_format for this rubric.
+
+        Args:
+            include_confidence (bool): Also ask for a self-reported confidence
+
+        Returns:
+            dict: response_format parameter using a strict JSON schema
+        """
+        return {
+            "type": "json_schema",
+            "json_schema": {
+                "name": self.SCHEMA_NAME,
+                "strict": True,
+                "schema": self.json_schema(include_confidence),
+            },
+        }
+
+    def instructions(self, include_confidence=False):
+        """
+        Describe the expected output for models that ignore response_format.
+
+        Args:
+            include_confidence (bool): Also ask for a self-reported confidence
+
+        Returns:
+            str: Instructions appended to the user content
+        """
+        lines = [
+            "Return your assessment as JSON matching this schema, with one "
+            "entry per rubric criterion:",
+        ]
+        for criterion in self.criteria:
+            lines.append(f"- {criterion['name']} (out of {criterion['max_marks']})")
+        if include_confidence:
+            lines.append(
+                "Set 'confidence' between 0 and 1 to reflect how certain you are "
+                "of the marks awarded."
+            )
+        lines.append(json.dumps(self.json_schema(include_confidence)))
+        return "\n".join(lines)
+
+    def get_criterion(self, name):
+        """
+        Look up a criterion by name.
+
+        Args:
+            name (str): Criterion name
+
+        Returns:
+            dict: Criterion with "name" and "max_marks"
+
+        Raises:
+            ValueError: If the rubric has no such criterion
+        """
+        for criterion in self.criteria:
+            if criterion["name"] == name:
+                return criterion
+        raise ValueError(f"Unknown rubric criterion: {name}")
+
+    def criterion_response_format(self, name):
+        """
+        Build the response_format for grading a single criterion.
+
+        Args:
+            name (str): Criterion name
+
+        Returns:
+            dict: response_format parameter using a strict JSON schema
+        """
+        self.get_criterion(name)
+        return {
+            "type": "json_schema",
+            "json_schema": {
+                "name": f"{self.SCHEMA_NAME}_criterion",
+                "strict": True,
+                "schema": {
+                    "type": "object",
+                    "properties": {
+                        "score": {"type": "number"},
+                        "feedback": {"type": "string"},
+                    },
+                    "required": ["score", "feedback"],
+                    "additionalProperties": False,
+                },
+            },
+        }
+
+    def criterion_instructions(self, name):
+        """
+        Describe the expected output when grading a single criterion.
+
+        Args:
+            name (str): Criterion name
+
+        Returns:
+            str: Instructions appended after the shared prompt
+        """
+        criterion = self.get_criterion(name)
+        return (
+            f"Assess ONLY the rubric criterion '{criterion['name']}' "
+            f"(out of {criterion['max_marks']} marks). Ignore all other criteria.\n"
+            'Return JSON of the form {"score": <number>, "feedback": "<feedback>"}.'
+        )
+
+    def parse_criterion_response(self, name, response):
+        """
+        Parse and validate the output of a single-criterion request.
+
+        Args:
+            name (str): Criterion name
+            response (str): Raw model output
+
+        Returns:
+            dict: "criterion", "score", "max_marks" and "feedback"
+
+        Raises:
+            ValueError: If the output is invalid or the score is out of range
+        """
+        criterion = self.get_criterion(name)
+        try:
+            data = JsonUtils.loads_model_output(response)
+        except ValueError as e:
+            raise ValueError(f"Assessment for {name} is not valid JSON: {str(e)}")
+
+        score = data.get("score") if isinstance(data, dict) else None
+        if not isinstance(score, (int, float)) or isinstance(score, bool):
+            raise ValueError(f"Score for {name} is not a number")
+        if score < 0 or score > criterion["max_marks"]:
+            raise ValueError(
+                f"Score for {name} is outside 0-{criterion['max_marks']}: {score}"
+            )
+        return {
+            "criterion": name,
+            "score": score,
+            "max_marks": criterion["max_marks"],
+            "feedback": str(data.get("feedback", "")).strip(),
+        }
+
+    def merge_criteria(self, entries, overall_feedback=""):
+        """
+        Combine single-criterion results into one set of scores.
+
+        Args:
+            entries (list): Results of parse_criterion_response
+            overall_feedback (str): Optional overall comment
+
+        Returns:
+            dict: Scores in the same form as parse_response, with a computed
+                total
+
+        Raises:
+            ValueError: If a criterion is missing
+        """
+        by_name = {entry["criterion"]: entry for entry in entries}
+        missing = [name for name in self.names if name not in by_name]
+        if missing:
+            raise ValueError(f"Criteria not scored: {', '.join(missing)}")
+
+        return {
+            "criteria": [by_name[name] for name in self.names],
+            "total": sum(entry["score"] for entry in by_name.values()),
+            "max_total": self.total_marks,
+            "reported_total": None,
+            "total_mismatch": False,
+            "overall_feedback": overall_feedback,
+        }
+
+    def parse_response(self, response):
+        """
+        Parse and validate a structured assessment.
+
+        The total is always recomputed from the criterion scores; the model's
+        own total is kept only for comparison.
+
+        Args:
+            response (str): Raw model output
+
+        Returns:
+            dict: Validated scores with "criteria", "total", "max_total",
+                "reported_total", "total_mismatch" and "overall_feedback",
+                plus "confidence" (0-1) when the model reported one
+
+        Raises:
+            ValueError: If the output does not match the rubric
+        """
+        try:
+            data = JsonUtils.loads_model_output(response)
+        except ValueError as e:
+            raise ValueError(f"Assessment is not valid JSON: {str(e)}")
+
+        if not isinstance(data, dict) or not isinstance(data.get("criteria"), list):
+            raise ValueError("Assessment is missing the 'criteria' list")
+
+        max_marks = {c["name"]: c["max_marks"] for c in self.criteria}
+        scored = {}
+        for entry in data["criteria"]:
+            if not isinstance(entry, dict):
+                raise ValueError("Assessment criteria entries must be objects")
+            name = entry.get("criterion")
+            score = entry.get("score")
+            if name not in max_marks:
+                raise ValueError(f"Unknown rubric criterion: {name}")
+            if name in scored:
+                raise ValueError(f"Criterion scored more than once: {name}")
+            if not isinstance(score, (int, float)) or isinstance(score, bool):
+                raise ValueError(f"Score for {name} is not a number")
+            if score < 0 or score > max_marks[name]:
+                raise ValueError(
+                    f"Score for {name} is outside 0-{max_marks[name]}: {score}"
+                )
+            scored[name] = {
+                "criterion": name,
+                "score": score,
+                "max_marks": max_marks[name],
+                "feedback": str(entry.get("feedback", "")).strip(),
+            }
+
+        missing = [name for name in self.names if name not in scored]
+        if missing:
+            raise ValueError(f"Criteria not scored: {', '.join(missing)}")
+
+        total = sum(entry["score"] for entry in scored.values())
+        reported_total = data.get("total")
+        total_mismatch = not isinstance(reported_total, (int, float)) or (
+            abs(reported_total - total) > 1e-6
+        )
+        if total_mismatch:
+            logging.warning(
+                f"Model reported total {reported_total}, computed total is {total}"
+            )
+
+        scores = {
+            "criteria": [scored[name] for name in self.names],
+            "total": total,
+            "max_total": self.total_marks,
+            "reported_total": reported_total,
+            "total_mismatch": total_mismatch,
+            "overall_feedback": str(data.get("overall_feedback", "")).strip(),
+        }
+        confidence = data.get("confidence")
+        if isinstance(confidence, (int, float)) and not isinstance(confidence, bool):
+            scores["confidence"] = min(max(float(confidence), 0.0), 1.0)
+        return scores
+
+    @staticmethod
+    def format_feedback(scores):
+        """
+        Render validated scores as readable feedback.
+
+        Args:
+            scores (dict): Result of parse_response
+
+        Returns:
+            str: Feedback prose with per-criterion marks and the total
+        """
+        sections = []
+        if scores.get("overall_feedback"):
+            sections.append(scores["overall_feedback"])
+        for entry in scores["criteria"]:
+            sections.append(
+                f"{entry['criterion']}: {entry['score']} / {entry['max_marks']}\n"
+                f"{entry['feedback']}"
+            )
+        sections.append(f"Total: {scores['total']} / {scores['max_total']}")
+        return "\n\n".join(sections)
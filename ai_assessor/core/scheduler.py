@@ -0,0 +1,94 @@
+import heapq
+import itertools
+import logging
+import threading
+from concurrent.futures import Future
+
+from .cancellation import RequestCancelled
+
+
+class JobScheduler:
+    """
+    Shared worker pool with priority lanes.
+
+    Jobs in the interactive lane always start before queued batch jobs, so
+    a grading request made while a large batch is running waits for at most
+    one job to finish rather than for the whole batch. Within a lane the
+    job with the lowest estimated cost runs first (shortest job first), so
+    the first results of a batch arrive early.
+    """
+
+    INTERACTIVE = 0
+    BATCH = 1
+
+    def __init__(self, workers=1):
+        """
+        Initialize the scheduler. Worker threads start with the first job.
+
+        Args:
+            workers (int): Jobs run at the same time
+        """
+        self.workers = max(1, workers)
+        self._condition = threading.Condition()
+        self._queue = []
+        self._sequence = itertools.count()
+        self._threads = []
+        self._running = 0
+
+    def submit(self, function, priority=BATCH, cost=0, cancel_token=None):
+        """
+        Queue a job.
+
+        Args:
+            function (callable): Job taking no arguments
+            priority (int): INTERACTIVE or BATCH
+            cost (float): Estimated cost (e.g. tokens); cheaper jobs go first
+            cancel_token (CancellationToken, optional): Token that drops the
+                job if it is cancelled before the job starts
+
+        Returns:
+            Future: Completed with the job's result or exception
+        """
+        future = Future()
+        with self._condition:
+            heapq.heappush(
+                self._queue,
+                (priority, cost, next(self._sequence), function, future, cancel_token),
+            )
+            if len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work, daemon=True)
+                self._threads.append(thread)
+                thread.start()
+            self._condition.notify()
+        return future
+
+    def _work(self):
+        """Run queued jobs, best first, for the lifetime of the process."""
+        while True:
+            with self._condition:
+                while not self._queue:
+                    self._condition.wait()
+                _, _, _, function, future, cancel_token = heapq.heappop(self._queue)
+                self._running += 1
+
+            try:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                if cancel_token is not None and cancel_token.cancelled:
+                    future.set_exception(RequestCancelled(cancel_token.reason))
+                    continue
+                try:
+                    future.set_result(function())
+                except BaseException as e:
+                    future.set_exception(e)
+            except Exception as e:
+                logging.error(f"Scheduled job failed: {str(e)}")
+            finally:
+                with self._condition:
+                    self._running -= 1
+
+    @property
+    def pending(self):
+        """int: Jobs queued or running."""
+        with self._condition:
+            return len(self._queue) + self._running
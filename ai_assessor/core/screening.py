@@ -0,0 +1,170 @@
+import re
+import unicodedata
+
+# Words of two or more letters, identifiers and numbers; single letters and
+# stray symbols do not count
+WORD_PATTERN = re.compile(r"\d+(?:\.\d+)+|\w*(?:[^\W\d_]{2}|\d)\w*")
+
+# Punctuation that carries meaning in code and worked maths; mathematical
+# symbols (+ = < ± √ ...) are recognised by their Unicode category
+CODE_CHARACTERS = set("()[]{}*/%^&!:;,'\"#@\\-")
+
+# Characters that only count inside a word, number or identifier
+JOINING_CHARACTERS = set("._")
+
+
+class SubmissionScreener:
+    """
+    Flags submissions that are not worth sending to the provider.
+
+    Runs locally before any API call. A submission whose text could not be
+    extracted, that has almost no words of its own, that is mostly copied
+    template or that is mostly filler (placeholder lines, dots, stray
+    characters left by images) is marked for human review instead of being
+    graded. Digits, operators and code punctuation count as content, so
+    code and worked maths are not mistaken for filler. The screener is
+    configured with the Screen* options in the
+    [Processing] section.
+    """
+
+    def __init__(
+        self,
+        enabled=True,
+        min_words=25,
+        max_template_fraction=0.95,
+        min_text_fraction=0.5,
+    ):
+        """
+        Initialize the screener.
+
+        Args:
+            enabled (bool): Whether submissions are screened
+            min_words (int): Fewest words the student must have written
+            max_template_fraction (float): Highest share of the document
+                (0-1) that may be template boilerplate
+            min_text_fraction (float): Lowest share of non-space characters
+                (0-1) that must be content (letters, digits, operators)
+        """
+        self.enabled = enabled
+        self.min_words = min_words
+        self.max_template_fraction = max_template_fraction
+        self.min_text_fraction = min_text_fraction
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Build the screener from the [Processing] section.
+
+        Args:
+            config (ConfigManager): Configuration manager
+
+        Returns:
+            SubmissionScreener: The configured screener
+        """
+        return cls(
+            enabled=config.get_bool("Processing", "ScreenSubmissions", True),
+            min_words=config.get_int("Processing", "ScreenMinWords", 25),
+            max_template_fraction=config.get_float(
+                "Processing", "ScreenMaxTemplateFraction", 0.95
+            ),
+            min_text_fraction=config.get_float(
+                "Processing", "ScreenMinTextFraction", 0.5
+            ),
+        )
+
+    @staticmethod
+    def count_words(text):
+        """
+        Count the words, numbers and identifiers in a text, ignoring single
+        letters and symbols.
+
+        Args:
+            text (str): Text to count
+
+        Returns:
+            int: Number of words
+        """
+        return len(WORD_PATTERN.findall(text or ""))
+
+    @staticmethod
+    def is_content(text, index):
+        """
+        Check whether a character is content rather than filler.
+
+        Letters, digits, mathematical symbols and code punctuation are
+        content; dots and underscores only when they join two letters or
+        digits (3.14, snake_case). A symbol repeated three or more times in
+        a row (______, ------, *****) is a placeholder line, not content.
+
+        Args:
+            text (str): Text the character is in
+            index (int): Position of the character
+
+        Returns:
+            bool: True for content
+        """
+        c = text[index]
+        if c.isalnum():
+            return True
+        if c * 3 in text[max(0, index - 2) : index + 3]:
+            return False
+        if c in CODE_CHARACTERS:
+            return True
+        if c in JOINING_CHARACTERS:
+            return (
+                0 < index < len(text) - 1
+                and text[index - 1].isalnum()
+                and text[index + 1].isalnum()
+            )
+        return unicodedata.category(c) == "Sm"
+
+    @classmethod
+    def text_fraction(cls, text):
+        """
+        Get the share of non-space characters that are content.
+
+        Args:
+            text (str): Text to measure
+
+        Returns:
+            float: Fraction between 0 and 1 (1 for empty text)
+        """
+        text = text or ""
+        positions = [i for i, c in enumerate(text) if not c.isspace()]
+        if not positions:
+            return 1.0
+        content = sum(1 for i in positions if cls.is_content(text, i))
+        return content / len(positions)
+
+    def screen(self, text, original_text=None):
+        """
+        Check a submission before it is graded.
+
+        Args:
+            text (str): Submission text as it would be sent, with template
+                boilerplate removed
+            original_text (str, optional): Text before the boilerplate was
+                removed, used to measure the template share
+
+        Returns:
+            list: Reasons the submission needs human review (empty if it can
+                be graded)
+        """
+        if not self.enabled:
+            return []
+
+        reasons = []
+        words = self.count_words(text)
+        if words < self.min_words:
+            reasons.append(f"only {words} words of student text")
+
+        if original_text and original_text.strip():
+            kept = len((text or "").strip()) / len(original_text.strip())
+            template_fraction = max(0.0, 1.0 - kept)
+            if template_fraction > self.max_template_fraction:
+                reasons.append(f"{template_fraction:.0%} of the document is template")
+
+        text_fraction = self.text_fraction(text)
+        if text_fraction < self.min_text_fraction:
+            reasons.append(f"only {text_fraction:.0%} of the content is text")
+        return reasons
@@ -0,0 +1,185 @@
+import hashlib
+import json
+import logging
+import threading
+
+from .cancellation import RequestCancelled
+
+
+class _Call:
+    """One in-flight call that later callers may attach to."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time.
+
+    A caller whose key is already in flight waits for that call and shares
+    its result instead of starting its own. Once the call finishes the key
+    is forgotten, so later callers start a fresh call.
+    """
+
+    # Seconds between checks of a waiting caller's cancel token
+    POLL_SECONDS = 0.1
+
+    def __init__(self):
+        """Initialize with no calls in flight."""
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, function, cancel_token=None):
+        """
+        Run a function, or attach to the identical call already running.
+
+        Args:
+            key (str): Fingerprint of the call
+            function (callable): Function taking no arguments
+            cancel_token (CancellationToken, optional): Token that stops a
+                waiting caller (the shared call keeps running)
+
+        Returns:
+            tuple: (result, whether it was shared from another caller)
+
+        Raises:
+            RequestCancelled: If the caller's token is cancelled while waiting
+            Exception: Whatever the shared call raised
+        """
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call()
+
+            if leader:
+                try:
+                    call.result = function()
+                except BaseException as e:
+                    call.error = e
+                    raise
+                finally:
+                    with self._lock:
+                        del self._calls[key]
+                    call.done.set()
+                return call.result, False
+
+            while not call.done.wait(self.POLL_SECONDS):
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+            if isinstance(call.error, RequestCancelled):
+                # The leader gave up, not this caller; run the call again
+                continue
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+
+class CoalescingClient:
+    """
+    Sends identical concurrent requests to the provider only once.
+
+    Wraps an OpenAIClient, EndpointPool or HedgedClient. Requests with the
+    same prompt, model and sampling settings that are already in flight
+    attach to the running request and receive a copy of its completion with
+    zero usage, since no tokens were spent on them. Attached requests are
+    counted in the "coalesced_requests" statistic.
+    """
+
+    def __init__(self, client, single_flight, stats=None):
+        """
+        Initialize the coalescing client.
+
+        Args:
+            client: Client that sends requests
+            single_flight (SingleFlight): Shared record of calls in flight
+            stats (BatchStats, optional): Statistics for the coalesced counter
+        """
+        self.client = client
+        self.single_flight = single_flight
+        self.stats = stats
+
+    @staticmethod
+    def fingerprint(system_content, user_content, model, **kwargs):
+        """
+        Fingerprint a request by everything that shapes the response.
+
+        Args:
+            system_content (str): System message content
+            user_content (str): User message content
+            model (str): Model name
+            **kwargs: Other generate_completion arguments
+
+        Returns:
+            str: Hex digest identifying the request
+        """
+        settings = {
+            name: value
+            for name, value in kwargs.items()
+            if name not in ("cancel_token", "on_first_token")
+        }
+        payload = json.dumps(
+            [system_content, user_content, model, settings],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def generate_completion(self, system_content, user_content, model, **kwargs):
+        """
+        Generate a completion, sharing an identical request in flight.
+
+        Takes the same arguments as OpenAIClient.generate_completion.
+
+        Returns:
+            dict: The completion
+        """
+        key = self.fingerprint(system_content, user_content, model, **kwargs)
+        completion, shared = self.single_flight.do(
+            key,
+            lambda: self.client.generate_completion(
+                system_content, user_content, model, **kwargs
+            ),
+            cancel_token=kwargs.get("cancel_token"),
+        )
+        if not shared:
+            return completion
+
+        logging.info(f"Coalesced identical request to {model}")
+        if self.stats is not None:
+            self.stats.increment("coalesced_requests")
+        completion = dict(completion)
+        completion["usage"] = {name: 0 for name in completion["usage"]}
+        return completion
+
+    def generate_assessment(
+        self,
+        system_content,
+        user_content,
+        model,
+        temperature=0.7,
+        max_tokens=3500,
+        response_format=None,
+        cancel_token=None,
+    ):
+        """
+        Generate an assessment, sharing an identical request in flight.
+
+        Takes the same arguments as OpenAIClient.generate_assessment.
+
+        Returns:
+            str: The generated feedback
+        """
+        return self.generate_completion(
+            system_content,
+            user_content,
+            model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            response_format=response_format,
+            cancel_token=cancel_token,
+        )["content"]
@@ -7,6 +7,7 @@ from tkinter import PhotoImage, messagebox, ttk
 from openai import OpenAI
 
 from .. import __version__
+from ..core.key_pool import KeyPool
 from .views.config_view import ConfigView
 from .views.grading_view import GradingView
 
@@ -184,11 +185,9 @@ class AIAssessorGUI:
 
         # Load available models from config
         self.splash.update_progress(50, "Loading available models...")
-        self.available_models = []
 
         # Get models from config instead of API query
-        if self.config_manager.config.has_section("Models"):
-            self.available_models = list(self.config_manager.config["Models"].keys())
+        self.available_models = self.config_manager.get_model_keys()
 
         # Setup UI
         self.splash.update_progress(70, "Building user interface...")
@@ -216,7 +215,7 @@ class AIAssessorGUI:
         base_url = self.string_vars["base_url"].get()
         ssl_verify = self.string_vars["ssl_verify"].get().lower() == "true"
         logging.debug(
-            f"AIAssessorGUI.update_api_client_settings: api_key={api_key}, base_url={base_url}, ssl_verify={ssl_verify}"
+            f"AIAssessorGUI.update_api_client_settings: api_key={KeyPool.mask(api_key)}, base_url={base_url}, ssl_verify={ssl_verify}"
         )
         self.assessor.api_client.update(api_key, base_url, ssl_verify)
         self.update_api_status()
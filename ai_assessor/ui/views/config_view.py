@@ -2,6 +2,8 @@ import os
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext, ttk
 
+from ...core.key_pool import KeyPool
+from ...core.router import ModelRouter
 from ...utils.document_processor import DocumentProcessor
 
 
@@ -200,11 +202,15 @@ class ConfigView(ttk.Frame):
         if self.available_models:
             model_options = self.available_models
         else:
-            model_options = (
-                list(self.config_manager.config["Models"].keys())
-                if self.config_manager.config.has_section("Models")
-                else ["gpt-3.5-turbo", "gpt-4-turbo", "gpt-4o"]
-            )
+            model_options = self.config_manager.get_model_keys() or [
+                "gpt-3.5-turbo",
+                "gpt-4-turbo",
+                "gpt-4o",
+            ]
+
+        # Offer per-submission routing when a routing table is configured
+        if ModelRouter.from_config(self.config_manager).routes:
+            model_options = [ModelRouter.AUTO] + list(model_options)
 
         # Create combobox for model selection
         self.model_dropdown = ttk.Combobox(
@@ -439,7 +445,7 @@ class ConfigView(ttk.Frame):
         ssl_verify = self.ssl_verify_var.get()
 
         print("--- Testing Connection ---")
-        print(f"API Key: {api_key}")
+        print(f"API Key: {KeyPool.mask(api_key)}")
         print(f"Base URL: {base_url}")
         print(f"SSL Verify: {ssl_verify}")
         print("--------------------------")
@@ -519,12 +525,8 @@ class ConfigView(ttk.Frame):
             self.model_dropdown["values"] = self.available_models
 
             if self.available_models:
-                # Save models to config.ini
-                if self.config_manager.config.has_section("Models"):
-                    self.config_manager.config.remove_section("Models")
-                self.config_manager.config.add_section("Models")
-                for model_id in self.available_models:
-                    self.config_manager.set_value("Models", model_id, model_id)
+                # Save models to config.ini (keeping cascade settings)
+                self.config_manager.replace_models(self.available_models)
                 self.config_manager.save()
 
                 messagebox.showinfo(
@@ -584,9 +586,10 @@ class ConfigView(ttk.Frame):
                                     if listbox:
                                         # Refresh the listbox
                                         listbox.delete(0, tk.END)
-                                        for model_name in self.config_manager.config[
-                                            "Models"
-                                        ].keys():
+                                        model_keys = (
+                                            self.config_manager.get_model_keys()
+                                        )
+                                        for model_name in model_keys:
                                             listbox.insert(tk.END, model_name)
                                         break
                             except Exception:
@@ -686,7 +689,7 @@ class ConfigView(ttk.Frame):
 
         # Populate the listbox with current models
         if self.config_manager.config.has_section("Models"):
-            for model_name in self.config_manager.config["Models"].keys():
+            for model_name in self.config_manager.get_model_keys():
                 model_listbox.insert(tk.END, model_name)
 
         # Frame for model management buttons
@@ -772,9 +775,7 @@ class ConfigView(ttk.Frame):
             model_id_var.set("")
 
             # Update dropdown in main view
-            self.model_dropdown["values"] = list(
-                self.config_manager.config["Models"].keys()
-            )
+            self.model_dropdown["values"] = self.config_manager.get_model_keys()
 
             messagebox.showinfo("Success", f"Added model: {name}")
 
@@ -827,8 +828,6 @@ class ConfigView(ttk.Frame):
             model_listbox.delete(selected[0])
 
             # Update dropdown in main view
-            self.model_dropdown["values"] = list(
-                self.config_manager.config["Models"].keys()
-            )
+            self.model_dropdown["values"] = self.config_manager.get_model_keys()
 
             messagebox.showinfo("Success", f"Removed model: {model_name}")
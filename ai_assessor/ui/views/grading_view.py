@@ -1,7 +1,13 @@
 import os
+import time
 import tkinter as tk
+from concurrent.futures import as_completed
+from functools import partial
 from tkinter import messagebox, ttk
 
+from ...core.archive import archive_scope
+from ...core.cancellation import CancellationToken, RequestCancelled
+from ...core.scheduler import JobScheduler
 from ...utils.document_processor import DocumentProcessor
 from ...utils.file_utils import FileUtils
 
@@ -86,6 +92,18 @@ class GradingView(ttk.Frame):
         self.feedback_display = tk.Text(self, wrap="word")
         self.feedback_display.grid(row=1, column=2, sticky="nsew", padx=5, pady=5)
 
+        # Feedback search
+        search_frame = ttk.Frame(self)
+        search_frame.grid(row=2, column=1, columnspan=2, sticky="ew", padx=5, pady=5)
+        ttk.Label(search_frame, text="Search feedback:").pack(side="left", padx=5)
+        self.search_var = tk.StringVar()
+        search_entry = ttk.Entry(search_frame, textvariable=self.search_var)
+        search_entry.pack(side="left", fill="x", expand=True, padx=5)
+        search_entry.bind("<Return>", lambda event: self.search_feedback())
+        ttk.Button(search_frame, text="Search", command=self.search_feedback).pack(
+            side="left", padx=5
+        )
+
         # Status bar
         self.status_var = tk.StringVar(value="Ready")
         ttk.Label(self, textvariable=self.status_var).grid(
@@ -109,14 +127,19 @@ class GradingView(ttk.Frame):
             and os.path.isdir(submissions_folder)
         ):
             try:
-                # Get all docx files
-                docx_files = FileUtils.get_docx_files(submissions_folder)
+                # Get the docx files to grade, without superseded attempts
+                docx_files, superseded = self.assessor.list_submissions(
+                    submissions_folder
+                )
 
                 # Add to listbox
                 for filename in docx_files:
                     self.file_list.insert(tk.END, filename)
 
-                self.status_var.set(f"Found {len(docx_files)} submission files")
+                status = f"Found {len(docx_files)} submission files"
+                if superseded:
+                    status += f" ({len(superseded)} superseded attempts hidden)"
+                self.status_var.set(status)
             except Exception as e:
                 self.status_var.set(f"Error listing files: {str(e)}")
         else:
@@ -177,16 +200,39 @@ class GradingView(ttk.Frame):
         """
         Display feedback for a submission if available.
 
+        The feedback file in the output folder is shown when there is one,
+        so edits made to it are seen; otherwise the latest result in the
+        results database is shown.
+
         Args:
             filename (str): Name of the submission file
         """
         output_folder = self.string_vars["output_folder"].get()
+        feedback_path = None
+        if output_folder:
+            feedback_path = os.path.join(
+                output_folder, filename.replace(".docx", "_feedback.txt")
+            )
 
-        if output_folder and os.path.exists(output_folder):
-            # Get feedback filename
-            feedback_filename = filename.replace(".docx", "_feedback.txt")
-            feedback_path = os.path.join(output_folder, feedback_filename)
+        store = self.assessor.results_store
+        if store is not None and not (feedback_path and os.path.exists(feedback_path)):
+            submissions_folder = self.string_vars["submissions_folder"].get()
+            try:
+                record = store.latest(
+                    filename, folder=os.path.abspath(submissions_folder)
+                )
+            except Exception:
+                record = None
+            if record and record["status"] == "success" and record["feedback"]:
+                self.feedback_display.delete(1.0, tk.END)
+                self.feedback_display.insert(
+                    tk.END,
+                    f"[{record['created']} - {record['model']}]\n\n"
+                    f"{record['feedback']}",
+                )
+                return
 
+        if output_folder and os.path.exists(output_folder):
             # Clear feedback display
             self.feedback_display.delete(1.0, tk.END)
 
@@ -206,6 +252,55 @@ class GradingView(ttk.Frame):
                     "Feedback not available. Use 'Grade Selected' to assess this submission.",
                 )
 
+    def search_feedback(self):
+        """Search all stored feedback and list the hits in a window."""
+        query = self.search_var.get().strip()
+        if not query:
+            return
+        store = self.assessor.results_store
+        if store is None:
+            messagebox.showerror(
+                "Error", "No results database. Set ResultsDatabase in config."
+            )
+            return
+
+        try:
+            hits = store.search(query)
+        except Exception as e:
+            self.status_var.set(f"Search failed: {str(e)}")
+            return
+        self.status_var.set(f"{len(hits)} feedback matches for {query}")
+        if not hits:
+            return
+
+        window = tk.Toplevel(self)
+        window.title(f"Feedback matching {query}")
+        window.geometry("800x500")
+        window.transient(self)
+
+        hit_list = tk.Listbox(window, height=10)
+        hit_list.pack(fill="x", padx=5, pady=5)
+        for hit in hits:
+            snippet = " ".join((hit["snippet"] or "").split())
+            hit_list.insert(tk.END, f"{hit['submission']}: {snippet}")
+
+        feedback_text = tk.Text(window, wrap="word")
+        feedback_text.pack(fill="both", expand=True, padx=5, pady=5)
+
+        def show_hit(event):
+            selected = hit_list.curselection()
+            if not selected:
+                return
+            hit = hits[selected[0]]
+            feedback_text.delete(1.0, tk.END)
+            feedback_text.insert(
+                tk.END,
+                f"{hit['submission']}  [{hit['created']} - {hit['model']}]\n"
+                f"{hit['folder'] or ''}\n\n{hit['feedback'] or ''}",
+            )
+
+        hit_list.bind("<<ListboxSelect>>", show_hit)
+
     def grade_selected(self):
         """Grade the selected submissions."""
         # Get selected indices
@@ -284,6 +379,9 @@ class GradingView(ttk.Frame):
         # Force update to show the window
         progress_window.update()
 
+        # Closing the window aborts the request in flight
+        cancel_token = self.create_cancel_token(progress_window)
+
         # Get configurations
         api_key = self.string_vars["api_key"].get()
         system_prompt_path = self.string_vars["system_prompt_path"].get()
@@ -354,59 +452,28 @@ class GradingView(ttk.Frame):
                         )
                         return
 
-                # Process each selected submission
-                success_count = 0
-                fail_count = 0
-
-                for i, index in enumerate(selected_indices):
-                    if not progress_window.winfo_exists():
-                        # User closed the window, stop processing
-                        return
-
-                    filename = self.file_list.get(index)
-                    submission_path = os.path.join(submissions_folder, filename)
-
-                    # Update progress UI
-                    self.update_progress_ui(current_file_var, filename)
-                    self.update_progress_ui(
-                        count_var, f"{i}/{total_submissions} completed"
-                    )
-                    self.update_progress_ui(progress_var, i)
-                    self.update_progress_ui(
-                        status_var,
-                        f"Grading {filename}... (connecting to {self.string_vars['base_url'].get()})",
-                    )
-
-                    # Update main status
-                    self.update_status(f"Grading: {filename}...")
-
-                    # Grade submission
-                    try:
-                        success, feedback = self.assessor.grade_submission(
-                            submission_file=submission_path,
-                            system_prompt=system_prompt,
-                            user_prompt=user_prompt,
-                            support_files=support_folder,
-                            output_folder=output_folder,
-                            model=model,
-                            temperature=temperature,
-                        )
-
-                        if success:
-                            success_count += 1
-                            self.update_progress_ui(
-                                status_var, f"Successfully graded {filename}"
-                            )
-                        else:
-                            fail_count += 1
-                            self.update_progress_ui(
-                                status_var, f"Failed to grade {filename}: {feedback}"
-                            )
-                    except Exception as e:
-                        fail_count += 1
-                        self.update_progress_ui(
-                            status_var, f"Error grading {filename}: {str(e)}"
-                        )
+                # Interactive jobs start before queued batch jobs
+                filenames = [self.file_list.get(index) for index in selected_indices]
+                counts = self.grade_files(
+                    filenames,
+                    JobScheduler.INTERACTIVE,
+                    dict(
+                        system_prompt=system_prompt,
+                        user_prompt=user_prompt,
+                        support_files=support_folder,
+                        output_folder=output_folder,
+                        model=model,
+                        temperature=temperature,
+                    ),
+                    submissions_folder,
+                    cancel_token,
+                    progress_window,
+                    (current_file_var, progress_var, count_var, status_var),
+                )
+                if counts is None:
+                    # User closed the window, stop processing
+                    return
+                success_count, fail_count, review_count = counts
 
                 # Final update
                 self.update_progress_ui(progress_var, total_submissions)
@@ -416,7 +483,9 @@ class GradingView(ttk.Frame):
                 self.update_progress_ui(status_var, "Finalizing...")
 
                 # Close progress window and show result
-                self.complete_grading(progress_window, success_count, fail_count)
+                self.complete_grading(
+                    progress_window, success_count, fail_count, review_count
+                )
 
             except Exception as e:
                 # Handle any unexpected errors
@@ -429,6 +498,165 @@ class GradingView(ttk.Frame):
 
         threading.Thread(target=run_grading, daemon=True).start()
 
+    def create_cancel_token(self, progress_window):
+        """
+        Create the cancellation token for a grading run.
+
+        Closing the progress window cancels the token, which aborts the
+        request in flight. The token also expires after Batch.Deadline
+        seconds if a deadline is configured.
+
+        Args:
+            progress_window (tk.Toplevel): The progress dialog
+
+        Returns:
+            CancellationToken: Token passed to the assessor
+        """
+        deadline = self.config_manager.get_float("Batch", "Deadline", 0)
+        cancel_token = CancellationToken(timeout=deadline if deadline > 0 else None)
+
+        def on_close():
+            cancel_token.cancel("Grading cancelled by user")
+            self.status_var.set("Grading cancelled")
+            progress_window.destroy()
+
+        progress_window.protocol("WM_DELETE_WINDOW", on_close)
+        return cancel_token
+
+    def grade_files(
+        self,
+        filenames,
+        priority,
+        grading_args,
+        submissions_folder,
+        cancel_token,
+        progress_window,
+        progress_vars,
+    ):
+        """
+        Grade submissions on the assessor's shared job scheduler.
+
+        Jobs are queued smallest first within their lane, and the progress
+        dialog is updated as each one finishes. Results are also appended to
+        the run log in the output folder, and all feedback files are on disk
+        when this returns.
+
+        Args:
+            filenames (list): Submission filenames
+            priority (int): JobScheduler.INTERACTIVE or JobScheduler.BATCH
+            grading_args (dict): Keyword arguments for grade_submission_result
+            submissions_folder (str): Folder containing the submissions
+            cancel_token (CancellationToken): Token for the grading run
+            progress_window (tk.Toplevel): The progress dialog
+            progress_vars (tuple): (current file, progress, count, status)
+                variables of the dialog
+
+        Returns:
+            tuple: (success_count, fail_count, review_count), or None if the
+                progress window was closed
+        """
+        current_file_var, progress_var, count_var, status_var = progress_vars
+        total = len(filenames)
+
+        paths = {
+            filename: os.path.join(submissions_folder, filename)
+            for filename in filenames
+        }
+        costs = {
+            filename: self.assessor.estimate_submission_tokens(path)
+            for filename, path in paths.items()
+        }
+
+        run = self.assessor.start_results_run(
+            grading_args.get("model"),
+            grading_args.get("system_prompt"),
+            grading_args.get("user_prompt"),
+            grading_args.get("output_folder"),
+        )
+
+        def grade(submission_path):
+            started = time.monotonic()
+            with archive_scope([submission_path], run["id"] if run else None):
+                result = self.assessor.grade_submission_result(
+                    submission_file=submission_path,
+                    cancel_token=cancel_token,
+                    **grading_args,
+                )
+            result["latency"] = time.monotonic() - started
+            return result
+
+        scheduler = self.assessor.scheduler
+        futures = {}
+        for filename in filenames:
+            job = partial(grade, paths[filename])
+            future = scheduler.submit(
+                job, priority=priority, cost=costs[filename], cancel_token=cancel_token
+            )
+            futures[future] = filename
+
+        self.update_progress_ui(
+            status_var,
+            f"Grading {total} submissions... "
+            f"(connecting to {self.string_vars['base_url'].get()})",
+        )
+        self.update_status(f"Grading {total} submissions...")
+
+        sink = self.assessor.open_results_sink(grading_args.get("output_folder"))
+        success_count = fail_count = review_count = 0
+        try:
+            for done, future in enumerate(as_completed(futures), start=1):
+                if not progress_window.winfo_exists():
+                    return None
+                filename = futures[future]
+                self.update_progress_ui(current_file_var, filename)
+                self.update_progress_ui(count_var, f"{done}/{total} completed")
+                self.update_progress_ui(progress_var, done)
+
+                try:
+                    result = future.result()
+                except RequestCancelled:
+                    # Dropped from the queue after the run was cancelled
+                    continue
+                except Exception as e:
+                    fail_count += 1
+                    self.update_progress_ui(
+                        status_var, f"Error grading {filename}: {str(e)}"
+                    )
+                    continue
+
+                # A result only counts once its feedback file is on disk
+                self.assessor.wait_for_feedback(result)
+                if sink is not None:
+                    sink.write(filename, result, result.get("latency"))
+                self.assessor.store_result(
+                    run, paths[filename], result, result.get("latency")
+                )
+                if result.get("needs_review"):
+                    review_count += 1
+                if result["success"]:
+                    success_count += 1
+                    self.update_progress_ui(
+                        status_var,
+                        f"Successfully graded {filename} ({result['model']})",
+                    )
+                else:
+                    fail_count += 1
+                    self.update_progress_ui(
+                        status_var, f"Failed to grade {filename}: {result['feedback']}"
+                    )
+
+            self.update_progress_ui(status_var, "Writing feedback files...")
+            write_errors = self.assessor.flush_feedback()
+            if write_errors:
+                messagebox.showwarning(
+                    "Warning",
+                    f"{len(write_errors)} feedback files could not be written:\n"
+                    + "\n".join(message for _, message in write_errors[:5]),
+                )
+            return success_count, fail_count, review_count
+        finally:
+            self.assessor.close_results_sink(sink)
+
     def update_progress_ui(self, var, value):
         """Update a tkinter variable in the main thread."""
         if isinstance(var, tk.Variable):
@@ -450,19 +678,26 @@ class GradingView(ttk.Frame):
         messagebox.showerror("Error", error_message)
         self.status_var.set("Error: Grading failed")
 
-    def complete_grading(self, progress_window, success_count, fail_count):
+    def complete_grading(
+        self, progress_window, success_count, fail_count, review_count=0
+    ):
         """Handle completion of grading process."""
         if progress_window.winfo_exists():
             progress_window.destroy()
 
         # Update status and show result
-        self.status_var.set(
-            f"Grading completed: {success_count} succeeded, {fail_count} failed"
-        )
-        messagebox.showinfo(
-            "Grading Complete",
-            f"Graded {success_count} submissions successfully. {fail_count} failed.",
+        summary = f"Grading completed: {success_count} succeeded, {fail_count} failed"
+        message = (
+            f"Graded {success_count} submissions successfully. {fail_count} failed."
         )
+        if review_count:
+            summary += f" ({review_count} need human review)"
+            message += (
+                f"\n\n{review_count} of the failed submissions were blank or "
+                f"unreadable and need human review; they were not sent to the API."
+            )
+        self.status_var.set(summary)
+        messagebox.showinfo("Grading Complete", message)
 
         # Refresh the feedback display if a submission is selected
         current_selection = self.file_list.curselection()
@@ -504,7 +739,7 @@ class GradingView(ttk.Frame):
         progress_window.title("Grading All Submissions")
         progress_window.geometry("450x220")
         progress_window.transient(self)
-        progress_window.grab_set()
+        # Not modal: "Grade Selected" stays usable and runs ahead of the batch
         progress_window.resizable(False, False)
 
         # Center the window
@@ -568,6 +803,9 @@ class GradingView(ttk.Frame):
         # Force update to show the window
         progress_window.update()
 
+        # Closing the window aborts the request in flight
+        cancel_token = self.create_cancel_token(progress_window)
+
         # Run grading in a separate thread to keep UI responsive
         def run_grading():
             try:
@@ -619,61 +857,27 @@ class GradingView(ttk.Frame):
                 for i in range(file_count):
                     filenames.append(self.file_list.get(i))
 
-                # Process submissions
-                success_count = 0
-                fail_count = 0
-                results = {}
-
-                for i, filename in enumerate(filenames):
-                    if not progress_window.winfo_exists():
-                        # User closed the window, stop processing
-                        return
-
-                    submission_path = os.path.join(submissions_folder, filename)
-
-                    # Update progress UI
-                    self.update_progress_ui(current_file_var, filename)
-                    self.update_progress_ui(count_var, f"{i}/{file_count} completed")
-                    self.update_progress_ui(progress_var, i)
-                    self.update_progress_ui(
-                        status_var,
-                        f"Grading {filename}... (connecting to {self.string_vars['base_url'].get()})",
-                    )
-
-                    # Update main status
-                    self.update_status(f"Grading: {filename}...")
-
-                    # Grade submission
-                    try:
-                        success, feedback = self.assessor.grade_submission(
-                            submission_file=submission_path,
-                            system_prompt=system_prompt,
-                            user_prompt=user_prompt,
-                            support_files=support_folder,
-                            output_folder=output_folder,
-                            model=model,
-                            temperature=temperature,
-                        )
-
-                        # Track results
-                        results[filename] = {"success": success, "feedback": feedback}
-
-                        if success:
-                            success_count += 1
-                            self.update_progress_ui(
-                                status_var, f"Successfully graded {filename}"
-                            )
-                        else:
-                            fail_count += 1
-                            self.update_progress_ui(
-                                status_var, f"Failed to grade {filename}"
-                            )
-                    except Exception as e:
-                        fail_count += 1
-                        results[filename] = {"success": False, "feedback": str(e)}
-                        self.update_progress_ui(
-                            status_var, f"Error grading {filename}: {str(e)}"
-                        )
+                # Queue the batch behind any interactive grading
+                counts = self.grade_files(
+                    filenames,
+                    JobScheduler.BATCH,
+                    dict(
+                        system_prompt=system_prompt,
+                        user_prompt=user_prompt,
+                        support_files=support_folder,
+                        output_folder=output_folder,
+                        model=model,
+                        temperature=temperature,
+                    ),
+                    submissions_folder,
+                    cancel_token,
+                    progress_window,
+                    (current_file_var, progress_var, count_var, status_var),
+                )
+                if counts is None:
+                    # User closed the window, stop processing
+                    return
+                success_count, fail_count, review_count = counts
 
                 # Final update
                 self.update_progress_ui(progress_var, file_count)
@@ -683,7 +887,9 @@ class GradingView(ttk.Frame):
                 self.update_progress_ui(status_var, "Finalizing...")
 
                 # Close progress window and show result
-                self.complete_grading(progress_window, success_count, fail_count)
+                self.complete_grading(
+                    progress_window, success_count, fail_count, review_count
+                )
 
             except Exception as e:
                 # Handle any unexpected errors
@@ -1,5 +1,15 @@
 from .document_processor import DocumentProcessor
 from .error_handling import ErrorHandler
 from .file_utils import FileUtils
+from .json_utils import JsonUtils
+from .template_filter import TemplateFilter
+from .token_utils import TokenEstimator
 
-__all__ = ["DocumentProcessor", "ErrorHandler", "FileUtils"]
+__all__ = [
+    "DocumentProcessor",
+    "ErrorHandler",
+    "FileUtils",
+    "JsonUtils",
+    "TemplateFilter",
+    "TokenEstimator",
+]
@@ -1,19 +1,29 @@
+import io
 import os
+import re
+import uuid
 
 from docx import Document
+from docx.oxml.ns import qn
+from docx.table import Table
+from docx.text.paragraph import Paragraph
 
 
 class DocumentProcessor:
+    # Supported renderings of a Word document
+    RENDER_TEXT = "text"
+    RENDER_MARKDOWN = "markdown"
+
     @staticmethod
-    def read_word_document(file_path):
+    def load_document(file_path):
         """
-        Read text from a Word document.
+        Open a Word document.
 
         Args:
             file_path (str): Path to the Word document
 
         Returns:
-            str: Text content of the document
+            Document: The parsed python-docx document
 
         Raises:
             FileNotFoundError: If file doesn't exist
@@ -23,16 +33,200 @@ class DocumentProcessor:
             if not os.path.exists(file_path):
                 raise FileNotFoundError(f"File not found: {file_path}")
 
-            doc = Document(file_path)
-            full_text = []
-            for para in doc.paragraphs:
-                full_text.append(para.text)
-            return "\n".join(full_text)
+            return Document(file_path)
         except FileNotFoundError:
             raise
         except Exception as e:
             raise Exception(f"Error reading Word document: {str(e)}")
 
+    @staticmethod
+    def read_word_document(file_path, render_mode=RENDER_TEXT):
+        """
+        Read text from a Word document.
+
+        Args:
+            file_path (str): Path to the Word document
+            render_mode (str): "text" for one line per paragraph, or
+                "markdown" for compact Markdown including tables
+
+        Returns:
+            str: Text content of the document
+
+        Raises:
+            FileNotFoundError: If file doesn't exist
+            Exception: For other document processing errors
+        """
+        doc = DocumentProcessor.load_document(file_path)
+        return DocumentProcessor.render_document(doc, render_mode)
+
+    @staticmethod
+    def render_document(doc, render_mode=RENDER_TEXT):
+        """
+        Render a loaded Word document as text.
+
+        Args:
+            doc (Document): The python-docx document
+            render_mode (str): "text" or "markdown"
+
+        Returns:
+            str: Rendered document
+        """
+        if render_mode == DocumentProcessor.RENDER_MARKDOWN:
+            return DocumentProcessor.render_markdown(doc)
+        return DocumentProcessor.render_plain_text(doc)
+
+    @staticmethod
+    def render_plain_text(doc):
+        """
+        Render paragraph text joined with newlines (tables are not included).
+
+        Args:
+            doc (Document): The python-docx document
+
+        Returns:
+            str: Plain text of the document
+        """
+        return "\n".join(para.text for para in doc.paragraphs)
+
+    @staticmethod
+    def render_markdown(doc):
+        """
+        Render a document as compact Markdown.
+
+        Headings become "#" lines, list paragraphs become "-" items, tables
+        become pipe tables, runs of whitespace are collapsed and empty
+        paragraphs, rows and columns are dropped.
+
+        Args:
+            doc (Document): The python-docx document
+
+        Returns:
+            str: Markdown rendering of the document
+        """
+        blocks = []
+        for block in DocumentProcessor._iter_blocks(doc):
+            if isinstance(block, Table):
+                rendered = DocumentProcessor._markdown_table(block)
+            else:
+                rendered = DocumentProcessor._markdown_paragraph(block)
+            if rendered:
+                blocks.append(rendered)
+
+        # Keep headings and tables visually separated, everything else tight
+        lines = []
+        for rendered in blocks:
+            if lines and (rendered.startswith("#") or rendered.startswith("|")):
+                lines.append("")
+            lines.append(rendered)
+            if rendered.startswith("#") or rendered.startswith("|"):
+                lines.append("")
+
+        text = "\n".join(lines)
+        return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+    @staticmethod
+    def _iter_blocks(doc):
+        """
+        Iterate the body's paragraphs and tables in document order.
+
+        Document.iter_inner_content only exists from python-docx 1.1, so
+        older versions walk the body element directly.
+
+        Args:
+            doc (Document): The python-docx document
+
+        Yields:
+            Paragraph or Table: Each top-level block
+        """
+        if hasattr(doc, "iter_inner_content"):
+            yield from doc.iter_inner_content()
+            return
+        body = doc.element.body
+        for child in body.iterchildren():
+            if child.tag == qn("w:p"):
+                yield Paragraph(child, doc._body)
+            elif child.tag == qn("w:tbl"):
+                yield Table(child, doc._body)
+
+    @staticmethod
+    def _clean_text(text):
+        """Collapse whitespace (including line breaks) into single spaces."""
+        return re.sub(r"\s+", " ", text).strip()
+
+    @staticmethod
+    def _markdown_paragraph(para):
+        """
+        Render one paragraph as a Markdown line.
+
+        Args:
+            para (Paragraph): The python-docx paragraph
+
+        Returns:
+            str: Markdown line, or an empty string for blank paragraphs
+        """
+        text = DocumentProcessor._clean_text(para.text)
+        if not text:
+            return ""
+
+        style_name = para.style.name if para.style is not None else ""
+        if style_name == "Title":
+            return f"# {text}"
+        if style_name.startswith("Heading"):
+            level = style_name.replace("Heading", "").strip()
+            level = int(level) if level.isdigit() else 1
+            return f"{'#' * min(level, 6)} {text}"
+
+        p_pr = para._p.pPr
+        num_pr = p_pr.numPr if p_pr is not None else None
+        if num_pr is not None or style_name.startswith("List"):
+            depth = 0
+            if num_pr is not None and num_pr.ilvl is not None:
+                depth = num_pr.ilvl.val
+            return f"{'  ' * depth}- {text}"
+
+        return text
+
+    @staticmethod
+    def _markdown_table(table):
+        """
+        Render a table as a Markdown pipe table.
+
+        Args:
+            table (Table): The python-docx table
+
+        Returns:
+            str: Pipe table, or an empty string if every cell is empty
+        """
+        rows = []
+        for row in table.rows:
+            cells = []
+            previous = None
+            for cell in row.cells:
+                # Merged cells are repeated by python-docx; keep them once
+                if previous is not None and cell._tc is previous:
+                    continue
+                previous = cell._tc
+                text = DocumentProcessor._clean_text(cell.text)
+                cells.append(text.replace("|", "\\|"))
+            if any(cells):
+                rows.append(cells)
+
+        if not rows:
+            return ""
+
+        width = max(len(cells) for cells in rows)
+        rows = [cells + [""] * (width - len(cells)) for cells in rows]
+
+        # Drop columns that are empty in every row
+        keep = [i for i in range(width) if any(cells[i] for cells in rows)]
+        rows = [[cells[i] for i in keep] for cells in rows]
+
+        lines = ["| " + " | ".join(rows[0]) + " |"]
+        lines.append("|" + "|".join(["---"] * len(keep)) + "|")
+        for cells in rows[1:]:
+            lines.append("| " + " | ".join(cells) + " |")
+        return "\n".join(lines)
+
     @staticmethod
     def read_text_file(file_path):
         """
@@ -71,12 +265,62 @@ class DocumentProcessor:
         Raises:
             Exception: If file cannot be written
         """
+        temp_path = None
         try:
             directory = os.path.dirname(file_path)
-            if directory and not os.path.exists(directory):
-                os.makedirs(directory)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
 
-            with open(file_path, "w", encoding="utf-8") as file:
+            # Write beside the target and rename, so a crash never leaves a
+            # truncated file
+            temp_path = DocumentProcessor.temp_path(file_path)
+            with open(temp_path, "x", encoding="utf-8") as file:
                 file.write(content)
+            os.replace(temp_path, file_path)
         except Exception as e:
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
             raise Exception(f"Error writing to file: {str(e)}")
+
+    @staticmethod
+    def temp_path(file_path):
+        """
+        Get a unique hidden temporary path beside a file.
+
+        Args:
+            file_path (str): Final path of the file
+
+        Returns:
+            str: Path in the same folder, so it can be renamed over file_path
+        """
+        directory, filename = os.path.split(file_path)
+        return os.path.join(directory, f".{filename}.{uuid.uuid4().hex[:12]}.tmp")
+
+    @staticmethod
+    def render_feedback(content, template_bytes=None):
+        """
+        Render feedback text as a Word document.
+
+        Lines starting with "#" become headings when the template has
+        heading styles; every other line becomes a paragraph.
+
+        Args:
+            content (str): Feedback text
+            template_bytes (bytes, optional): Template document to start from
+
+        Returns:
+            Document: The python-docx document
+        """
+        doc = Document(io.BytesIO(template_bytes)) if template_bytes else Document()
+        for line in content.split("\n"):
+            text = line.lstrip("#")
+            level = len(line) - len(text)
+            if 0 < level <= 6 and text.startswith(" "):
+                try:
+                    doc.add_heading(text.strip(), level=level)
+                    continue
+                except KeyError:
+                    # The template has no heading styles
+                    pass
+            doc.add_paragraph(line)
+        return doc
@@ -1,7 +1,14 @@
 import os
+import re
 
 
 class FileUtils:
+    # Student name before the first underscore, then an optional attempt
+    # number or date, e.g. jsmith_attempt1.docx or jsmith_attempt_2024-05-03.docx
+    DEFAULT_STUDENT_PATTERN = (
+        r"^(?P<student>[^_.]+)(?:.*?attempt[_-]?(?P<attempt>[\d-]+))?"
+    )
+
     @staticmethod
     def get_docx_files(folder_path):
         """
@@ -24,6 +31,99 @@ class FileUtils:
 
         return [file for file in os.listdir(folder_path) if file.endswith(".docx")]
 
+    @staticmethod
+    def _compile_student_pattern(pattern):
+        """Compile a student pattern, reporting invalid ones as ValueError."""
+        try:
+            return re.compile(pattern)
+        except re.error as e:
+            raise ValueError(f"Invalid student pattern {pattern!r}: {str(e)}")
+
+    @staticmethod
+    def _match_student(regex, match):
+        """Get the normalized student from a pattern match, or None."""
+        if not match:
+            return None
+        if "student" in regex.groupindex:
+            student = match.group("student")
+        elif regex.groups:
+            student = match.group(1)
+        else:
+            student = match.group(0)
+        return student.strip().lower() if student else None
+
+    @staticmethod
+    def student_id(filename, pattern):
+        """
+        Identify the student who submitted a file.
+
+        Args:
+            filename (str): Submission filename
+            pattern (str): Regular expression with a "student" group (or a
+                first group) identifying the student
+
+        Returns:
+            str: Lower-case student identifier, or None if the pattern does
+                not match
+
+        Raises:
+            ValueError: If the pattern is not a valid regular expression
+        """
+        regex = FileUtils._compile_student_pattern(pattern)
+        return FileUtils._match_student(regex, regex.search(filename))
+
+    @staticmethod
+    def latest_attempts(folder_path, filenames, pattern):
+        """
+        Keep only each student's latest attempt.
+
+        The pattern is searched in each filename. Its "student" group (or
+        first group) identifies the student; files it does not match are
+        kept as they are. An optional "attempt" group holding a number or
+        date orders a student's attempts; otherwise the latest modification
+        time wins.
+
+        Args:
+            folder_path (str): Folder containing the files
+            filenames (list): Filenames in the folder
+            pattern (str): Regular expression identifying the student
+
+        Returns:
+            tuple: (filenames to grade in their original order, dict mapping
+                each superseded filename to the attempt that replaced it)
+
+        Raises:
+            ValueError: If the pattern is not a valid regular expression
+        """
+        regex = FileUtils._compile_student_pattern(pattern)
+        groups = {}
+        for filename in filenames:
+            match = regex.search(filename)
+            student = FileUtils._match_student(regex, match)
+            if not student:
+                continue
+            attempt = None
+            if "attempt" in regex.groupindex and match.group("attempt"):
+                numbers = re.findall(r"\d+", match.group("attempt"))
+                attempt = tuple(int(number) for number in numbers) or None
+            mtime = os.path.getmtime(os.path.join(folder_path, filename))
+            groups.setdefault(student, []).append((filename, attempt, mtime))
+
+        superseded = {}
+        for attempts in groups.values():
+            if len(attempts) < 2:
+                continue
+            if all(attempt is not None for _, attempt, _ in attempts):
+                latest = max(attempts, key=lambda a: (a[1], a[2], a[0]))
+            else:
+                latest = max(attempts, key=lambda a: (a[2], a[0]))
+            for filename, _, _ in attempts:
+                if filename != latest[0]:
+                    superseded[filename] = latest[0]
+
+        kept = [filename for filename in filenames if filename not in superseded]
+        return kept, superseded
+
     @staticmethod
     def ensure_dir_exists(dir_path):
         """
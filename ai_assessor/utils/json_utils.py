@@ -0,0 +1,28 @@
+import json
+import re
+
+
+class JsonUtils:
+    # A Markdown code fence around the whole output, as some local models
+    # (e.g. through Ollama) add even when asked for bare JSON
+    FENCE_PATTERN = re.compile(r"^```(?:json)?\s*(.*?)\s*```$", re.DOTALL)
+
+    @staticmethod
+    def loads_model_output(response):
+        """
+        Parse JSON returned by a model, tolerating a Markdown code fence.
+
+        Args:
+            response (str): Raw model output
+
+        Returns:
+            The parsed JSON value
+
+        Raises:
+            ValueError: If the output is not valid JSON
+        """
+        text = response.strip()
+        fenced = JsonUtils.FENCE_PATTERN.match(text)
+        if fenced:
+            text = fenced.group(1)
+        return json.loads(text)
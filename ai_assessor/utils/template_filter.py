@@ -0,0 +1,108 @@
+import hashlib
+import re
+
+from .document_processor import DocumentProcessor
+from .token_utils import TokenEstimator
+
+
+class TemplateFilter:
+    """
+    Removes assignment-template boilerplate from extracted submissions.
+
+    The template document is read once and every paragraph is reduced to a
+    fingerprint. Lines of a submission whose fingerprint matches a template
+    paragraph are dropped before the submission is sent to the provider.
+    """
+
+    def __init__(
+        self, template_path, min_length=4, render_mode=DocumentProcessor.RENDER_TEXT
+    ):
+        """
+        Initialize the filter from a template document.
+
+        Args:
+            template_path (str): Path to the template Word document
+            min_length (int): Ignore template paragraphs shorter than this
+                (after normalization) so short answers like "Yes" survive
+            render_mode (str): Rendering used for submissions, so template
+                headings and table rows fingerprint the same way
+        """
+        self.template_path = template_path
+        self.min_length = min_length
+        self.render_mode = render_mode
+        self.fingerprints = self._load_fingerprints(template_path)
+
+    @staticmethod
+    def normalize(line):
+        """
+        Normalize a line of text for fingerprinting.
+
+        Args:
+            line (str): Line of text
+
+        Returns:
+            str: Lower-cased text with collapsed whitespace
+        """
+        return re.sub(r"\s+", " ", line).strip().lower()
+
+    @staticmethod
+    def fingerprint(line):
+        """
+        Compute the fingerprint of a normalized line.
+
+        Args:
+            line (str): Normalized line of text
+
+        Returns:
+            str: Hex digest identifying the line
+        """
+        return hashlib.sha1(line.encode("utf-8")).hexdigest()
+
+    def _load_fingerprints(self, template_path):
+        """
+        Read the template and fingerprint its paragraphs.
+
+        Args:
+            template_path (str): Path to the template Word document
+
+        Returns:
+            set: Fingerprints of all template paragraphs
+        """
+        text = DocumentProcessor.read_word_document(template_path, self.render_mode)
+        fingerprints = set()
+        for line in text.splitlines():
+            normalized = self.normalize(line)
+            if len(normalized) >= self.min_length:
+                fingerprints.add(self.fingerprint(normalized))
+        return fingerprints
+
+    def is_boilerplate(self, line):
+        """
+        Check whether a line matches a template paragraph.
+
+        Args:
+            line (str): Line of submission text
+
+        Returns:
+            bool: True if the line is template boilerplate
+        """
+        normalized = self.normalize(line)
+        if len(normalized) < self.min_length:
+            return False
+        return self.fingerprint(normalized) in self.fingerprints
+
+    def strip(self, text):
+        """
+        Remove template boilerplate from submission text.
+
+        Args:
+            text (str): Extracted submission text
+
+        Returns:
+            tuple: (filtered text, estimated tokens saved)
+        """
+        kept = [line for line in text.splitlines() if not self.is_boilerplate(line)]
+        filtered = "\n".join(kept)
+        tokens_before = TokenEstimator.estimate_tokens(text)
+        tokens_after = TokenEstimator.estimate_tokens(filtered)
+        return filtered, max(tokens_before - tokens_after, 0)
@@ -0,0 +1,28 @@
+import math
+
+
+class TokenEstimator:
+    """
+    Cheap, dependency-free token estimates for prompt budgeting.
+
+    The estimate uses the common ~4 characters per token rule of thumb for
+    English text. It is only used for budgeting and reporting, never for
+    anything the provider bills on.
+    """
+
+    CHARS_PER_TOKEN = 4
+
+    @staticmethod
+    def estimate_tokens(text):
+        """
+        Estimate the number of tokens in a piece of text.
+
+        Args:
+            text (str): Text to estimate
+
+        Returns:
+            int: Estimated token count
+        """
+        if not text:
+            return 0
+        return int(math.ceil(len(text) / TokenEstimator.CHARS_PER_TOKEN))
@@ -0,0 +1,180 @@
+"""
+Basic tests for the OpenAI client wrapper.
+"""
+
+import socket
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from ai_assessor.core.api_client import OpenAIClient, ResponseTruncated
+from ai_assessor.core.cancellation import CancellationToken, RequestCancelled
+from ai_assessor.core.key_pool import KeyPool
+
+
+def make_response(content, finish_reason, completion_tokens):
+    """Build a minimal non-streamed chat completion."""
+    message = SimpleNamespace(content=content)
+    return SimpleNamespace(
+        model="test-model",
+        choices=[
+            SimpleNamespace(message=message, finish_reason=finish_reason, logprobs=None)
+        ],
+        usage=SimpleNamespace(
+            prompt_tokens=10,
+            completion_tokens=completion_tokens,
+            total_tokens=10 + completion_tokens,
+        ),
+    )
+
+
+def make_client(responses, max_continuations=2):
+    """Build a client whose API returns the given responses in order."""
+    requests = []
+
+    def create(**params):
+        requests.append([dict(message) for message in params["messages"]])
+        return responses.pop(0)
+
+    client = OpenAIClient("sk-test-key-1234", max_continuations=max_continuations)
+    client.key_pool = KeyPool(["sk-test-key-1234"])
+    client.client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+    client.clients = {"sk-test-key-1234": client.client}
+    return client, requests
+
+
+class TestContinuation:
+    """Test cases for continuing truncated responses."""
+
+    def test_truncated_response_is_continued(self):
+        """Test that a truncated answer is continued and stitched together."""
+        client, requests = make_client(
+            [
+                make_response("The essay argues ", "length", 5),
+                make_response("its point well.", "stop", 4),
+            ]
+        )
+
+        completion = client.generate_completion("system", "user", "gpt-4o")
+
+        assert completion["content"] == "The essay argues its point well."
+        assert completion["finish_reason"] == "stop"
+        assert completion["continuations"] == 1
+        assert completion["continuation_tokens"] == 14
+        assert completion["usage"]["total_tokens"] == 29
+        assert requests[1][-2] == {
+            "role": "assistant",
+            "content": "The essay argues ",
+        }
+        assert requests[1][-1]["content"] == OpenAIClient.CONTINUE_PROMPT
+
+    def test_structured_output_is_not_continued(self):
+        """Test that truncated JSON is returned as is for the caller to handle."""
+        client, requests = make_client([make_response('{"scores"', "length", 5)])
+
+        completion = client.generate_completion(
+            "system", "user", "gpt-4o", response_format={"type": "json_object"}
+        )
+
+        assert completion["finish_reason"] == "length"
+        assert completion["continuations"] == 0
+        assert len(requests) == 1
+
+    def test_still_truncated_raises(self):
+        """Test that an answer still cut off after every continuation fails."""
+        client, requests = make_client(
+            [make_response("more ", "length", 5) for _ in range(3)]
+        )
+
+        with pytest.raises(Exception, match="still truncated"):
+            client.generate_completion("system", "user", "gpt-4o")
+        assert len(requests) == 3
+
+    def test_truncated_sample_raises(self):
+        """Test that a cut-off sample among several is not returned as a grade."""
+        response = make_response("complete", "stop", 5)
+        response.choices.append(
+            SimpleNamespace(
+                message=SimpleNamespace(content="cut o"),
+                finish_reason="length",
+                logprobs=None,
+            )
+        )
+        client, requests = make_client([response])
+
+        with pytest.raises(ResponseTruncated, match="1 of 2") as raised:
+            client.generate_completion("system", "user", "gpt-4o", n=2)
+        assert raised.value.completion["choices"] == ["complete", "cut o"]
+        assert len(requests) == 1
+
+    def test_truncated_without_continuations_raises(self):
+        """Test that truncated prose fails when continuations are disabled."""
+        client, requests = make_client(
+            [make_response("cut o", "length", 5)], max_continuations=0
+        )
+
+        with pytest.raises(ResponseTruncated, match="truncated at"):
+            client.generate_completion("system", "user", "gpt-4o")
+        assert len(requests) == 1
+
+
+class TestCancellation:
+    """Test cases for cancelling requests in flight."""
+
+    def test_cancel_stops_the_request_thread(self):
+        """Test that cancelling closes the connection and ends the request."""
+        server = socket.socket()
+        server.bind(("127.0.0.1", 0))
+        server.listen()
+        connections = []
+
+        def accept():
+            # Accept the request but never answer it
+            connection, _ = server.accept()
+            connections.append(connection)
+
+        threading.Thread(target=accept, daemon=True).start()
+        client = OpenAIClient(
+            "sk-test-key-1234", f"http://127.0.0.1:{server.getsockname()[1]}"
+        )
+        token = CancellationToken()
+        threading.Timer(0.3, token.cancel, args=("stop",)).start()
+
+        try:
+            with pytest.raises(RequestCancelled):
+                client.generate_completion(
+                    "system", "user", "gpt-4o", cancel_token=token
+                )
+
+            deadline = time.monotonic() + 5
+            while time.monotonic() < deadline and any(
+                thread.name == "cancellable-request" for thread in threading.enumerate()
+            ):
+                time.sleep(0.05)
+            assert not any(
+                thread.name == "cancellable-request" for thread in threading.enumerate()
+            )
+        finally:
+            for connection in connections:
+                connection.close()
+            server.close()
+
+    def test_thread_client_is_reused_until_aborted(self):
+        """Test that each thread keeps its client between requests."""
+        client = OpenAIClient("sk-test-key-1234", "http://127.0.0.1:1")
+        http_client, abort = client._thread_http_client()
+        other = []
+        thread = threading.Thread(
+            target=lambda: other.append(client._thread_http_client()[0])
+        )
+        thread.start()
+        thread.join()
+
+        assert client._thread_http_client()[0] is http_client
+        assert other[0] is not http_client
+        abort()
+        assert client._thread_http_client()[0] is not http_client
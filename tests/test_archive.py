@@ -0,0 +1,72 @@
+"""
+Basic tests for the request/response archive.
+"""
+
+import os
+import tempfile
+
+from ai_assessor.core.archive import ArchivingClient, RequestArchive, archive_scope
+
+
+class EchoClient:
+    """Client that answers with the user content."""
+
+    def generate_completion(self, system_content, user_content, model, **kwargs):
+        return {
+            "content": f"Feedback on {user_content}",
+            "usage": {"total_tokens": 5},
+            "finish_reason": "stop",
+        }
+
+
+class TestRequestArchive:
+    """Test cases for RequestArchive and ArchivingClient."""
+
+    def test_records_are_indexed_and_deduplicated(self):
+        """Test that system content is stored once and records read back."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            archive = RequestArchive(temp_dir, segment_bytes=1)
+            client = ArchivingClient(EchoClient(), archive)
+            system = "Grade strictly. " * 50
+
+            with archive_scope(run_id=7):
+                for name in ("a", "b", "c"):
+                    path = os.path.join(temp_dir, f"{name}.docx")
+                    with archive_scope([path]):
+                        client.generate_completion(
+                            system, f"essay {name}", "gpt-4o", cancel_token=object()
+                        )
+            client.generate_completion(system, "unscoped", "gpt-4o")
+
+            entries = archive.find(submission="b.docx", run_id=7)
+            record = archive.read(entries[0])
+            run_entries = archive.find(run_id=7)
+            systems = os.listdir(os.path.join(temp_dir, "system"))
+            segments = os.listdir(os.path.join(temp_dir, "segments"))
+            archive.close()
+
+        assert len(entries) == 1
+        assert record["system_content"] == system
+        assert record["user_content"] == "essay b"
+        assert record["response"]["content"] == "Feedback on essay b"
+        assert record["submissions"] == ["b.docx"]
+        assert "cancel_token" not in record["settings"]
+        assert [e["submission"] for e in run_entries] == ["c.docx", "b.docx", "a.docx"]
+        assert len(systems) == 1
+        assert len(segments) == 4
+
+    def test_reopen_starts_new_segment(self):
+        """Test that an existing segment is never appended to after reopening."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            first = RequestArchive(temp_dir)
+            first.record("system", {"model": "m", "user_content": "one"}, ["a.docx"])
+            first.close()
+
+            second = RequestArchive(temp_dir)
+            second.record("system", {"model": "m", "user_content": "two"}, ["a.docx"])
+            entries = second.find(submission="a.docx")
+            texts = [second.read(entry)["user_content"] for entry in entries]
+            second.close()
+
+        assert [entry["segment"] for entry in entries] == ["000002.seg", "000001.seg"]
+        assert texts == ["two", "one"]
@@ -0,0 +1,60 @@
+"""
+Basic tests for cancellation tokens and cancellable requests.
+"""
+
+import threading
+import time
+
+from ai_assessor.core.api_client import OpenAIClient
+from ai_assessor.core.cancellation import CancellationToken, RequestCancelled
+
+
+class TestCancellationToken:
+    """Test cases for CancellationToken."""
+
+    def test_cancel_runs_callbacks_once(self):
+        """Test that cancelling sets the reason and runs callbacks once."""
+        token = CancellationToken()
+        calls = []
+        token.add_callback(lambda: calls.append(1))
+
+        token.cancel("stop")
+        token.cancel("again")
+
+        assert token.cancelled and token.reason == "stop"
+        assert calls == [1]
+
+    def test_child_and_timeout(self):
+        """Test that children follow their parent and timeouts expire."""
+        parent = CancellationToken()
+        child = parent.child()
+        detached = parent.child()
+        detached.detach()
+
+        parent.cancel("batch stopped")
+        assert child.cancelled and child.reason == "batch stopped"
+        assert not detached.cancelled
+
+        timed = CancellationToken(timeout=0.05)
+        assert timed.wait(2)
+        assert "Timed out" in timed.reason
+
+
+class TestCancellableRequest:
+    """Test cases for aborting requests in flight."""
+
+    def test_caller_released_on_cancel(self):
+        """Test that a hung request returns as soon as it is cancelled."""
+        release = threading.Event()
+        token = CancellationToken()
+        threading.Timer(0.05, token.cancel).start()
+
+        start = time.monotonic()
+        try:
+            OpenAIClient._run_cancellable(lambda: release.wait(5), token)
+            assert False, "expected RequestCancelled"
+        except RequestCancelled:
+            pass
+        finally:
+            release.set()
+        assert time.monotonic() - start < 1
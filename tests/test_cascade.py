@@ -0,0 +1,40 @@
+"""
+Basic tests for the model cascade policy.
+"""
+
+import math
+
+from ai_assessor.core.cascade import CascadePolicy
+
+
+class TestCascadePolicy:
+    """Test cases for CascadePolicy."""
+
+    def _policy(self):
+        """Build a policy with a 50% pass boundary."""
+        return CascadePolicy(
+            enabled=True,
+            first_pass_model="gpt-4o-mini",
+            confidence_threshold=0.7,
+            boundaries=[50],
+            boundary_margin=3,
+        )
+
+    def test_confident_clear_result_is_kept(self):
+        """Test that confident results away from boundaries are not escalated."""
+        scores = {"total": 80, "max_total": 100}
+        escalate, _ = self._policy().should_escalate(scores, 0.9)
+        assert escalate is False
+
+    def test_borderline_or_unsure_result_is_escalated(self):
+        """Test escalation for borderline totals and low confidence."""
+        policy = self._policy()
+        assert policy.should_escalate({"total": 52, "max_total": 100}, 0.9)[0]
+        assert policy.should_escalate({"total": 80, "max_total": 100}, 0.5)[0]
+        assert policy.should_escalate(None, None)[0]
+
+    def test_confidence_from_logprobs(self):
+        """Test the geometric mean token probability."""
+        confidence = CascadePolicy.confidence_from_logprobs([math.log(0.5)] * 4)
+        assert abs(confidence - 0.5) < 1e-9
+        assert CascadePolicy.confidence_from_logprobs(None) is None
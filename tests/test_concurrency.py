@@ -0,0 +1,70 @@
+"""
+Basic tests for adaptive concurrency.
+"""
+
+import threading
+
+import pytest
+
+from ai_assessor.core.cancellation import CancellationToken, RequestCancelled
+from ai_assessor.core.concurrency import AdaptiveConcurrency, AIMDLimiter
+
+
+class TestAIMDLimiter:
+    """Test cases for AIMDLimiter."""
+
+    def test_additive_increase(self):
+        """Test that healthy responses raise the limit gradually."""
+        limiter = AIMDLimiter(initial=2, maximum=4)
+        for _ in range(20):
+            limiter.release(limiter.acquire(), "success")
+
+        assert limiter.current == 4
+        assert limiter.in_flight == 0
+
+    def test_multiplicative_decrease_once_per_round(self):
+        """Test that overload halves the limit once for concurrent failures."""
+        limiter = AIMDLimiter(initial=8)
+        first = limiter.acquire()
+        second = limiter.acquire()
+
+        limiter.release(first, "overload")
+        limiter.release(second, "overload")
+        assert limiter.current == 4
+
+        limiter.release(limiter.acquire(), "overload")
+        assert limiter.current == 2
+
+    def test_errors_and_cancellations_are_neutral(self):
+        """Test that other errors and cancellations leave the limit alone."""
+        limiter = AIMDLimiter(initial=3)
+        limiter.release(limiter.acquire(), "error")
+        limiter.release(limiter.acquire(), None)
+        assert limiter.current == 3
+
+    def test_cancel_while_waiting_for_a_slot(self):
+        """Test that a full limiter is left as soon as the token is cancelled."""
+        limiter = AIMDLimiter(initial=1)
+        started = limiter.acquire()
+        token = CancellationToken()
+        threading.Timer(0.1, token.cancel, args=("stop",)).start()
+
+        with pytest.raises(RequestCancelled):
+            limiter.acquire(token)
+        assert limiter.try_acquire() is None
+
+        limiter.release(started, None)
+        assert limiter.has_room() and limiter.try_acquire() is not None
+
+
+class TestAdaptiveConcurrency:
+    """Test cases for AdaptiveConcurrency."""
+
+    def test_limiter_per_model(self):
+        """Test that each model gets its own limiter."""
+        controller = AdaptiveConcurrency(initial=3)
+        limiter = controller.limiter("a")
+
+        assert controller.limiter("a") is limiter
+        assert controller.limiter("b") is not limiter
+        assert controller.snapshot() == {"a": 3, "b": 3}
@@ -53,3 +53,19 @@ class TestConfigManager:
             assert config.get_value("API", "Key", "") == "new_key"
         finally:
             os.unlink(config_file)
+
+    def test_typed_getters(self):
+        """Test boolean and numeric configuration getters."""
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".ini", delete=False) as f:
+            f.write("[Batch]\nPackSubmissions = yes\nPackTokenBudget = abc\n")
+            config_file = f.name
+
+        try:
+            config = ConfigManager(config_file)
+
+            assert config.get_bool("Batch", "PackSubmissions") is True
+            assert config.get_bool("Batch", "Missing", True) is True
+            assert config.get_int("Batch", "PackTokenBudget", 6000) == 6000
+            assert config.get_float("Batch", "Missing", 0.5) == 0.5
+        finally:
+            os.unlink(config_file)
@@ -6,6 +6,7 @@ import os
 import tempfile
 
 import pytest
+from docx import Document
 
 from ai_assessor.utils.document_processor import DocumentProcessor
 
@@ -50,3 +51,49 @@ class TestDocumentProcessor:
         finally:
             if os.path.exists(output_path):
                 os.unlink(output_path)
+
+    def test_render_markdown(self):
+        """Test compact Markdown rendering of headings, lists and tables."""
+        doc = Document()
+        doc.add_heading("Method", level=2)
+        doc.add_paragraph("First   step", style="List Bullet")
+        doc.add_paragraph("")
+        doc.add_paragraph("")
+        doc.add_paragraph("Body text")
+        table = doc.add_table(rows=3, cols=3)
+        table.cell(0, 0).text = "Criterion"
+        table.cell(0, 1).text = "Mark"
+        table.cell(1, 0).text = "Analysis"
+        table.cell(1, 1).text = "8"
+
+        markdown = DocumentProcessor.render_markdown(doc)
+
+        assert markdown == (
+            "## Method\n"
+            "\n"
+            "- First step\n"
+            "Body text\n"
+            "\n"
+            "| Criterion | Mark |\n"
+            "|---|---|\n"
+            "| Analysis | 8 |"
+        )
+
+    def test_render_markdown_without_iter_inner_content(self):
+        """Test that python-docx versions before 1.1 render the same blocks."""
+        doc = Document()
+        doc.add_heading("Method", level=2)
+        doc.add_paragraph("Body text")
+        table = doc.add_table(rows=1, cols=2)
+        table.cell(0, 0).text = "Criterion"
+        table.cell(0, 1).text = "Mark"
+
+        class OldDocument:
+            """Document API without iter_inner_content."""
+
+            element = doc.element
+            _body = doc._body
+
+        assert DocumentProcessor.render_markdown(
+            OldDocument()
+        ) == DocumentProcessor.render_markdown(doc)
@@ -0,0 +1,139 @@
+"""
+Basic tests for the endpoint pool.
+"""
+
+import threading
+import time
+
+import httpx
+import pytest
+
+from ai_assessor.core.concurrency import AdaptiveConcurrency
+from ai_assessor.core.endpoints import Endpoint, EndpointPool
+
+
+class FakeClient:
+    """Completion client that fails on demand."""
+
+    def __init__(self, fail=False, decode_seconds=0):
+        self.fail = fail
+        self.decode_seconds = decode_seconds
+        self.calls = 0
+
+    def generate_completion(self, *args, on_first_token=None, **kwargs):
+        self.calls += 1
+        if isinstance(self.fail, Exception):
+            raise self.fail
+        if self.fail:
+            raise Exception("API call failed") from httpx.ConnectError(
+                "connection refused"
+            )
+        if on_first_token is not None:
+            on_first_token()
+        time.sleep(self.decode_seconds)
+        return {"content": "ok"}
+
+
+def _endpoint(name, fail=False, **kwargs):
+    """Create an endpoint backed by a fake client."""
+    endpoint = Endpoint(name, f"http://{name}", "key", **kwargs)
+    endpoint.client = FakeClient(fail)
+    return endpoint
+
+
+class TestEndpointPool:
+    """Test cases for EndpointPool."""
+
+    def test_least_loaded_endpoint(self):
+        """Test that slots go to the least-loaded endpoint by weight."""
+        pool = EndpointPool(
+            [_endpoint("a", max_concurrency=2), _endpoint("b", weight=2)]
+        )
+        first = pool.acquire()
+        second = pool.acquire()
+        third = pool.acquire()
+
+        assert {first.name, second.name} == {"a", "b"}
+        assert third.name == "b"
+        assert pool.capacity == 6
+
+    def test_adaptive_limit_steers_selection(self):
+        """Test that an endpoint whose model limit is reached is skipped."""
+        pool = EndpointPool([_endpoint("a"), _endpoint("b", weight=4)])
+        for endpoint in pool.endpoints:
+            endpoint.concurrency = AdaptiveConcurrency(initial=1, maximum=4)
+
+        first = pool.acquire(model="m")
+        second = pool.acquire(model="m")
+        other_model = pool.acquire(model="n")
+
+        assert {first.name, second.name} == {"a", "b"}
+        assert other_model.name == "b"
+        pool.release(first, True, 0.1, "m")
+        assert first.limiter("m").in_flight == 0
+        assert pool.acquire(model="m") is first
+
+    def test_stuck_endpoint_is_avoided(self):
+        """Test that new requests avoid an endpoint with a stuck request."""
+        pool = EndpointPool([_endpoint("a"), _endpoint("b")], slow_seconds=0.1)
+        release = threading.Event()
+        stuck, other = pool.endpoints
+        stuck.client.generate_completion = lambda *args, **kwargs: release.wait()
+        other.in_flight = 3  # make "a" the first choice while it is healthy
+
+        thread = threading.Thread(
+            target=pool.generate_completion, args=("system", "user", "model")
+        )
+        thread.start()
+        try:
+            while not stuck.running:
+                threading.Event().wait(0.01)
+            assert not stuck.is_stuck(pool.slow_seconds)
+            threading.Event().wait(0.2)
+            assert stuck.is_stuck(pool.slow_seconds)
+            assert pool.acquire().name == "b"
+        finally:
+            release.set()
+            thread.join()
+        assert not stuck.running
+
+    def test_failover(self):
+        """Test that a failed request is retried elsewhere and cooled down."""
+        pool = EndpointPool([_endpoint("bad", fail=True), _endpoint("good")])
+        pool.endpoints[1].in_flight = 1  # make "bad" the first choice
+
+        result = pool.generate_completion("system", "user", "model")
+        bad, good = pool.endpoints
+
+        assert result == {"content": "ok", "endpoint": "good"}
+        assert bad.failures == 1 and not bad.is_healthy()
+        assert pool.acquire().name == "good"
+
+    def test_request_errors_are_not_failed_over(self):
+        """Test that an error about the request is raised without failover."""
+        pool = EndpointPool([_endpoint("a"), _endpoint("b")])
+        first, second = pool.endpoints
+        first.client.fail = Exception("API call failed: context length exceeded")
+        second.in_flight = 1  # make "a" the first choice
+
+        with pytest.raises(Exception, match="context length"):
+            pool.generate_completion("system", "user", "model")
+
+        assert first.is_healthy() and first.failures == 0
+        assert second.client.calls == 0
+        assert first.in_flight == 0
+
+    def test_long_answers_are_not_slow(self):
+        """Test that decode time after the first token is not held against it."""
+        pool = EndpointPool([_endpoint("a")], slow_seconds=0.05)
+        pool.endpoints[0].client.decode_seconds = 0.1
+
+        assert pool.generate_assessment("system", "user", "model") == "ok"
+        assert pool.endpoints[0].is_healthy()
+        assert pool.endpoints[0].latency < 0.05
+
+    def test_all_endpoints_fail(self):
+        """Test that an error is raised once every endpoint failed."""
+        pool = EndpointPool([_endpoint("a", fail=True), _endpoint("b", fail=True)])
+        with pytest.raises(Exception, match="All endpoints failed"):
+            pool.generate_completion("system", "user", "model")
@@ -0,0 +1,45 @@
+"""
+Basic tests for ensemble score aggregation.
+"""
+
+from ai_assessor.core.ensemble import EnsembleAggregator
+
+
+def _scores(analysis, presentation):
+    """Build validated scores for a two-criterion rubric."""
+    return {
+        "criteria": [
+            {"criterion": "Analysis", "score": analysis, "max_marks": 60},
+            {"criterion": "Presentation", "score": presentation, "max_marks": 40},
+        ],
+        "total": analysis + presentation,
+        "max_total": 100,
+    }
+
+
+class TestEnsembleAggregator:
+    """Test cases for EnsembleAggregator."""
+
+    def test_aggregate_flags_disagreement(self):
+        """Test per-criterion statistics and disagreement flags."""
+        aggregator = EnsembleAggregator(disagreement_threshold=10)
+        aggregate = aggregator.aggregate(
+            {"a": _scores(40, 30), "b": _scores(50, 31), "c": None}
+        )
+
+        analysis, presentation = aggregate["criteria"]
+        assert analysis["mean"] == 45
+        assert analysis["disagreement"] is True
+        assert presentation["disagreement"] is False
+        assert aggregate["total"]["median"] == 75.5
+        assert aggregate["disagreement"] is True
+        assert "DISAGREEMENT" in EnsembleAggregator.format_report(aggregate)
+
+    def test_aggregate_without_scores(self):
+        """Test that members without scores produce no aggregate."""
+        assert EnsembleAggregator().aggregate({"a": None}) is None
+
+    def test_member_label(self):
+        """Test filename-safe member labels."""
+        assert EnsembleAggregator.member_label("llama3.1:8b", 1, 2) == "llama3.1_8b_2"
+        assert EnsembleAggregator.member_label("gpt-4o") == "gpt-4o"
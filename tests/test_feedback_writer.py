@@ -0,0 +1,89 @@
+"""
+Basic tests for the write-behind feedback writer.
+"""
+
+import os
+import tempfile
+
+from docx import Document
+
+from ai_assessor.core.feedback_writer import FeedbackWriter
+
+
+class TestFeedbackWriter:
+    """Test cases for FeedbackWriter."""
+
+    def test_background_writes_are_atomic(self):
+        """Test that queued files are complete after flush, with no temp files."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output = os.path.join(temp_dir, "out")
+            writer = FeedbackWriter(sync_every=3)
+            for i in range(10):
+                writer.write(os.path.join(output, f"s{i}_feedback.txt"), f"Mark {i}")
+            errors = writer.flush()
+
+            names = sorted(os.listdir(output))
+            with open(os.path.join(output, "s7_feedback.txt"), encoding="utf-8") as f:
+                content = f.read()
+            writer.close()
+
+        assert errors == []
+        assert writer.written == 10
+        assert names == sorted(f"s{i}_feedback.txt" for i in range(10))
+        assert content == "Mark 7"
+
+    def test_failures_are_reported_on_flush(self):
+        """Test that a file that cannot be written is reported, not raised."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            blocker = os.path.join(temp_dir, "blocker")
+            with open(blocker, "w") as f:
+                f.write("not a folder")
+            writer = FeedbackWriter(background=False)
+            lost = writer.write(os.path.join(blocker, "a_feedback.txt"), "Lost")
+            kept = writer.write(os.path.join(temp_dir, "b_feedback.txt"), "Kept")
+
+            errors = writer.flush()
+
+            assert isinstance(lost.exception(), OSError)
+            assert kept.result() == os.path.join(temp_dir, "b_feedback.txt")
+
+            assert [path for path, _ in errors] == [
+                os.path.join(blocker, "a_feedback.txt")
+            ]
+            assert sorted(os.listdir(temp_dir)) == ["b_feedback.txt", "blocker"]
+
+    def test_future_completes_after_file_is_in_place(self):
+        """Test that a background write's future resolves once the file exists."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "a_feedback.txt")
+            writer = FeedbackWriter()
+            seen = []
+            written = writer.write(path, "Done")
+            written.add_done_callback(lambda future: seen.append(os.path.exists(path)))
+
+            assert written.result(timeout=5) == path
+            writer.flush()
+            writer.close()
+
+        assert seen == [True]
+
+    def test_docx_from_template(self):
+        """Test that Word feedback starts from the template."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            template = os.path.join(temp_dir, "template.docx")
+            doc = Document()
+            doc.add_paragraph("Course feedback")
+            doc.save(template)
+
+            writer = FeedbackWriter(docx_template=template)
+            path = os.path.join(temp_dir, "a_feedback.docx")
+            writer.write_docx(path, "## Strengths\nClear argument.")
+            writer.flush()
+            writer.close()
+
+            result = Document(path)
+            texts = [para.text for para in result.paragraphs]
+            styles = [para.style.name for para in result.paragraphs]
+
+        assert texts == ["Course feedback", "Strengths", "Clear argument."]
+        assert styles[1] == "Heading 2"
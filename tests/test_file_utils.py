@@ -41,3 +41,38 @@ class TestFileUtils:
         # Should raise FileNotFoundError for non-existent directory
         with pytest.raises(FileNotFoundError):
             FileUtils.get_docx_files("/nonexistent/directory")
+
+    def test_latest_attempts_by_attempt_and_mtime(self):
+        """Test that only each student's latest attempt is kept."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            names = [
+                "jsmith_attempt1.docx",
+                "jsmith_attempt_2024-05-03.docx",
+                "adoe.docx",
+                "adoe_v2.docx",
+                "bkhan.docx",
+            ]
+            for age, name in enumerate(reversed(names)):
+                path = os.path.join(temp_dir, name)
+                with open(path, "w") as f:
+                    f.write("")
+                os.utime(path, (1000 - age, 1000 - age))
+
+            kept, superseded = FileUtils.latest_attempts(
+                temp_dir, names, FileUtils.DEFAULT_STUDENT_PATTERN
+            )
+
+            assert kept == [
+                "jsmith_attempt_2024-05-03.docx",
+                "adoe_v2.docx",
+                "bkhan.docx",
+            ]
+            assert superseded == {
+                "jsmith_attempt1.docx": "jsmith_attempt_2024-05-03.docx",
+                "adoe.docx": "adoe_v2.docx",
+            }
+
+    def test_latest_attempts_invalid_pattern(self):
+        """Test that an invalid student pattern is reported."""
+        with pytest.raises(ValueError):
+            FileUtils.latest_attempts(".", ["a.docx"], "(")
@@ -0,0 +1,70 @@
+"""
+Basic tests for request hedging.
+"""
+
+import threading
+import time
+
+from ai_assessor.core.batch_stats import BatchStats
+from ai_assessor.core.cancellation import RequestCancelled
+from ai_assessor.core.hedging import HedgedClient, LatencyTracker
+
+
+class SlowFirstClient:
+    """Client whose first request stalls until it is cancelled."""
+
+    def __init__(self):
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate_completion(self, *args, cancel_token=None, on_first_token=None, **kw):
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+        if call == 1:
+            while not cancel_token.cancelled:
+                time.sleep(0.01)
+            raise RequestCancelled(usage={"total_tokens": 42})
+        on_first_token()
+        return {"content": "fast", "usage": {"total_tokens": 10}}
+
+
+class TestLatencyTracker:
+    """Test cases for LatencyTracker."""
+
+    def test_percentile(self):
+        """Test percentiles once enough samples exist."""
+        tracker = LatencyTracker(min_samples=3)
+        tracker.record("m", 1.0)
+        tracker.record("m", 2.0)
+        assert tracker.percentile("m", 95) is None
+
+        tracker.record("m", 10.0)
+        assert tracker.percentile("m", 50) == 2.0
+        assert tracker.percentile("m", 100) == 10.0
+        assert tracker.percentile("other", 50) is None
+
+
+class TestHedgedClient:
+    """Test cases for HedgedClient."""
+
+    def test_duplicate_wins_and_loser_is_cancelled(self):
+        """Test that a stalled request is hedged and the loser cancelled."""
+        tracker = LatencyTracker(min_samples=1)
+        tracker.record("m", 0.05)
+        stats = BatchStats()
+        client = SlowFirstClient()
+
+        result = HedgedClient(client, tracker, stats=stats).generate_completion(
+            "system", "user", "m"
+        )
+
+        assert result["content"] == "fast"
+        assert client.calls == 2
+        assert stats.get("hedged_requests") == 1
+        assert stats.get("hedge_wins") == 1
+        for _ in range(100):
+            if stats.get("hedge_extra_tokens"):
+                break
+            time.sleep(0.01)
+        assert stats.get("hedge_extra_tokens") == 42
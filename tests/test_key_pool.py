@@ -0,0 +1,39 @@
+"""
+Basic tests for the API key pool.
+"""
+
+from ai_assessor.core.key_pool import KeyPool
+
+
+class TestKeyPool:
+    """Test cases for KeyPool."""
+
+    def test_parse_and_mask(self):
+        """Test splitting a key setting and masking keys."""
+        assert KeyPool.parse(" sk-one, ,sk-two ") == ["sk-one", "sk-two"]
+        assert KeyPool.mask("sk-abcdefgh1234") == "...1234"
+        assert KeyPool.mask("short") == "****"
+        assert KeyPool.mask("") == "<none>"
+
+    def test_schedules_by_headroom(self):
+        """Test that requests go to the key with the most token headroom."""
+        pool = KeyPool(["a", "b"], tokens_per_minute=1000)
+
+        first = pool.acquire(600)
+        second = pool.acquire(300)
+        pool.record(second, 300, 100)
+        third = pool.acquire(400)
+
+        assert first != second
+        assert third == second
+        assert pool.headroom(first) == 400
+        assert pool.headroom(second) == 500
+
+    def test_rested_key_is_skipped(self):
+        """Test that a rate-limited key is not used while resting."""
+        pool = KeyPool(["a", "b"], requests_per_minute=5)
+        pool.rest("a", 30)
+
+        assert pool.headroom("a") == 0
+        assert pool.acquire(10) == "b"
+        assert pool.acquire(10, exclude=["a", "b"]) is None
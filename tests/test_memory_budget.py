@@ -0,0 +1,85 @@
+"""
+Basic tests for the in-flight prompt byte budget.
+"""
+
+import threading
+import time
+
+import pytest
+
+from ai_assessor.core.cancellation import CancellationToken, RequestCancelled
+from ai_assessor.core.memory_budget import ByteBudget
+
+
+class TestByteBudget:
+    """Test cases for ByteBudget."""
+
+    def test_waits_for_room_under_the_cap(self):
+        """Test that a reservation waits until earlier ones are released."""
+        budget = ByteBudget(limit=100)
+        entered = threading.Event()
+
+        def second():
+            with budget.reserve(60):
+                entered.set()
+
+        with budget.reserve(60):
+            thread = threading.Thread(target=second)
+            thread.start()
+            time.sleep(0.1)
+            assert not entered.is_set()
+        thread.join(5)
+
+        assert entered.is_set()
+        assert budget.in_use == 0 and budget.peak == 60 and budget.waits == 1
+
+    def test_oversized_request_runs_alone(self):
+        """Test that a prompt larger than the cap still runs when idle."""
+        budget = ByteBudget(limit=10)
+        with budget.reserve(ByteBudget.size("é" * 20)):
+            assert budget.in_use == 40
+
+    def test_cancel_while_waiting(self):
+        """Test that a cancelled token stops the wait for budget."""
+        budget = ByteBudget(limit=10)
+        token = CancellationToken()
+        token.cancel("stop")
+        with budget.reserve(10):
+            with pytest.raises(RequestCancelled):
+                with budget.reserve(5, token):
+                    pass
+
+    def test_reservation_is_resized_to_the_actual_prompt(self):
+        """Test that a placeholder is corrected once the prompt is known."""
+        budget = ByteBudget(limit=100)
+        with budget.reserve(80) as first:
+            first.resize(30)
+            assert budget.in_use == 30
+            with budget.reserve(50) as second:
+                assert budget.in_use == 80
+                second.resize(20)
+            assert budget.in_use == 30
+        assert budget.in_use == 0 and budget.waits == 0
+
+    def test_growing_reservations_do_not_wait_on_each_other(self):
+        """Test that two placeholders growing at once cannot deadlock."""
+        budget = ByteBudget(limit=100)
+        grown = []
+
+        def grow(reservation):
+            reservation.resize(70)
+            grown.append(budget.in_use)
+            time.sleep(0.05)
+            reservation.resize(0)
+
+        with budget.reserve(40) as first, budget.reserve(40) as second:
+            threads = [
+                threading.Thread(target=grow, args=(reservation,))
+                for reservation in (first, second)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(5)
+
+        assert sorted(grown) == [70, 70] and budget.in_use == 0
@@ -0,0 +1,33 @@
+"""
+Basic tests for the adaptive output token reservation.
+"""
+
+from ai_assessor.core.output_budget import OutputBudget
+
+
+class TestOutputBudget:
+    """Test cases for OutputBudget."""
+
+    def test_reservation_from_observed_lengths(self):
+        """Test that the reservation follows a percentile plus margin."""
+        budget = OutputBudget(percentile=100, margin=0.25, min_samples=3)
+        key = OutputBudget.key("system prompt", "gpt-4o")
+
+        budget.record(key, 1000)
+        budget.record(key, 1200)
+        assert budget.reservation(key, 3500) == 3500
+
+        budget.record(key, 800)
+        assert budget.reservation(key, 3500) == 1500
+
+    def test_reservation_bounds(self):
+        """Test that the reservation stays between the minimum and maximum."""
+        budget = OutputBudget(min_samples=1, minimum=256)
+        short = OutputBudget.key("a", "m")
+        long = OutputBudget.key("b", "m")
+        budget.record(short, 10)
+        budget.record(long, 5000)
+
+        assert budget.reservation(short, 3500) == 256
+        assert budget.reservation(long, 3500) == 3500
+        assert OutputBudget.key("a", "m") != OutputBudget.key("a", "other")
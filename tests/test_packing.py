@@ -0,0 +1,65 @@
+"""
+Basic tests for packing several submissions into one request.
+"""
+
+from ai_assessor.core.packing import SubmissionPacker
+
+
+class TestSubmissionPacker:
+    """Test cases for SubmissionPacker."""
+
+    def test_pack_respects_budget_and_size(self):
+        """Test that packs stay under the token budget and item limit."""
+        packer = SubmissionPacker(token_budget=100, max_per_pack=2)
+        items = {"a": "x" * 200, "b": "x" * 160, "c": "x" * 120, "d": "x" * 800}
+
+        packs = [list(pack) for pack in packer.pack_stream(items.items())]
+
+        assert ["d"] in packs
+        for pack in packs:
+            assert len(pack) <= 2
+            if len(pack) > 1:
+                assert sum(len(items[k]) for k in pack) // 4 <= 100
+
+    def test_pack_stream_holds_one_pack_at_a_time(self):
+        """Test that streamed packs are built without reading ahead."""
+        packer = SubmissionPacker(token_budget=100, max_per_pack=2)
+        read = []
+
+        def items():
+            for key, text in [
+                ("a", "x" * 200),
+                ("b", "x" * 160),
+                ("c", "x" * 120),
+                ("d", "x" * 800),
+                ("e", "x" * 40),
+            ]:
+                read.append(key)
+                yield key, text
+
+        stream = packer.pack_stream(items())
+        first = next(stream)
+
+        assert first == {"a": "x" * 200, "b": "x" * 160}
+        assert read == ["a", "b", "c"]
+        assert [list(pack) for pack in stream] == [["c"], ["d"], ["e"]]
+
+    def test_parse_response_validates_entries(self):
+        """Test that only valid, expected, unique entries are returned."""
+        response = (
+            "```json\n"
+            '[{"id": "S1", "feedback": "Good work"},'
+            ' {"id": "S2", "feedback": ""},'
+            ' {"id": "S9", "feedback": "Unknown"},'
+            ' {"id": "S3", "feedback": "One"},'
+            ' {"id": "S3", "feedback": "Two"}]\n'
+            "```"
+        )
+
+        feedback = SubmissionPacker.parse_response(response, ["S1", "S2", "S3"])
+
+        assert feedback == {"S1": "Good work"}
+
+    def test_parse_response_invalid_json(self):
+        """Test that malformed output yields no feedback."""
+        assert SubmissionPacker.parse_response("not json", ["S1"]) == {}
@@ -0,0 +1,70 @@
+"""
+Basic tests for the streaming results log and gradebook export.
+"""
+
+import csv
+import json
+import os
+import tempfile
+
+from ai_assessor.core.results_sink import ResultsSink
+
+SCORES = {
+    "criteria": [
+        {"criterion": "Analysis", "score": 7, "max_marks": 10, "feedback": ""},
+        {"criterion": "Style", "score": 4, "max_marks": 5, "feedback": ""},
+    ],
+    "total": 11,
+    "max_total": 15,
+}
+
+
+class TestResultsSink:
+    """Test cases for ResultsSink."""
+
+    def test_records_are_written_as_they_complete(self):
+        """Test that each result is readable as soon as it is written."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "results.jsonl")
+            sink = ResultsSink(path, sync_every=100, run_id="run1")
+            sink.write(
+                "a.docx",
+                {
+                    "success": True,
+                    "model": "gpt-4o",
+                    "usage": {"total_tokens": 120},
+                    "feedback_path": "out/a_feedback.txt",
+                    "scores": SCORES,
+                },
+                latency=1.23456,
+            )
+
+            with open(path, encoding="utf-8") as f:
+                record = json.loads(f.readline())
+            sink.close()
+
+        assert record["run"] == "run1" and record["status"] == "success"
+        assert record["latency"] == 1.235
+        assert record["usage"] == {"total_tokens": 120}
+        assert record["scores"]["criteria"] == {"Analysis": 7, "Style": 4}
+
+    def test_gradebook_keeps_latest_good_result(self):
+        """Test that the gradebook has one row per submission."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "results.jsonl")
+            csv_path = os.path.join(temp_dir, "gradebook.csv")
+            with ResultsSink(path) as sink:
+                sink.write("a.docx", {"success": True, "scores": SCORES})
+                sink.write("a.docx", {"success": False, "feedback": "boom\ntrace"})
+                sink.write("b.docx", {"success": False, "needs_review": True})
+            with open(path, "a", encoding="utf-8") as f:
+                f.write('{"id": "c.docx", "sta')
+
+            count = ResultsSink.export_gradebook(path, csv_path)
+            with open(csv_path, encoding="utf-8", newline="") as f:
+                rows = list(csv.reader(f))
+
+        assert count == 2
+        assert rows[0] == list(ResultsSink.FIELDS) + ["Analysis", "Style"]
+        assert rows[1] == ["a.docx", "success", "", "11", "15", "7", "4"]
+        assert rows[2][:2] == ["b.docx", "needs_review"]
@@ -0,0 +1,110 @@
+"""
+Basic tests for the SQLite results store.
+"""
+
+import os
+import tempfile
+
+from ai_assessor.core.results_store import ResultsStore
+
+
+def graded(feedback, total=None):
+    """Build a successful grading result."""
+    scores = None
+    if total is not None:
+        scores = {
+            "criteria": [{"criterion": "Analysis", "score": total}],
+            "total": total,
+            "max_total": 10,
+        }
+    return {
+        "success": True,
+        "feedback": feedback,
+        "model": "gpt-4o",
+        "usage": {"prompt_tokens": 100, "completion_tokens": 20, "total_tokens": 120},
+        "scores": scores,
+    }
+
+
+class TestResultsStore:
+    """Test cases for ResultsStore."""
+
+    def test_latest_result_per_submission(self):
+        """Test that regrades are kept and the newest one is returned."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = ResultsStore(os.path.join(temp_dir, "results.db"))
+            first = store.start_run("gpt-4o", ResultsStore.hash_text("s", "u"))
+            store.record(first, "a.docx", graded("Old", 5), student="a")
+            store.record(first, "b.docx", {"success": False, "feedback": "boom"})
+            second = store.start_run("gpt-4o")
+            store.record(second, "a.docx", graded("New", 8), latency=2.5, student="a")
+
+            latest = store.latest_results()
+            only_first = store.latest_results(run_id=first)
+            by_student = store.latest_results(student="a")
+            runs = store.runs()
+            mode = store._connection.execute("PRAGMA journal_mode").fetchone()[0]
+            store.close()
+
+        assert [r["submission"] for r in latest] == ["a.docx", "b.docx"]
+        assert latest[0]["feedback"] == "New" and latest[0]["total"] == 8
+        assert latest[0]["scores"]["criteria"] == {"Analysis": 8}
+        assert latest[1]["status"] == "failed"
+        assert only_first[0]["feedback"] == "Old"
+        assert len(by_student) == 1 and by_student[0]["latency"] == 2.5
+        assert [run["results"] for run in runs] == [1, 2]
+        assert mode == "wal"
+
+    def test_latest_filters_by_folder(self):
+        """Test that the same filename in another cohort is kept apart."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = ResultsStore(os.path.join(temp_dir, "results.db"))
+            run = store.start_run()
+            store.record(run, "a.docx", graded("Cohort 1"), folder="/c1")
+            store.record(run, "a.docx", graded("Cohort 2"), folder="/c2")
+
+            assert store.latest("a.docx", folder="/c1")["feedback"] == "Cohort 1"
+            assert store.latest("a.docx")["feedback"] == "Cohort 2"
+            assert store.latest("missing.docx") is None
+
+            store.record(run, "a.docx", graded("Cohort 1 regrade"), folder="/c1")
+            latest = store.latest_results()
+            assert [(r["folder"], r["feedback"]) for r in latest] == [
+                ("/c1", "Cohort 1 regrade"),
+                ("/c2", "Cohort 2"),
+            ]
+            plan = " ".join(
+                row[-1]
+                for row in store._connection.execute(
+                    "EXPLAIN QUERY PLAN SELECT * FROM results "
+                    "WHERE submission = ? AND folder = ? ORDER BY id DESC LIMIT 1",
+                    ("a.docx", "/c1"),
+                )
+            )
+            assert "idx_results_submission_folder" in plan
+            store.close()
+
+    def test_search_feedback(self):
+        """Test ranked full-text search with snippets and superseded results."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = ResultsStore(os.path.join(temp_dir, "results.db"))
+            run = store.start_run()
+            store.record(run, "a.docx", graded("The Falling Number test is wrong."))
+            store.record(run, "b.docx", graded("Good falling results overall."))
+            store.record(run, "c.docx", graded("Possible plagiarism noted."))
+            store.record(run, "c.docx", graded("Sources now cited properly."))
+
+            phrase = store.search('"Falling Number test"')
+            words = store.search("falling")
+            superseded = store.search("plagiarism")
+            history = store.search("plagiarism", latest_only=False)
+            malformed = store.search('number "test')
+            store.close()
+
+        assert store.fts
+        assert [hit["submission"] for hit in phrase] == ["a.docx"]
+        assert "[Falling Number test]" in phrase[0]["snippet"]
+        assert sorted(hit["submission"] for hit in words) == ["a.docx", "b.docx"]
+        assert superseded == []
+        assert [hit["submission"] for hit in history] == ["c.docx"]
+        assert [hit["submission"] for hit in malformed] == ["a.docx"]
@@ -0,0 +1,50 @@
+"""
+Basic tests for context-length-aware model routing.
+"""
+
+import os
+import tempfile
+
+from ai_assessor.config import ConfigManager
+from ai_assessor.core.router import ModelRouter
+
+
+class TestModelRouter:
+    """Test cases for ModelRouter."""
+
+    def _router(self):
+        """Build a router from a config file with four routes."""
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".ini", delete=False) as f:
+            f.write(
+                "[Routing]\n"
+                "small-fast = 8192, 5, 0\n"
+                "mid = 32000, 3, 1\n"
+                "large-slow = 200000, 1, 3\n"
+                "local = llama3.1:8b, 4096, 9, 0\n"
+                "broken = lots\n"
+            )
+            config_file = f.name
+
+        try:
+            return ModelRouter.from_config(ConfigManager(config_file))
+        finally:
+            os.unlink(config_file)
+
+    def test_picks_fastest_model_that_fits(self):
+        """Test that the fastest fitting model is chosen."""
+        router = self._router()
+
+        assert len(router.routes) == 4
+        assert router.select(300, 3500) == "llama3.1:8b"
+        assert router.select(2000, 3500) == "small-fast"
+        assert router.select(20000, 3500) == "mid"
+        assert router.select(100000, 3500) == "large-slow"
+
+    def test_falls_back_to_largest_context(self):
+        """Test that oversized requests use the largest window."""
+        assert self._router().select(500000, 3500) == "large-slow"
+
+    def test_is_auto(self):
+        """Test recognising the auto model key."""
+        assert ModelRouter.is_auto(" Auto ")
+        assert not ModelRouter.is_auto("gpt-4o")
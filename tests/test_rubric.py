@@ -0,0 +1,126 @@
+"""
+Basic tests for rubric-based structured scoring.
+"""
+
+import json
+import os
+import tempfile
+
+import pytest
+
+from ai_assessor.core.rubric import Rubric
+
+
+class TestRubric:
+    """Test cases for Rubric."""
+
+    def _rubric(self):
+        """Build a two-criterion rubric."""
+        return Rubric(
+            [
+                {"name": "Analysis", "max_marks": 60},
+                {"name": "Presentation", "max_marks": 40},
+            ]
+        )
+
+    def test_load_rubric_file(self):
+        """Test loading a rubric definition file."""
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
+            json.dump({"criteria": [{"name": "Analysis", "max_marks": 10}]}, f)
+            rubric_file = f.name
+
+        try:
+            rubric = Rubric.load(rubric_file)
+            assert rubric.names == ["Analysis"]
+            assert rubric.total_marks == 10
+            schema = rubric.response_format()["json_schema"]["schema"]
+            assert schema["required"] == ["criteria", "total", "overall_feedback"]
+        finally:
+            os.unlink(rubric_file)
+
+    def test_parse_response_recomputes_total(self):
+        """Test that a wrong model total is corrected locally."""
+        response = json.dumps(
+            {
+                "criteria": [
+                    {"criterion": "Analysis", "score": 45, "feedback": "Solid"},
+                    {"criterion": "Presentation", "score": 30, "feedback": "Clear"},
+                ],
+                "total": 80,
+                "overall_feedback": "Well done",
+            }
+        )
+
+        scores = self._rubric().parse_response(response)
+
+        assert scores["total"] == 75
+        assert scores["reported_total"] == 80
+        assert scores["total_mismatch"] is True
+        assert "Total: 75 / 100" in Rubric.format_feedback(scores)
+
+    def test_parse_response_rejects_invalid_scores(self):
+        """Test that out-of-range and missing criteria are rejected."""
+        rubric = self._rubric()
+        too_high = json.dumps(
+            {
+                "criteria": [
+                    {"criterion": "Analysis", "score": 61, "feedback": ""},
+                    {"criterion": "Presentation", "score": 1, "feedback": ""},
+                ],
+                "total": 62,
+                "overall_feedback": "",
+            }
+        )
+        missing = json.dumps(
+            {
+                "criteria": [{"criterion": "Analysis", "score": 1, "feedback": ""}],
+                "total": 1,
+                "overall_feedback": "",
+            }
+        )
+
+        with pytest.raises(ValueError):
+            rubric.parse_response(too_high)
+        with pytest.raises(ValueError):
+            rubric.parse_response(missing)
+
+    def test_parse_fenced_response(self):
+        """Test that JSON wrapped in a Markdown code fence is accepted."""
+        rubric = self._rubric()
+        response = json.dumps(
+            {
+                "criteria": [
+                    {"criterion": "Analysis", "score": 45, "feedback": "Solid"},
+                    {"criterion": "Presentation", "score": 30, "feedback": "Clear"},
+                ],
+                "total": 75,
+                "overall_feedback": "Well done",
+            }
+        )
+
+        scores = rubric.parse_response(f"```json\n{response}\n```")
+        entry = rubric.parse_criterion_response(
+            "Analysis", '```\n{"score": 50, "feedback": "Deep"}\n```'
+        )
+
+        assert scores["total"] == 75
+        assert entry["score"] == 50
+
+    def test_merge_criteria(self):
+        """Test merging single-criterion results with a computed total."""
+        rubric = self._rubric()
+        entries = [
+            rubric.parse_criterion_response(
+                "Presentation", '{"score": 30, "feedback": "Clear"}'
+            ),
+            rubric.parse_criterion_response(
+                "Analysis", '{"score": 50, "feedback": "Deep"}'
+            ),
+        ]
+
+        scores = rubric.merge_criteria(entries)
+
+        assert [c["criterion"] for c in scores["criteria"]] == rubric.names
+        assert scores["total"] == 80
+        with pytest.raises(ValueError):
+            rubric.merge_criteria(entries[:1])
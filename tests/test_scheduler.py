@@ -0,0 +1,65 @@
+"""
+Basic tests for the priority job scheduler.
+"""
+
+import threading
+
+import pytest
+
+from ai_assessor.core.cancellation import CancellationToken, RequestCancelled
+from ai_assessor.core.scheduler import JobScheduler
+
+
+class TestJobScheduler:
+    """Test cases for JobScheduler."""
+
+    def test_interactive_first_then_shortest_job(self):
+        """Test that interactive jobs jump the queue and small jobs go first."""
+        scheduler = JobScheduler(workers=1)
+        gate = threading.Event()
+        order = []
+
+        blocker = scheduler.submit(gate.wait)
+        futures = [
+            scheduler.submit(lambda: order.append("batch-large"), cost=900),
+            scheduler.submit(lambda: order.append("batch-small"), cost=100),
+            scheduler.submit(
+                lambda: order.append("interactive"),
+                priority=JobScheduler.INTERACTIVE,
+                cost=5000,
+            ),
+        ]
+        gate.set()
+        blocker.result(5)
+        for future in futures:
+            future.result(5)
+
+        assert order == ["interactive", "batch-small", "batch-large"]
+
+    def test_cancelled_jobs_are_dropped(self):
+        """Test that queued jobs of a cancelled run never start."""
+        scheduler = JobScheduler(workers=1)
+        gate = threading.Event()
+        token = CancellationToken()
+        ran = []
+
+        blocker = scheduler.submit(gate.wait)
+        future = scheduler.submit(lambda: ran.append(1), cancel_token=token)
+        token.cancel("Grading cancelled by user")
+        gate.set()
+        blocker.result(5)
+
+        with pytest.raises(RequestCancelled):
+            future.result(5)
+        assert ran == []
+
+    def test_job_errors_reach_the_future(self):
+        """Test that a failing job reports its exception."""
+        scheduler = JobScheduler(workers=2)
+
+        def fail():
+            raise ValueError("bad submission")
+
+        with pytest.raises(ValueError):
+            scheduler.submit(fail).result(5)
+        assert scheduler.submit(lambda: 42).result(5) == 42
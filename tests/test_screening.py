@@ -0,0 +1,73 @@
+"""
+Basic tests for local submission screening.
+"""
+
+from ai_assessor.core.screening import SubmissionScreener
+
+ESSAY = (
+    "Photosynthesis converts light energy into chemical energy stored in "
+    "glucose. The light reactions take place in the thylakoid membranes and "
+    "produce oxygen, while the Calvin cycle in the stroma fixes carbon dioxide "
+    "into sugars that the plant uses for growth and respiration."
+)
+
+CODE = """def mean(values):
+    if not values:
+        raise ValueError("empty list")
+    total = 0
+    for value in values:
+        total += value
+    return total / len(values)
+
+print(mean([3, 4.5, 12]))  # 6.5
+"""
+
+MATHS = """x^2 - 5x + 6 = 0
+(x - 2)(x - 3) = 0
+x = 2 or x = 3
+f(x) = 3x^2 + 2x - 7, f'(x) = 6x + 2
+f'(1) = 8, f(1) = -2
+y + 2 = 8(x - 1), y = 8x - 10
+∫ 6x dx = 3x^2 + C
+"""
+
+
+class TestSubmissionScreener:
+    """Test cases for SubmissionScreener."""
+
+    def test_real_submission_passes(self):
+        """Test that a normal answer is not flagged."""
+        screener = SubmissionScreener()
+        assert screener.screen(ESSAY, ESSAY + "\nQuestion 1: Explain.") == []
+
+    def test_code_submission_passes(self):
+        """Test that a code answer is not mistaken for filler."""
+        assert SubmissionScreener().screen(CODE) == []
+
+    def test_maths_submission_passes(self):
+        """Test that a worked maths answer is not mistaken for filler."""
+        assert SubmissionScreener().text_fraction(MATHS) > 0.9
+        assert SubmissionScreener().screen(MATHS) == []
+
+    def test_blank_and_placeholder_submissions_flagged(self):
+        """Test that empty, short and symbol-only documents are flagged."""
+        screener = SubmissionScreener()
+
+        assert "only 0 words" in screener.screen("")[0]
+        assert "only 2 words" in screener.screen("Answer here")[0]
+
+        reasons = SubmissionScreener(min_words=0).screen("______ ...... [ ] ______")
+        assert reasons and "text" in reasons[0]
+
+        reasons = SubmissionScreener(min_words=0).screen("1. ------\n2. ******")
+        assert reasons and "text" in reasons[0]
+
+    def test_template_only_submission_flagged(self):
+        """Test that a document that is almost all template is flagged."""
+        screener = SubmissionScreener(min_words=0)
+        reasons = screener.screen("Name", "Name\n" + ESSAY * 3)
+        assert any("template" in reason for reason in reasons)
+
+    def test_disabled_screener_passes_everything(self):
+        """Test that screening can be switched off."""
+        assert SubmissionScreener(enabled=False).screen("") == []
@@ -0,0 +1,67 @@
+"""
+Basic tests for coalescing identical requests in flight.
+"""
+
+import threading
+
+from ai_assessor.core.batch_stats import BatchStats
+from ai_assessor.core.single_flight import CoalescingClient, SingleFlight
+
+
+class GatedClient:
+    """Client whose requests wait until the gate opens."""
+
+    def __init__(self):
+        self.calls = 0
+        self.started = threading.Event()
+        self.gate = threading.Event()
+
+    def generate_completion(self, system_content, user_content, model, **kwargs):
+        self.calls += 1
+        self.started.set()
+        self.gate.wait(5)
+        return {"content": f"feedback for {user_content}", "usage": {"total_tokens": 9}}
+
+
+class TestCoalescingClient:
+    """Test cases for CoalescingClient."""
+
+    def test_identical_requests_share_one_call(self):
+        """Test that a duplicate in flight attaches to the running request."""
+        inner = GatedClient()
+        stats = BatchStats()
+        client = CoalescingClient(inner, SingleFlight(), stats=stats)
+        results = []
+
+        def grade():
+            results.append(
+                client.generate_completion("system", "essay", "gpt-4o", max_tokens=10)
+            )
+
+        first = threading.Thread(target=grade)
+        first.start()
+        inner.started.wait(5)
+        second = threading.Thread(target=grade)
+        second.start()
+        threading.Timer(0.2, inner.gate.set).start()
+        first.join(5)
+        second.join(5)
+
+        assert inner.calls == 1
+        assert stats.get("coalesced_requests") == 1
+        assert [r["content"] for r in results] == ["feedback for essay"] * 2
+        assert sorted(r["usage"]["total_tokens"] for r in results) == [0, 9]
+
+    def test_different_requests_are_not_coalesced(self):
+        """Test that requests differing in any setting are sent separately."""
+        inner = GatedClient()
+        inner.gate.set()
+        client = CoalescingClient(inner, SingleFlight())
+
+        client.generate_completion("system", "essay", "gpt-4o", temperature=0.2)
+        client.generate_completion("system", "essay", "gpt-4o", temperature=0.3)
+
+        assert inner.calls == 2
+        assert CoalescingClient.fingerprint(
+            "s", "u", "m", cancel_token=object()
+        ) == CoalescingClient.fingerprint("s", "u", "m")
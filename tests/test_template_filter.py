@@ -0,0 +1,49 @@
+"""
+Basic tests for assignment template boilerplate filtering.
+"""
+
+import os
+import tempfile
+
+from docx import Document
+
+from ai_assessor.utils.template_filter import TemplateFilter
+
+
+class TestTemplateFilter:
+    """Test cases for TemplateFilter."""
+
+    def _write_template(self, directory):
+        """Create a small template document and return its path."""
+        path = os.path.join(directory, "template.docx")
+        doc = Document()
+        doc.add_paragraph("Assignment 1: Reflective Essay")
+        doc.add_paragraph("Answer each question in the space provided.")
+        doc.add_paragraph("Yes")
+        doc.save(path)
+        return path
+
+    def test_strip_removes_template_paragraphs(self):
+        """Test that lines copied from the template are removed."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            template_filter = TemplateFilter(self._write_template(temp_dir))
+
+            text = (
+                "Assignment 1:  Reflective Essay\n"
+                "My reflection on the unit.\n"
+                "answer each question in the space provided."
+            )
+            filtered, saved = template_filter.strip(text)
+
+            assert filtered == "My reflection on the unit."
+            assert saved > 0
+
+    def test_short_lines_are_kept(self):
+        """Test that short template lines do not remove student answers."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            template_filter = TemplateFilter(self._write_template(temp_dir))
+
+            filtered, saved = template_filter.strip("Yes\nNo")
+
+            assert filtered == "Yes\nNo"
+            assert saved == 0